@@ -0,0 +1,386 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""An in-process stand-in for the porch server.
+
+The server implements the subset of the porch API used by npg_porch_cli,
+keeps registered pipelines and tasks in memory and can list any number of
+synthetic tasks, which are generated on the fly rather than stored.
+
+Example:
+
+  from benchmarks.mock_porch import MockPorchServer
+
+  with MockPorchServer(latency=0.005, num_synthetic_tasks=100000) as server:
+      print(server.url)
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+import zlib
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+STATUSES = ["PENDING", "CLAIMED", "RUNNING", "DONE", "FAILED", "CANCELLED"]
+SCHEMA_PATH = "/api/v1/openapi.json"
+LIST_CHUNK_SIZE = 500
+
+SYNTHETIC_PIPELINE = {
+    "name": "synthetic",
+    "uri": "https://github.com/wtsi-npg/synthetic",
+    "version": "1.0",
+}
+
+
+def schema_document(batch: bool = False, timestamps: bool = False) -> dict:
+    """Returns a minimal OpenAPI schema of the porch server.
+
+    Args:
+      batch:
+        If true, the schema advertises the batch endpoint for adding tasks.
+      timestamps:
+        If true, the schema advertises the `modified_since` query parameter
+        for listing tasks.
+    """
+
+    def query(*names):
+        return {"parameters": [{"name": name, "in": "query"} for name in names]}
+
+    paths = {
+        "/pipelines/": {"get": query(), "post": query()},
+        "/tasks/": {
+            "get": query("modified_since") if timestamps else query(),
+            "post": query(),
+            "put": query(),
+        },
+        "/tasks/claim": {"post": query("num_tasks")},
+    }
+    if batch:
+        paths["/tasks/batch"] = {"post": query()}
+
+    return {
+        "openapi": "3.1.0",
+        "paths": paths,
+        "components": {
+            "schemas": {"TaskStateEnum": {"type": "string", "enum": STATUSES}}
+        },
+    }
+
+
+class MockPorchServer:
+    """A porch server stand-in running in a background thread.
+
+    Args:
+      latency:
+        The time in seconds the server waits before replying to any request.
+      payload_size:
+        The size in bytes of the padding added to the input of synthetic
+        tasks.
+      num_synthetic_tasks:
+        The number of synthetic tasks listed in addition to registered tasks.
+        Can be changed while the server is running.
+      batch:
+        If true, the server provides the batch endpoint for adding tasks.
+      timestamps:
+        If true, registered tasks have the `modified` attribute, the time of
+        their last change, and can be listed by the time of the change with
+        the `modified_since` query parameter.
+      etags:
+        If true, listings of tasks have the ETag header and are not sent
+        again, '304 Not Modified' is sent instead, if the client has the
+        current version of the listing.
+      compression:
+        If true, replies are compressed with gzip if the client accepts it.
+        Request bodies compressed with gzip are accepted regardless.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        payload_size: int = 0,
+        num_synthetic_tasks: int = 0,
+        batch: bool = False,
+        timestamps: bool = False,
+        etags: bool = False,
+        compression: bool = False,
+    ):
+        self.latency = latency
+        self.payload_size = payload_size
+        self.num_synthetic_tasks = num_synthetic_tasks
+        self.batch = batch
+        self.timestamps = timestamps
+        self.etags = etags
+        self.compression = compression
+        self.pipelines: dict[str, dict] = {}
+        self.tasks: dict[str, dict] = {}
+        self.num_requests = 0
+        self.num_changes = 0
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """The base URL of the running server."""
+
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        """Starts the server on a free port of the loopback interface."""
+
+        handler = type("Handler", (_Handler,), {"porch": self})
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the server."""
+
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._thread.join()
+            self._httpd = None
+
+    def reset(self):
+        """Drops all registered pipelines and tasks."""
+
+        with self._lock:
+            self.pipelines.clear()
+            self.tasks.clear()
+            self.num_requests = 0
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def synthetic_task(self, index: int) -> dict:
+        task_input = {"id_run": index}
+        if self.payload_size:
+            task_input["padding"] = "x" * self.payload_size
+        return {
+            "pipeline": SYNTHETIC_PIPELINE,
+            "task_input_id": f"{index:064x}",
+            "task_input": task_input,
+            "status": "PENDING",
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    # Buffer the reply and send it without delay, otherwise the headers and
+    # the body are sent separately and Nagle's algorithm adds a delay.
+    wbufsize = -1
+    disable_nagle_algorithm = True
+    porch: MockPorchServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        path, query = self._route()
+        if path == SCHEMA_PATH:
+            self._reply(200, schema_document(self.porch.batch, self.porch.timestamps))
+        elif path == "/pipelines":
+            with self.porch._lock:
+                pipelines = list(self.porch.pipelines.values())
+            self._reply(200, pipelines)
+        elif path == "/tasks":
+            self._list_tasks(query)
+        else:
+            self._reply(404, {"detail": "Not Found"})
+
+    def do_POST(self):
+        path, query = self._route()
+        data = self._read_json()
+        porch = self.porch
+        if path == "/pipelines":
+            with porch._lock:
+                if data["name"] in porch.pipelines:
+                    self._reply(409, {"detail": "Pipeline already exists"})
+                    return
+                porch.pipelines[data["name"]] = data
+            self._reply(201, data)
+        elif path == "/tasks":
+            task = self._new_task(data)
+            if task is None:
+                self._reply(409, {"detail": "Task already exists"})
+            else:
+                self._reply(201, task)
+        elif path == "/tasks/batch" and porch.batch:
+            self._reply(201, [self._new_task(task) or task for task in data])
+        elif path == "/tasks/claim":
+            num_tasks = int(query.get("num_tasks", ["1"])[0])
+            claimed = []
+            with porch._lock:
+                for task in porch.tasks.values():
+                    if len(claimed) == num_tasks:
+                        break
+                    if task["status"] == "PENDING" and task["pipeline"] == data:
+                        task["status"] = "CLAIMED"
+                        self._touch(task)
+                        claimed.append(task)
+            self._reply(200, claimed)
+        else:
+            self._reply(404, {"detail": "Not Found"})
+
+    def do_PUT(self):
+        path, _ = self._route()
+        data = self._read_json()
+        if path != "/tasks":
+            self._reply(404, {"detail": "Not Found"})
+            return
+        key = _task_key(data)
+        with self.porch._lock:
+            task = self.porch.tasks.get(key)
+            if task is not None:
+                task["status"] = data["status"]
+                self._touch(task)
+        if task is None:
+            self._reply(404, {"detail": "Task not found"})
+        else:
+            self._reply(200, task)
+
+    def _route(self) -> tuple[str, dict]:
+        with self.porch._lock:
+            self.porch.num_requests += 1
+        if self.porch.latency:
+            time.sleep(self.porch.latency)
+        url = urlsplit(self.path)
+        path = url.path if url.path == "/" else url.path.rstrip("/")
+        return path, parse_qs(url.query)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if not length:
+            return None
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        return json.loads(body)
+
+    def _compressed(self) -> bool:
+        return self.porch.compression and "gzip" in self.headers.get(
+            "Accept-Encoding", ""
+        )
+
+    def _new_task(self, data: dict) -> dict | None:
+        key = _task_key(data)
+        task = dict(data, task_input_id=key)
+        with self.porch._lock:
+            if key in self.porch.tasks:
+                return None
+            self._touch(task)
+            self.porch.tasks[key] = task
+        return task
+
+    def _touch(self, task: dict):
+        self.porch.num_changes += 1
+        if self.porch.timestamps:
+            # Timestamps of this format sort in time order as strings.
+            task["modified"] = datetime.now(timezone.utc).strftime(
+                "%Y-%m-%dT%H:%M:%S.%fZ"
+            )
+
+    def _reply(self, status: int, data):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if self._compressed():
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _list_tasks(self, query: dict):
+        """Sends the list of tasks in chunks, so that the server does not
+        hold the whole reply in memory.
+        """
+
+        porch = self.porch
+        with porch._lock:
+            tasks = list(porch.tasks.values())
+            num_changes = porch.num_changes
+        num_synthetic = porch.num_synthetic_tasks
+        etag = None
+        if porch.etags:
+            version = json.dumps([num_changes, num_synthetic, query], sort_keys=True)
+            etag = '"' + hashlib.sha256(version.encode()).hexdigest()[:32] + '"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+        modified_since = query.get("modified_since", [None])[0]
+        if porch.timestamps and modified_since is not None:
+            tasks = [task for task in tasks if task["modified"] >= modified_since]
+            # Synthetic tasks are never modified.
+            num_synthetic = 0
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        if etag is not None:
+            self.send_header("ETag", etag)
+        compressor = None
+        if self._compressed():
+            compressor = zlib.compressobj(wbits=31)
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+
+        def write(data: bytes):
+            if compressor is not None:
+                data = compressor.compress(data)
+            # An empty chunk ends the reply.
+            if data:
+                self._write_chunk(data)
+
+        def items():
+            yield from tasks
+            for index in range(num_synthetic):
+                yield porch.synthetic_task(index)
+
+        write(b"[")
+        encoded = []
+        for index, task in enumerate(items()):
+            encoded.append(("," if index else "") + json.dumps(task))
+            if len(encoded) == LIST_CHUNK_SIZE:
+                write("".join(encoded).encode())
+                encoded = []
+        encoded.append("]")
+        write("".join(encoded).encode())
+        if compressor is not None:
+            self._write_chunk(compressor.flush())
+        self._write_chunk(b"")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+
+
+def _task_key(task: dict) -> str:
+    return json.dumps([task["pipeline"]["name"], task["task_input"]], sort_keys=True)
@@ -0,0 +1,387 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Benchmarks for npg_porch_cli against an in-process mock porch server.
+
+Run from the root of the repository, for example,
+
+  python -m benchmarks.run --output results.json
+  python -m benchmarks.run --scenarios latency bulk --baseline results.json
+
+Results are printed to STDOUT, or written to the --output file, as a JSON
+document. If a --baseline results file is given, metrics which are worse than
+the baseline by more than --tolerance are reported on STDERR and the exit
+code is 1. Metrics with names ending in '_per_s' are better when higher, all
+other metrics are better when lower.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib.metadata import version
+
+from benchmarks.mock_porch import SYNTHETIC_PIPELINE, MockPorchServer
+from npg_porch_cli.api import Pipeline, PorchAction, iter_tasks, list_tasks, send
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.schema import get_task_statuses, invalidate_schema_cache
+from npg_porch_cli.serialization import (
+    available_backends,
+    dumps,
+    get_backend,
+    loads,
+    set_backend,
+)
+
+TOKEN = "benchmark_token"
+PIPELINE = Pipeline(**SYNTHETIC_PIPELINE)
+
+DEFAULT_REPEAT = 200
+DEFAULT_BULK_SIZE = 10000
+DEFAULT_LIST_SIZES = [10000, 100000, 1000000]
+DEFAULT_CLI_REPEAT = 5
+DEFAULT_SERIALIZATION_SIZE = 100000
+
+
+def latency(server: MockPorchServer, repeat: int) -> list[dict]:
+    """Measures the latency of single calls over a shared pooled client."""
+
+    results = []
+    server.reset()
+    client = HttpClient()
+    actions = {
+        "list_pipelines": lambda i: {},
+        "add_task": lambda i: {"task_input": {"id_run": i}},
+        "claim_task": lambda i: {},
+        "update_task": lambda i: {"task_input": {"id_run": i}, "task_status": "DONE"},
+    }
+    for name, arguments in actions.items():
+        durations = []
+        for i in range(repeat):
+            action = PorchAction(porch_url=server.url, action=name, **arguments(i))
+            start = time.perf_counter()
+            send(action=action, pipeline=PIPELINE, client=client)
+            durations.append(time.perf_counter() - start)
+        results.append(
+            _result("latency", {"action": name, "repeat": repeat}, _summary(durations))
+        )
+    client.close()
+    return results
+
+
+def bulk(server: MockPorchServer, size: int, concurrency: int) -> list[dict]:
+    """Measures the throughput of the add_tasks and update_tasks actions."""
+
+    results = []
+    for batch in (False, True):
+        server.reset()
+        server.batch = batch
+        invalidate_schema_cache()
+        client = HttpClient(pool_maxsize=concurrency)
+        params = {"size": size, "concurrency": concurrency, "batch": batch}
+
+        action = PorchAction(
+            porch_url=server.url,
+            action="add_tasks",
+            task_inputs=({"id_run": i} for i in range(size)),
+            concurrency=concurrency,
+        )
+        elapsed, summary = _timed(send, action=action, pipeline=PIPELINE, client=client)
+        assert summary["created"] == size, "Not all tasks have been added"
+        results.append(
+            _result(
+                "bulk",
+                params | {"action": "add_tasks"},
+                {"seconds": elapsed, "tasks_per_s": size / elapsed},
+            )
+        )
+
+        if not batch:
+            action = PorchAction(
+                porch_url=server.url,
+                action="update_tasks",
+                task_updates=(({"id_run": i}, "DONE") for i in range(size)),
+                concurrency=concurrency,
+            )
+            elapsed, summary = _timed(
+                send, action=action, pipeline=PIPELINE, client=client
+            )
+            assert summary["updated"] == size, "Not all tasks have been updated"
+            results.append(
+                _result(
+                    "bulk",
+                    params | {"action": "update_tasks"},
+                    {"seconds": elapsed, "tasks_per_s": size / elapsed},
+                )
+            )
+        client.close()
+
+    server.reset()
+    server.batch = False
+    return results
+
+
+def list_memory(server: MockPorchServer, sizes: list[int]) -> list[dict]:
+    """Measures time and peak memory of listing tasks, either as a list of
+    dictionaries, streamed or as a list of typed records.
+
+    Each measurement runs in a fresh interpreter, so that its peak resident
+    set size is not affected by other measurements.
+    """
+
+    results = []
+    server.reset()
+    context = multiprocessing.get_context("spawn")
+    for size in sizes:
+        server.num_synthetic_tasks = size
+        for mode in ("list", "stream", "typed"):
+            with context.Pool(1) as pool:
+                metrics = pool.apply(_list_in_child, (server.url, mode))
+            assert metrics.pop("count") == size, "Not all tasks have been listed"
+            results.append(
+                _result("list_memory", {"size": size, "mode": mode}, metrics)
+            )
+    server.num_synthetic_tasks = 0
+    return results
+
+
+def _list_in_child(url: str, mode: str) -> dict:
+    os.environ["NPG_PORCH_TOKEN"] = TOKEN
+    action = PorchAction(
+        porch_url=url, action="list_tasks", typed_results=mode == "typed"
+    )
+    # Warm up the connection and the schema cache.
+    send(action=PorchAction(porch_url=url, action="list_pipelines"))
+    get_task_statuses(porch_url=url)
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if mode == "stream":
+        count = sum(1 for _ in iter_tasks(action=action))
+    else:
+        count = len(list_tasks(action=action))
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "count": count,
+        "seconds": elapsed,
+        "tasks_per_s": count / elapsed,
+        # ru_maxrss is in kilobytes on Linux.
+        "peak_rss_increase_mb": (peak - baseline) / 1024,
+    }
+
+
+def serialization(server: MockPorchServer, size: int) -> list[dict]:
+    """Measures the speed of encoding and decoding a listing of tasks with
+    each available JSON backend.
+    """
+
+    tasks = [server.synthetic_task(index) for index in range(size)]
+    results = []
+    backend = get_backend()
+    try:
+        for name in available_backends():
+            set_backend(name)
+            elapsed, data = _timed(dumps, obj=tasks)
+            megabytes = len(data) / 2**20
+            metrics = {"size_mb": megabytes, "encode_mb_per_s": megabytes / elapsed}
+            elapsed, _ = _timed(loads, data=data)
+            metrics["decode_mb_per_s"] = megabytes / elapsed
+            results.append(
+                _result("serialization", {"backend": name, "size": size}, metrics)
+            )
+    finally:
+        set_backend(backend.name)
+    return results
+
+
+def cli_startup(server: MockPorchServer, repeat: int) -> list[dict]:
+    """Measures the wall time of running the CLI client in a new process."""
+
+    script = (
+        "import sys; from npg_porch_cli.api_cli_user import run; "
+        "sys.argv[0] = 'npg_porch_client'; run()"
+    )
+    commands = {
+        "help": ["--help"],
+        "list_pipelines": ["list_pipelines", "--base_url", server.url],
+    }
+    env = dict(os.environ, NPG_PORCH_TOKEN=TOKEN)
+    results = []
+    for name, arguments in commands.items():
+        durations = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-c", script] + arguments,
+                env=env,
+                check=True,
+                stdout=subprocess.DEVNULL,
+            )
+            durations.append(time.perf_counter() - start)
+        results.append(
+            _result(
+                "cli_startup", {"command": name, "repeat": repeat}, _summary(durations)
+            )
+        )
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Returns descriptions of metrics which are worse than in the baseline
+    by more than the tolerance, a fraction of the baseline value.
+    """
+
+    def key(result):
+        return (result["scenario"], json.dumps(result["params"], sort_keys=True))
+
+    baseline_results = {key(r): r["metrics"] for r in baseline["results"]}
+    regressions = []
+    for result in results["results"]:
+        old_metrics = baseline_results.get(key(result))
+        if old_metrics is None:
+            continue
+        for name, value in result["metrics"].items():
+            old = old_metrics.get(name)
+            if not old:
+                continue
+            change = (value - old) / old
+            if name.endswith("_per_s"):
+                change = -change
+            if change > tolerance:
+                regressions.append(
+                    f"{result['scenario']} {result['params']} {name}: "
+                    f"{old:.4g} -> {value:.4g}"
+                )
+    return regressions
+
+
+def _result(scenario: str, params: dict, metrics: dict) -> dict:
+    return {"scenario": scenario, "params": params, "metrics": metrics}
+
+
+def _summary(durations: list[float]) -> dict:
+    durations = sorted(durations)
+    if len(durations) > 1:
+        quantiles = statistics.quantiles(durations, n=100, method="inclusive")
+    else:
+        quantiles = durations * 99
+    return {
+        "min_ms": durations[0] * 1000,
+        "mean_ms": statistics.fmean(durations) * 1000,
+        "p50_ms": quantiles[49] * 1000,
+        "p95_ms": quantiles[94] * 1000,
+        "p99_ms": quantiles[98] * 1000,
+        "max_ms": durations[-1] * 1000,
+    }
+
+
+def _timed(function, **kwargs) -> tuple[float, object]:
+    start = time.perf_counter()
+    result = function(**kwargs)
+    return time.perf_counter() - start, result
+
+
+def _metadata(args) -> dict:
+    return {
+        "npg_porch_cli_version": version("npg_porch_cli"),
+        "python_version": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "server_latency_s": args.latency,
+        "payload_size": args.payload_size,
+        "json_backend": get_backend().name,
+    }
+
+
+def run(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="benchmarks.run",
+        description="Benchmarks npg_porch_cli against a mock porch server",
+    )
+    scenarios = ["latency", "bulk", "list_memory", "serialization", "cli_startup"]
+    parser.add_argument("--scenarios", nargs="+", choices=scenarios, default=scenarios)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.0,
+        help="Server latency in seconds for each request, defaults to 0",
+    )
+    parser.add_argument(
+        "--payload_size",
+        type=int,
+        default=0,
+        help="Size in bytes of padding in synthetic task inputs, defaults to 0",
+    )
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--bulk_size", type=int, default=DEFAULT_BULK_SIZE)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--list_sizes", type=int, nargs="+", default=DEFAULT_LIST_SIZES)
+    parser.add_argument(
+        "--serialization_size", type=int, default=DEFAULT_SERIALIZATION_SIZE
+    )
+    parser.add_argument("--cli_repeat", type=int, default=DEFAULT_CLI_REPEAT)
+    parser.add_argument("--output", type=str, help="Output file, STDOUT by default")
+    parser.add_argument("--baseline", type=str, help="Results to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    os.environ["NPG_PORCH_TOKEN"] = TOKEN
+    results = []
+    with MockPorchServer(
+        latency=args.latency, payload_size=args.payload_size
+    ) as server:
+        if "latency" in args.scenarios:
+            results.extend(latency(server, args.repeat))
+        if "bulk" in args.scenarios:
+            results.extend(bulk(server, args.bulk_size, args.concurrency))
+        if "list_memory" in args.scenarios:
+            results.extend(list_memory(server, args.list_sizes))
+        if "serialization" in args.scenarios:
+            results.extend(serialization(server, args.serialization_size))
+        if "cli_startup" in args.scenarios:
+            results.extend(cli_startup(server, args.cli_repeat))
+
+    document = {"metadata": _metadata(args), "results": results}
+    output = json.dumps(document, indent=2)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(output + "\n")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            regressions = compare(document, json.load(fh), args.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run())
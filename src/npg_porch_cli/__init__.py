@@ -1 +1,12 @@
-from .api import send_request
+# Attributes are imported on first access, so that importing a submodule,
+# for example, the CLI client, does not load the HTTP client stack.
+
+__all__ = ["send_request"]
+
+
+def __getattr__(name):
+    if name == "send_request":
+        from .api import send_request
+
+        return send_request
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
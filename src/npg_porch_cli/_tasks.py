@@ -0,0 +1,300 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Helpers shared by the synchronous and asynchronous porch clients.
+
+Apart from iter_all_tasks, the helpers do not depend on the HTTP library,
+they build requests and interpret replies and outcomes of porch API calls.
+Arguments named `action` and `pipeline` are npg_porch_cli.api.PorchAction
+and npg_porch_cli.api.Pipeline objects.
+"""
+
+import os
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import nullcontext
+from dataclasses import asdict
+from urllib.parse import urljoin
+
+from npg_porch_cli.defaults import NPG_PORCH_TOKEN_ENV_VAR
+from npg_porch_cli.exceptions import AuthException, ServerErrorException
+from npg_porch_cli.http_client import HttpClient
+
+INITIAL_PORCH_STATUS = "PENDING"
+
+
+def get_token() -> str:
+    """Gets the value of the porch token from the environment variable.
+
+    If the NPG_PORCH_TOKEN is not defined or assigned to am empty string,
+    raises AuthException.
+
+    Returns:
+      The token.
+    """
+    if NPG_PORCH_TOKEN_ENV_VAR not in os.environ:
+        raise AuthException("Authorization token is needed")
+    token = os.environ[NPG_PORCH_TOKEN_ENV_VAR]
+    if token == "":
+        raise AuthException("Authorization token is needed")
+
+    return token
+
+
+def request_headers(auth_type: str | None, token: str | None = None) -> dict:
+    headers = {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+    }
+    if auth_type is not None:
+        if auth_type == "token":
+            if not token:
+                token = get_token()
+            headers["Authorization"] = "Bearer " + token
+        else:
+            raise ValueError(f"Authorization type {auth_type} is not implemented")
+    return headers
+
+
+def raise_for_status(response):
+    """Raises ServerErrorException if the status code of the response is not
+    in the 200 – 299 range.
+    """
+
+    if not response.ok:
+        detail = ""
+        try:
+            data = response.json()
+            if "detail" in data:
+                detail = data["detail"]
+        except Exception:
+            pass
+
+        message = (
+            f'Status code {response.status_code} "{response.reason}" '
+            f"received from {response.url}"
+        )
+        if detail:
+            message += f".\nDetail: {detail}"
+        raise ServerErrorException(message, status_code=response.status_code)
+
+
+def tasks_query(action, pipeline, supported: set[str]) -> tuple[dict, bool, bool]:
+    """Returns query parameters for listing tasks, a flag showing whether the
+    status filter is applied by the server and a flag showing whether the
+    server supports pagination.
+
+    The `supported` argument is a set of query parameters the server
+    advertises for the tasks endpoint.
+    """
+
+    params = {}
+    if pipeline is not None and "pipeline_name" in supported:
+        params["pipeline_name"] = pipeline.name
+    status_filtered = action.task_status is not None and "status" in supported
+    if status_filtered:
+        params["status"] = action.task_status
+
+    return params, status_filtered, {"limit", "offset"} <= supported
+
+
+def task_matches(task: dict, pipeline_dict: dict | None, status: str | None) -> bool:
+    # The server filters by pipeline name only, the version and uri of the
+    # pipeline are always checked here.
+    if pipeline_dict is not None and task["pipeline"] != pipeline_dict:
+        return False
+    if status is not None and task["status"] != status:
+        return False
+    return True
+
+
+def iter_all_tasks(
+    action, client: HttpClient | None, params: dict, paginated: bool
+) -> Iterator[dict]:
+    """Streams the tasks selected by the query parameters, page by page if
+    the server supports pagination, using the synchronous client.
+    """
+
+    # The api module imports this module.
+    from npg_porch_cli.api import TASKS_PAGE_SIZE, _timeouts, iter_request
+
+    url = urljoin(action.porch_url, "tasks")
+    offset = 0
+    while True:
+        page_params = params
+        if paginated:
+            page_params = params | {"limit": TASKS_PAGE_SIZE, "offset": offset}
+        count = 0
+        for task in iter_request(
+            validate_ca_cert=action.validate_ca_cert,
+            client=client,
+            timeouts=_timeouts(action, client),
+            token=action.token,
+            operation=action.action,
+            url=url,
+            method="GET",
+            params=page_params or None,
+        ):
+            count += 1
+            yield task
+        if not paginated or count < TASKS_PAGE_SIZE:
+            break
+        offset += count
+
+
+class SkippedTask(Exception):
+    """Raised for a task input which is not sent to the server, the argument
+    is the result for this task input, 'existed' or 'duplicate'.
+    """
+
+
+def skipped_error(skipped: str | Exception) -> Exception:
+    """Returns the outcome, an exception, for a task input which is not sent
+    to the server, see mark_known_tasks.
+    """
+
+    return skipped if isinstance(skipped, Exception) else SkippedTask(skipped)
+
+
+def classify_add(exception: Exception) -> str:
+    if isinstance(exception, SkippedTask):
+        return exception.args[0]
+    if isinstance(exception, ServerErrorException) and exception.status_code == 409:
+        return "existed"
+    return "failed"
+
+
+def open_snapshot(action):
+    """Returns a context manager opening the snapshot file of the action, or
+    yielding None if the action has no snapshot file.
+    """
+
+    if action.snapshot_path is None:
+        return nullcontext()
+
+    from npg_porch_cli.snapshot import TaskSnapshot
+
+    snapshot = TaskSnapshot(action.snapshot_path)
+    try:
+        snapshot.check_server(action.porch_url)
+    except ValueError:
+        snapshot.close()
+        raise
+    return snapshot
+
+
+def mark_known_tasks(
+    task_inputs: Iterable[dict], pipeline, snapshot
+) -> Iterator[tuple]:
+    """Yields (task_input, skipped) tuples, where `skipped` is 'duplicate'
+    for a task input which repeats a preceding one, 'existed' for a task
+    input of a task of the pipeline in the snapshot, if given, the exception
+    for a task input which cannot be serialised to JSON, and None for task
+    inputs which should be sent to the server.
+    """
+
+    from npg_porch_cli.canonical import task_input_hash
+
+    seen = set()
+    for task_input in task_inputs:
+        try:
+            key = task_input_hash(task_input)
+        except (TypeError, ValueError) as e:
+            yield (task_input, e)
+            continue
+        if key in seen:
+            yield (task_input, "duplicate")
+            continue
+        seen.add(key)
+        if snapshot is not None and snapshot.has_task(pipeline, task_input):
+            yield (task_input, "existed")
+        else:
+            yield (task_input, None)
+
+
+def record_created(snapshot, action, pipeline, summary: dict):
+    """Adds tasks created by add_tasks to the snapshot, if given."""
+
+    if snapshot is None:
+        return
+    pipeline_dict = asdict(pipeline)
+    snapshot.record(
+        action.porch_url,
+        (
+            {
+                "pipeline": pipeline_dict,
+                "task_input": task["task_input"],
+                "status": INITIAL_PORCH_STATUS,
+            }
+            for task in summary["tasks"]
+            if task["result"] == "created"
+        ),
+    )
+
+
+def summarise(
+    outcomes: Iterable[tuple],
+    success: str,
+    failures: tuple,
+    classify: Callable,
+    describe: Callable = lambda task_input: {"task_input": task_input},
+) -> dict:
+    """Builds a summary of the outcomes of a bulk action.
+
+    Each outcome is an (item, result, exception) tuple, see
+    npg_porch_cli.bulk.run_concurrently. The result for an item is `success`
+    if no exception was raised, otherwise the value returned by calling
+    `classify` with the exception. Per-task results are dictionaries created
+    by calling `describe` with the item.
+    """
+
+    summary = dict.fromkeys((success,) + failures, 0)
+    summary["tasks"] = []
+    for item, _, exception in outcomes:
+        task_result = describe(item)
+        if exception is None:
+            task_result["result"] = success
+        else:
+            task_result["result"] = classify(exception)
+            if task_result["result"] == "failed":
+                task_result["error"] = str(exception)
+        summary[task_result["result"]] += 1
+        summary["tasks"].append(task_result)
+
+    return summary
+
+
+def batch_outcomes(items: list[tuple], exception: Exception | None = None) -> list:
+    """Returns the outcomes, see summarise, for (task_input, skipped) items
+    of a batch sent to the server. If the exception is given, the batch
+    failed and the exception is the outcome for the tasks which were sent.
+    """
+
+    return [
+        (item, None, exception if item[1] is None else skipped_error(item[1]))
+        for item in items
+    ]
+
+
+def batches(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
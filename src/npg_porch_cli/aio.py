@@ -0,0 +1,744 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""An asyncio client for the porch API server.
+
+This module requires the httpx package, which is installed with the `aio`
+extra, for example, `pip install npg_porch_cli[aio]`.
+
+Example:
+
+  import asyncio
+
+  from npg_porch_cli.aio import AsyncPorchClient
+  from npg_porch_cli.api import Pipeline
+
+  async def main():
+      pipeline = Pipeline(name="p1", uri="https://some.com/p1", version="1.0")
+      async with AsyncPorchClient() as client:
+          action = await client.action(
+              porch_url="https://myporch.com",
+              action="update_task",
+              task_input={"id_run": 409},
+              task_status="DONE",
+          )
+          return await client.send(action=action, pipeline=pipeline)
+
+  asyncio.run(main())
+"""
+
+import asyncio
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from itertools import islice
+from urllib.parse import urljoin
+
+try:
+    import httpx
+except ImportError as err:
+    raise ImportError(
+        "npg_porch_cli.aio requires httpx. "
+        "Install npg_porch_cli with the 'aio' extra."
+    ) from err
+
+from npg_porch_cli import serialization
+from npg_porch_cli._tasks import (
+    batch_outcomes,
+    classify_add,
+    mark_known_tasks,
+    open_snapshot,
+    raise_for_status,
+    record_created,
+    request_headers,
+    skipped_error,
+    summarise,
+    task_matches,
+    tasks_query,
+)
+from npg_porch_cli.api import (
+    INITIAL_PORCH_STATUS,
+    PORCH_TASKS_BATCH_PATH,
+    PORCH_TASKS_CLAIM_PATH,
+    PORCH_TASKS_PATH,
+    TASKS_BATCH_SIZE,
+    TASKS_PAGE_SIZE,
+    Pipeline,
+    PorchAction,
+    query_tasks,
+    snapshot_tasks,
+    validate_task_status,
+)
+from npg_porch_cli.breaker import CircuitBreaker
+from npg_porch_cli.exceptions import CircuitOpenException, ServerErrorException
+from npg_porch_cli.http_client import Timeouts
+from npg_porch_cli.metrics import RequestEvent
+from npg_porch_cli.schema import (
+    PORCH_OPENAPI_SCHEMA_URL,
+    ServerSchema,
+    get_schema_cache,
+)
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 5.0
+
+
+class _Response:
+    """Adapts httpx.Response to the subset of the requests.Response interface
+    used by this package.
+    """
+
+    def __init__(self, response: httpx.Response):
+        self._response = response
+        self.status_code = response.status_code
+        self.reason = response.reason_phrase
+        self.url = str(response.url)
+        self.ok = response.status_code < 400
+        self.headers = response.headers
+
+    def json(self):
+        return serialization.loads(self._response.content)
+
+
+class AsyncPorchClient:
+    """An asyncio client for the porch API server.
+
+    Provides a coroutine for each action listed by
+    npg_porch_cli.api.list_client_actions. Actions are described by
+    npg_porch_cli.api.PorchAction objects and have the same semantics and
+    return values as the functions of the npg_porch_cli.api module. Errors are
+    reported by raising npg_porch_cli.exceptions.AuthException and
+    npg_porch_cli.exceptions.ServerErrorException.
+
+    All requests share an asynchronous connection pool, so many concurrent
+    calls can be made from a single event loop. The client should be closed
+    when no longer needed, either by calling `aclose` or by using the client
+    as an asynchronous context manager.
+
+    Args:
+      max_connections:
+        The maximum number of concurrent connections.
+      max_keepalive_connections:
+        The maximum number of idle connections kept open.
+      keepalive_expiry:
+        Time in seconds after which an idle connection is closed.
+      retries:
+        The number of retries for failed connection attempts.
+      timeouts:
+        npg_porch_cli.http_client.Timeouts object, the default timeouts for
+        requests, optional.
+      action_timeouts:
+        A dictionary mapping names of client actions to Timeouts objects,
+        optional, overrides the default timeouts for these actions.
+      observers:
+        A list of callables, optional, which are called with an
+        npg_porch_cli.metrics.RequestEvent object for every request once
+        it has completed or failed, see
+        npg_porch_cli.http_client.HttpClient. Retries of the transport are
+        not counted.
+      transport:
+        An httpx transport to use instead of the default pooled transport,
+        optional. If given, the pool parameters are ignored.
+      circuit_breaker:
+        npg_porch_cli.breaker.CircuitBreaker object, optional, see
+        npg_porch_cli.http_client.HttpClient.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: int = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = DEFAULT_KEEPALIVE_EXPIRY,
+        retries: int = 0,
+        timeouts: Timeouts | None = None,
+        action_timeouts: dict[str, Timeouts] | None = None,
+        observers: list[Callable[[RequestEvent], None]] | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ):
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._retries = retries
+        self.timeouts = timeouts or Timeouts()
+        self.action_timeouts = dict(action_timeouts or {})
+        self.observers = list(observers or [])
+        self._transport = transport
+        self.circuit_breaker = circuit_breaker
+        self._schema_locks: dict[str, asyncio.Lock] = {}
+        # httpx sets certificate validation per client rather than
+        # per request, hence a client for each value of the flag.
+        self._clients: dict[bool, httpx.AsyncClient] = {}
+        self._actions = {
+            "list_tasks": self.list_tasks,
+            "list_pipelines": self.list_pipelines,
+            "add_pipeline": self.add_pipeline,
+            "add_task": self.add_task,
+            "add_tasks": self.add_tasks,
+            "claim_task": self.claim_task,
+            "update_task": self.update_task,
+            "update_tasks": self.update_tasks,
+            "create_token": self.create_token,
+            "snapshot": self.snapshot_tasks,
+            "query": self.query_tasks,
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+    async def aclose(self):
+        """Closes all pooled connections."""
+
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+    async def action(self, **kwargs) -> PorchAction:
+        """Creates an npg_porch_cli.api.PorchAction object.
+
+        Takes the same arguments as the PorchAction constructor. If the task
+        status is given, the server's schema is retrieved asynchronously,
+        so that validation of the status does not block the event loop.
+        """
+
+        if kwargs.get("task_status") is not None:
+            await self._schema(
+                porch_url=kwargs.get("porch_url"),
+                validate_ca_cert=kwargs.get("validate_ca_cert", True),
+            )
+        return PorchAction(**kwargs)
+
+    async def send(
+        self,
+        action: PorchAction,
+        pipeline: Pipeline = None,
+        description: str | None = None,
+    ) -> dict | list:
+        """Sends a request to the porch API server, see npg_porch_cli.api.send."""
+
+        function = self._actions[action.action]
+        if action.action == "list_pipelines":
+            return await function(action=action)
+        elif action.action == "create_token":
+            return await function(
+                action=action, pipeline=pipeline, description=description
+            )
+        return await function(action=action, pipeline=pipeline)
+
+    async def list_pipelines(self, action: PorchAction) -> list:
+        """Lists all pipelines, see npg_porch_cli.api.list_pipelines."""
+
+        return await self.send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=self._timeouts(action),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(action.porch_url, "pipelines"),
+            method="GET",
+        )
+
+    async def list_tasks(self, action: PorchAction, pipeline: Pipeline = None) -> list:
+        """Lists tasks, see npg_porch_cli.api.list_tasks."""
+
+        schema = await self._optional_schema(action.porch_url, action.validate_ca_cert)
+        supported = (
+            set()
+            if schema is None
+            else schema.query_parameters("GET", PORCH_TASKS_PATH)
+        )
+        params, status_filtered, paginated = tasks_query(action, pipeline, supported)
+        url = urljoin(action.porch_url, "tasks")
+        pipeline_dict = asdict(pipeline) if pipeline is not None else None
+        status = None if status_filtered else action.task_status
+        if action.typed_results:
+            from npg_porch_cli.records import TaskRecordFactory, select_tasks
+
+            factory = TaskRecordFactory()
+
+        tasks = []
+        offset = 0
+        while True:
+            page_params = params
+            if paginated:
+                page_params = params | {"limit": TASKS_PAGE_SIZE, "offset": offset}
+            page = await self.send_request(
+                validate_ca_cert=action.validate_ca_cert,
+                timeouts=self._timeouts(action),
+                token=action.token,
+                operation=action.action,
+                url=url,
+                method="GET",
+                params=page_params or None,
+            )
+            if action.typed_results:
+                tasks.extend(select_tasks(page, pipeline, status, factory))
+            else:
+                tasks.extend(o for o in page if task_matches(o, pipeline_dict, status))
+            if not paginated or len(page) < TASKS_PAGE_SIZE:
+                break
+            offset += len(page)
+        return tasks
+
+    async def snapshot_tasks(
+        self, action: PorchAction, pipeline: Pipeline = None
+    ) -> dict:
+        """Saves tasks to a local snapshot file, see
+        npg_porch_cli.api.snapshot_tasks. The snapshot is refreshed via the
+        synchronous client in a worker thread.
+        """
+
+        return await asyncio.to_thread(snapshot_tasks, action=action, pipeline=pipeline)
+
+    async def query_tasks(self, action: PorchAction, pipeline: Pipeline = None) -> list:
+        """Lists tasks saved in a local snapshot file, see
+        npg_porch_cli.api.query_tasks.
+        """
+
+        return await asyncio.to_thread(query_tasks, action=action, pipeline=pipeline)
+
+    async def add_pipeline(self, action: PorchAction, pipeline: Pipeline) -> dict:
+        """Registers a new pipeline, see npg_porch_cli.api.add_pipeline."""
+
+        return await self.send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=self._timeouts(action),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(action.porch_url, "pipelines"),
+            method="POST",
+            data=pipeline,
+        )
+
+    async def add_task(self, action: PorchAction, pipeline: Pipeline) -> dict:
+        """Registers a new task, see npg_porch_cli.api.add_task."""
+
+        if action.task_input is None:
+            raise TypeError(f"task_input cannot be None for action '{action.action}'")
+        return await self.send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=self._timeouts(action),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(action.porch_url, "tasks"),
+            method="POST",
+            data={
+                "pipeline": pipeline,
+                "task_input": action.task_input,
+                "status": INITIAL_PORCH_STATUS,
+            },
+        )
+
+    async def add_tasks(self, action: PorchAction, pipeline: Pipeline) -> dict:
+        """Registers many new tasks, see npg_porch_cli.api.add_tasks."""
+
+        if action.task_inputs is None:
+            raise TypeError(f"task_inputs cannot be None for action '{action.action}'")
+
+        def new_task(task_input) -> dict:
+            return {
+                "pipeline": pipeline,
+                "task_input": task_input,
+                "status": INITIAL_PORCH_STATUS,
+            }
+
+        async def add(item: tuple):
+            task_input, skipped = item
+            if skipped is not None:
+                raise skipped_error(skipped)
+            return await self.send_request(
+                validate_ca_cert=action.validate_ca_cert,
+                timeouts=self._timeouts(action),
+                token=action.token,
+                operation=action.action,
+                url=urljoin(action.porch_url, "tasks"),
+                method="POST",
+                data=new_task(task_input),
+            )
+
+        schema = await self._optional_schema(action.porch_url, action.validate_ca_cert)
+        batched = schema is not None and schema.has_operation(
+            "POST", PORCH_TASKS_BATCH_PATH
+        )
+
+        async def add_batch(batch: list[tuple]) -> list[tuple]:
+            task_inputs = [
+                task_input for task_input, skipped in batch if skipped is None
+            ]
+            try:
+                if task_inputs:
+                    await self.send_request(
+                        validate_ca_cert=action.validate_ca_cert,
+                        timeouts=self._timeouts(action),
+                        token=action.token,
+                        operation=action.action,
+                        url=urljoin(
+                            action.porch_url, PORCH_TASKS_BATCH_PATH.lstrip("/")
+                        ),
+                        method="POST",
+                        data=[new_task(task_input) for task_input in task_inputs],
+                    )
+            except ServerErrorException:
+                return await _run_concurrently(add, batch, action.concurrency)
+            except (httpx.HTTPError, TimeoutError, CircuitOpenException) as e:
+                return batch_outcomes(batch, e)
+            return batch_outcomes(batch)
+
+        # Task inputs are hashed and looked up in the snapshot in a thread, so
+        # that the event loop is not blocked. SQLite connections can only be
+        # used in the thread which opened them, hence a single thread.
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=1) as snapshot_thread:
+
+            def in_thread(function, *args):
+                return loop.run_in_executor(snapshot_thread, function, *args)
+
+            context = await in_thread(open_snapshot, action)
+            snapshot = await in_thread(context.__enter__)
+            try:
+                items = mark_known_tasks(action.task_inputs, pipeline, snapshot)
+                outcomes = []
+                while batch := await in_thread(_next_batch, items):
+                    if batched:
+                        outcomes.extend(await add_batch(batch))
+                    else:
+                        outcomes.extend(
+                            await _run_concurrently(add, batch, action.concurrency)
+                        )
+
+                summary = summarise(
+                    outcomes,
+                    success="created",
+                    failures=("existed", "failed", "duplicate"),
+                    classify=classify_add,
+                    describe=lambda item: {"task_input": item[0]},
+                )
+                await in_thread(record_created, snapshot, action, pipeline, summary)
+            finally:
+                await in_thread(context.__exit__, None, None, None)
+
+        return summary
+
+    async def claim_task(self, action: PorchAction, pipeline: Pipeline) -> list:
+        """Claims a task, see npg_porch_cli.api.claim_task."""
+
+        params = None
+        if action.num_tasks > 1:
+            schema = await self._optional_schema(
+                action.porch_url, action.validate_ca_cert
+            )
+            if schema is not None and "num_tasks" in schema.query_parameters(
+                "POST", PORCH_TASKS_CLAIM_PATH
+            ):
+                params = {"num_tasks": action.num_tasks}
+
+        return await self.send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=self._timeouts(action),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(action.porch_url, "tasks/claim"),
+            method="POST",
+            data=pipeline,
+            params=params,
+        )
+
+    async def update_task(self, action: PorchAction, pipeline: Pipeline) -> dict:
+        """Updates the status of a task, see npg_porch_cli.api.update_task."""
+
+        if action.task_input is None:
+            raise TypeError(f"task_input cannot be None for action '{action.action}'")
+        if action.task_status is None:
+            raise TypeError(f"task_status cannot be None for action '{action.action}'")
+        return await self.send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=self._timeouts(action),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(action.porch_url, "tasks/"),
+            method="PUT",
+            data={
+                "pipeline": pipeline,
+                "task_input": action.task_input,
+                "status": action.task_status,
+            },
+        )
+
+    async def update_tasks(self, action: PorchAction, pipeline: Pipeline) -> dict:
+        """Updates the status of many tasks, see npg_porch_cli.api.update_tasks."""
+
+        if action.task_updates is None:
+            raise TypeError(f"task_updates cannot be None for action '{action.action}'")
+
+        url = urljoin(action.porch_url, "tasks/")
+        schema = await self._schema(action.porch_url, action.validate_ca_cert)
+
+        async def update(task_update: tuple):
+            task_input, task_status = task_update
+            return await self.send_request(
+                validate_ca_cert=action.validate_ca_cert,
+                timeouts=self._timeouts(action),
+                token=action.token,
+                operation=action.action,
+                url=url,
+                method="PUT",
+                data={
+                    "pipeline": pipeline,
+                    "task_input": task_input,
+                    "status": validate_task_status(task_status, schema.task_statuses),
+                },
+            )
+
+        return summarise(
+            await _run_concurrently(update, action.task_updates, action.concurrency),
+            success="updated",
+            failures=("failed",),
+            classify=lambda exception: "failed",
+            describe=lambda task_update: {
+                "task_input": task_update[0],
+                "status": task_update[1],
+            },
+        )
+
+    async def create_token(
+        self, action: PorchAction, pipeline: Pipeline, description: str
+    ) -> dict:
+        """Creates a new token for the pipeline, see
+        npg_porch_cli.api.create_token.
+        """
+
+        if not description:
+            raise TypeError("Token description should be given")
+
+        return await self.send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=self._timeouts(action),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(
+                action.porch_url, f"pipelines/{pipeline.name}/token/{description}"
+            ),
+            method="POST",
+        )
+
+    async def send_request(
+        self,
+        validate_ca_cert: bool,
+        url: str,
+        method: str,
+        data: dict | list | Pipeline | None = None,
+        auth_type: str | None = "token",
+        params: dict | None = None,
+        timeouts: Timeouts | None = None,
+        token: str | None = None,
+        operation: str | None = None,
+    ):
+        """Sends an HTTP request to a JSON API web service, see
+        npg_porch_cli.api.send_request.
+
+        If the timeouts define a deadline, TimeoutError is raised when the
+        deadline passes before the reply is received.
+
+        Returns:
+          Server's decoded reply.
+        """
+
+        if timeouts is None:
+            timeouts = self.timeouts
+        response = await self._request(
+            validate_ca_cert,
+            url,
+            method,
+            timeouts,
+            operation,
+            headers=request_headers(auth_type, token),
+            content=serialization.dumps(data) if data is not None else None,
+            params=params,
+        )
+        response = _Response(response)
+        raise_for_status(response)
+
+        return response.json()
+
+    async def _request(
+        self,
+        validate_ca_cert: bool,
+        url: str,
+        method: str,
+        timeouts: Timeouts,
+        operation: str | None,
+        **kwargs,
+    ) -> httpx.Response:
+        """Sends an HTTP request subject to the timeouts and the circuit
+        breaker and reports it to the observers. Returns the response.
+        """
+
+        start = time.perf_counter()
+        release = None
+        try:
+            if self.circuit_breaker is not None:
+                release = self.circuit_breaker.acquire(url)
+            async with asyncio.timeout(timeouts.deadline):
+                response = await self._http(validate_ca_cert).request(
+                    method,
+                    url,
+                    timeout=httpx.Timeout(timeouts.read, connect=timeouts.connect),
+                    **kwargs,
+                )
+        except Exception as e:
+            if release is not None:
+                # Only errors of the connection or the server count as
+                # failures, TimeoutError is raised when the caller's deadline
+                # passes.
+                release(True if isinstance(e, httpx.HTTPError) else None)
+            self._notify(
+                RequestEvent(
+                    operation=operation,
+                    method=method,
+                    url=url,
+                    duration=time.perf_counter() - start,
+                    exception=e,
+                    circuit_state=self._circuit_state(url),
+                )
+            )
+            raise
+        except BaseException:
+            # For example, the task has been cancelled.
+            if release is not None:
+                release(None)
+            raise
+        if release is not None:
+            release(
+                self.circuit_breaker.failed(
+                    response.status_code, time.perf_counter() - start
+                )
+            )
+        self._notify(
+            RequestEvent(
+                operation=operation,
+                method=method,
+                url=url,
+                status_code=response.status_code,
+                duration=time.perf_counter() - start,
+                bytes_sent=len(response.request.content),
+                bytes_received=len(response.content),
+                circuit_state=self._circuit_state(url),
+            )
+        )
+        return response
+
+    async def _schema(self, porch_url: str, validate_ca_cert: bool) -> ServerSchema:
+        cache = get_schema_cache()
+        schema = cache.peek(porch_url)
+        if schema is not None and not cache.expired(schema):
+            return schema
+        # Only one coroutine retrieves the schema, the others wait for it.
+        lock = self._schema_locks.setdefault(porch_url, asyncio.Lock())
+        async with lock:
+            schema = cache.peek(porch_url)
+            if schema is None or cache.expired(schema):
+                response = await self._request(
+                    validate_ca_cert,
+                    urljoin(porch_url, PORCH_OPENAPI_SCHEMA_URL),
+                    "GET",
+                    self.timeouts,
+                    "get_schema",
+                    headers=cache.conditional_headers(schema),
+                )
+                schema = cache.update(porch_url, schema, _Response(response))
+        return schema
+
+    async def _optional_schema(
+        self, porch_url: str, validate_ca_cert: bool
+    ) -> ServerSchema | None:
+        """Returns the schema for the porch server or None if it cannot be
+        retrieved or parsed, see npg_porch_cli.schema.has_operation.
+        """
+
+        try:
+            return await self._schema(porch_url, validate_ca_cert)
+        except Exception:
+            return None
+
+    def _circuit_state(self, url: str) -> str | None:
+        if self.circuit_breaker is None:
+            return None
+        return self.circuit_breaker.state(url)
+
+    def _notify(self, event: RequestEvent):
+        for observer in self.observers:
+            observer(event)
+
+    def _timeouts(self, action: PorchAction) -> Timeouts:
+        if action.timeouts is not None:
+            return action.timeouts
+        return self.action_timeouts.get(action.action, self.timeouts)
+
+    def _http(self, validate_ca_cert: bool) -> httpx.AsyncClient:
+        client = self._clients.get(validate_ca_cert)
+        if client is None:
+            transport = self._transport or httpx.AsyncHTTPTransport(
+                verify=validate_ca_cert, limits=self._limits, retries=self._retries
+            )
+            client = httpx.AsyncClient(
+                transport=transport,
+                timeout=httpx.Timeout(
+                    self.timeouts.read, connect=self.timeouts.connect
+                ),
+                follow_redirects=True,
+            )
+            self._clients[validate_ca_cert] = client
+        return client
+
+
+def _next_batch(items: Iterator) -> list:
+    return list(islice(items, TASKS_BATCH_SIZE))
+
+
+async def _run_concurrently(
+    function: Callable, items: Iterable, max_workers: int
+) -> list[tuple]:
+    """Awaits the coroutine function for each item, at most `max_workers` at
+    a time. Returns a list of (item, result, exception) tuples in the order
+    of the items, see npg_porch_cli.bulk.run_concurrently.
+    """
+
+    if max_workers < 1:
+        raise ValueError("The number of workers should be a positive integer")
+
+    outcomes = {}
+    items_iter = enumerate(items)
+
+    async def worker():
+        # The iterator is shared by all workers. This is safe since the
+        # workers run in the same thread and only switch at 'await'.
+        for index, item in items_iter:
+            try:
+                outcomes[index] = (item, await function(item), None)
+            except Exception as e:
+                outcomes[index] = (item, None, e)
+
+    await asyncio.gather(*(worker() for _ in range(max_workers)))
+
+    return [outcomes[index] for index in range(len(outcomes))]
@@ -20,15 +20,51 @@
 
 import json
 import os
+from collections.abc import Iterable, Iterator
+from contextlib import closing
 from dataclasses import InitVar, asdict, dataclass, field
 from urllib.parse import urljoin
 
 import requests
 
-PORCH_OPENAPI_SCHEMA_URL = "api/v1/openapi.json"
-PORCH_TASK_STATUS_ENUM_NAME = "TaskStateEnum"
+from npg_porch_cli import profiling, serialization
+from npg_porch_cli._tasks import get_token  # noqa: F401 (re-exported)
+from npg_porch_cli._tasks import (
+    INITIAL_PORCH_STATUS,
+    batch_outcomes,
+    batches,
+    classify_add,
+    iter_all_tasks,
+    mark_known_tasks,
+    open_snapshot,
+    raise_for_status,
+    record_created,
+    request_headers,
+    skipped_error,
+    summarise,
+    task_matches,
+    tasks_query,
+)
+from npg_porch_cli.defaults import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+)
+from npg_porch_cli.exceptions import (  # noqa: F401 (re-exported)
+    AuthException,
+    CircuitOpenException,
+    ServerErrorException,
+)
+from npg_porch_cli.http_client import HttpClient, Timeouts, get_default_client
+from npg_porch_cli.schema import (  # noqa: F401 (re-exported)
+    PORCH_OPENAPI_SCHEMA_URL,
+    PORCH_TASK_STATUS_ENUM_NAME,
+    get_query_parameters,
+    get_task_statuses,
+    has_operation,
+)
+from npg_porch_cli.streaming import iter_json_array
 
-INITIAL_PORCH_STATUS = "PENDING"
 PORCH_STATUSES = [
     INITIAL_PORCH_STATUS,
     "CLAIMED",
@@ -38,17 +74,16 @@ PORCH_STATUSES = [
     "CANCELLED",
 ]
 
-CLIENT_TIMEOUT = (10, 60)
-
-NPG_PORCH_TOKEN_ENV_VAR = "NPG_PORCH_TOKEN"
-
+# Default (connect, read) timeouts, see npg_porch_cli.http_client.Timeouts
+# for setting timeouts per client or per action.
+CLIENT_TIMEOUT = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
 
-class AuthException(Exception):
-    pass
-
-
-class ServerErrorException(Exception):
-    pass
+PORCH_TASKS_PATH = "/tasks/"
+PORCH_TASKS_BATCH_PATH = "/tasks/batch"
+PORCH_TASKS_CLAIM_PATH = "/tasks/claim"
+TASKS_BATCH_SIZE = 500
+TASKS_PAGE_SIZE = 1000
+STREAM_CHUNK_SIZE = 65536
 
 
 @dataclass(kw_only=True)
@@ -71,20 +106,29 @@ class PorchAction:
     task_json: InitVar[str | None] = field(default=None, repr=False)
     task_input: dict = field(default=None)
     task_status: str | None = field(default=None)
+    task_inputs: Iterable[dict] | None = field(default=None, repr=False)
+    task_updates: Iterable[tuple[dict, str]] | None = field(default=None, repr=False)
+    concurrency: int = field(default=DEFAULT_CONCURRENCY)
+    num_tasks: int = field(default=1)
+    timeouts: Timeouts | None = field(default=None)
+    token: str | None = field(default=None, repr=False)
+    typed_results: bool = field(default=False)
+    snapshot_path: str | None = field(default=None)
 
     def __post_init__(self, task_json):
         "Post-constructor hook. Ensures integrity and validity of attributes."
 
-        if self.porch_url is None:
-            raise TypeError("'porch_url' attribute cannot be None")
+        with profiling.phase("action"):
+            if self.porch_url is None:
+                raise TypeError("'porch_url' attribute cannot be None")
 
-        if task_json is not None:
-            if self.task_input is not None:
-                raise ValueError("task_json and task_input cannot be both set")
-            self.task_input = json.loads(task_json)
+            if task_json is not None:
+                if self.task_input is not None:
+                    raise ValueError("task_json and task_input cannot be both set")
+                self.task_input = json.loads(task_json)
 
-        self._validate_action_name()
-        self.task_status = self._validate_status()
+            self._validate_action_name()
+            self.task_status = self._validate_status()
 
     def _validate_action_name(self):
         if self.action is None:
@@ -97,8 +141,10 @@ class PorchAction:
 
     def _validate_status(self) -> str | None:
         """
-        Retrieves OpenAPI schema for the porch server and validates the given
-        task status value against the values listed in the schema document.
+        Validates the given task status value against the values listed in
+        the OpenAPI schema document of the porch server. The schema is
+        retrieved via a cache, see npg_porch_cli.schema.SchemaCache, so it is
+        fetched from the server once rather than for every action.
 
         Returns a validated task status value. The case of this string can be
         different from the input string.
@@ -107,53 +153,27 @@ class PorchAction:
         if self.task_status is None:
             return None
 
-        url = urljoin(self.porch_url, PORCH_OPENAPI_SCHEMA_URL)
-        response = requests.request("GET", url, verify=self.validate_ca_cert)
-        if not response.ok:
-            raise ServerErrorException(
-                f"Failed to get OpenAPI Schema. "
-                f'Status code {response.status_code} "{response.reason}" '
-                f"received from {response.url}"
-            )
-
-        status = self.task_status.upper()
-        valid_statuses = []
-        error_message = f"Failed to get enumeration of valid statuses from {url}"
-        try:
-            valid_statuses = response.json()["components"]["schemas"][
-                PORCH_TASK_STATUS_ENUM_NAME
-            ]["enum"]
-        except Exception as e:
-            raise Exception(f"{error_message}: " + e.__str__())
-
-        if len(valid_statuses) == 0:
-            raise Exception(error_message)
-
-        if status not in valid_statuses:
-            raise ValueError(
-                f"Task status '{self.task_status}' is not valid. "
-                "Valid statuses: " + ", ".join(sorted(valid_statuses))
-            )
-
-        return status
-
+        valid_statuses = get_task_statuses(
+            porch_url=self.porch_url, validate_ca_cert=self.validate_ca_cert
+        )
+        return validate_task_status(self.task_status, valid_statuses)
 
-def get_token() -> str:
-    """Gets the value of the porch token from the environment variable.
 
-    If the NPG_PORCH_TOKEN is not defined or assigned to am empty string,
-    raises AuthException.
+def validate_task_status(task_status: str, valid_statuses: list[str]) -> str:
+    """Validates the task status value against the list of valid statuses.
 
-    Returns:
-      The token.
+    Returns a validated task status value. The case of this string can be
+    different from the input string.
     """
-    if NPG_PORCH_TOKEN_ENV_VAR not in os.environ:
-        raise AuthException("Authorization token is needed")
-    token = os.environ[NPG_PORCH_TOKEN_ENV_VAR]
-    if token == "":
-        raise AuthException("Authorization token is needed")
 
-    return token
+    status = task_status.upper()
+    if status not in valid_statuses:
+        raise ValueError(
+            f"Task status '{task_status}' is not valid. "
+            "Valid statuses: " + ", ".join(sorted(valid_statuses))
+        )
+
+    return status
 
 
 def list_client_actions() -> list[str]:
@@ -162,8 +182,17 @@ def list_client_actions() -> list[str]:
     return sorted(_PORCH_CLIENT_ACTIONS.keys())
 
 
+def list_streaming_actions() -> list[str]:
+    """Returns a sorted list of client actions which can be streamed."""
+
+    return sorted(_PORCH_STREAMING_ACTIONS.keys())
+
+
 def send(
-    action: PorchAction, pipeline: Pipeline = None, description: str | None = None
+    action: PorchAction,
+    pipeline: Pipeline = None,
+    description: str | None = None,
+    client: HttpClient | None = None,
 ) -> dict | list:
     """Sends a request to the porch API server.
 
@@ -180,6 +209,9 @@ def send(
         npg_porch_cli.api.Pipeline object
       description:
         A description for the new token, optional
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional. If not given,
+        a default shared client is used.
 
     Returns:
       The server's response is returned as a Python data structure.
@@ -187,19 +219,58 @@ def send(
 
     # Get function's definition and then call the function.
     function = _PORCH_CLIENT_ACTIONS[action.action]
+    with profiling.call(action.action):
+        if action.action == "list_pipelines":
+            return function(action=action, client=client)
+        elif action.action == "create_token":
+            return function(
+                action=action,
+                pipeline=pipeline,
+                description=description,
+                client=client,
+            )
+        return function(action=action, pipeline=pipeline, client=client)
+
+
+def stream(
+    action: PorchAction, pipeline: Pipeline = None, client: HttpClient | None = None
+) -> Iterator[dict]:
+    """Sends a list request to the porch API server and yields the listed
+    objects one at a time as they arrive.
+
+    Only list actions can be streamed, see list_streaming_actions.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object
+      pipeline:
+        npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Yields:
+      The objects listed by the server's response as Python data structures.
+    """
+
+    if action.action not in _PORCH_STREAMING_ACTIONS:
+        raise ValueError(
+            f"Action '{action.action}' cannot be streamed. "
+            "Valid actions: " + ", ".join(list_streaming_actions())
+        )
+    function = _PORCH_STREAMING_ACTIONS[action.action]
     if action.action == "list_pipelines":
-        return function(action=action)
-    elif action.action == "create_token":
-        return function(action=action, pipeline=pipeline, description=description)
-    return function(action=action, pipeline=pipeline)
+        return function(action=action, client=client)
+    return function(action=action, pipeline=pipeline, client=client)
 
 
-def list_pipelines(action: PorchAction) -> list:
+def list_pipelines(action: PorchAction, client: HttpClient | None = None) -> list:
     """Lists all pipelines registered with the porch server.
 
     Args:
       action:
         npg_porch_cli.api.PorchAction object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
         A list of dictionaries representing npg_porch_cli.api.Pipeline objects
@@ -208,12 +279,47 @@ def list_pipelines(action: PorchAction) -> list:
 
     return send_request(
         validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
+        url=urljoin(action.porch_url, "pipelines"),
+        method="GET",
+    )
+
+
+def iter_pipelines(
+    action: PorchAction, client: HttpClient | None = None
+) -> Iterator[dict]:
+    """Iterates over pipelines registered with the porch server.
+
+    Similar to list_pipelines, but the server's reply is streamed and decoded
+    incrementally.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Yields:
+      Dictionaries representing npg_porch_cli.api.Pipeline objects
+    """
+
+    yield from iter_request(
+        validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
         url=urljoin(action.porch_url, "pipelines"),
         method="GET",
     )
 
 
-def list_tasks(action: PorchAction, pipeline: Pipeline = None) -> list:
+def list_tasks(
+    action: PorchAction, pipeline: Pipeline = None, client: HttpClient | None = None
+) -> list:
     """Lists tasks.
 
     Args:
@@ -221,28 +327,133 @@ def list_tasks(action: PorchAction, pipeline: Pipeline = None) -> list:
         npg_porch_cli.api.PorchAction object
       pipeline:
         npg_porch_cli.api.Pipeline object, optional
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
       A list of Python objects, most likely dictionaries, representing registered
       tasks.
 
       If the pipeline argument is defined, only tasks belonging to this pipeline
-      are listed. Otherwise the list contains all tasks registered with the
-      porch server.
+      are listed. If the `task_status` attribute of the action is defined, only
+      tasks with this status are listed. Otherwise the list contains all tasks
+      registered with the porch server.
+
+      The filters are passed to the server as query parameters if the server
+      advertises them in its OpenAPI schema. If the server advertises `limit`
+      and `offset` parameters, the tasks are retrieved page by page. Any filter
+      the server cannot apply is applied to the server's response.
+
+      If the `typed_results` attribute of the action is set, the list contains
+      npg_porch_cli.records.Task objects, see iter_tasks. Records take less
+      memory but are slower to build than dictionaries.
     """
 
+    if action.typed_results:
+        return list(iter_tasks(action=action, pipeline=pipeline, client=client))
+
+    supported = get_query_parameters(
+        porch_url=action.porch_url,
+        method="GET",
+        path=PORCH_TASKS_PATH,
+        validate_ca_cert=action.validate_ca_cert,
+        client=client,
+    )
+    params, status_filtered, paginated = tasks_query(action, pipeline, supported)
+    url = urljoin(action.porch_url, "tasks")
+    pipeline_dict = asdict(pipeline) if pipeline is not None else None
+    status = None if status_filtered else action.task_status
+
+    if paginated:
+        response_obj = []
+        offset = 0
+        while True:
+            page = send_request(
+                validate_ca_cert=action.validate_ca_cert,
+                client=client,
+                timeouts=_timeouts(action, client),
+                token=action.token,
+                operation=action.action,
+                url=url,
+                method="GET",
+                params=params | {"limit": TASKS_PAGE_SIZE, "offset": offset},
+            )
+            response_obj.extend(
+                o for o in page if task_matches(o, pipeline_dict, status)
+            )
+            if len(page) < TASKS_PAGE_SIZE:
+                break
+            offset += len(page)
+        return response_obj
+
     response_obj = send_request(
         validate_ca_cert=action.validate_ca_cert,
-        url=urljoin(action.porch_url, "tasks"),
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
+        url=url,
+        method="GET",
+        params=params or None,
+    )
+    if pipeline_dict is None and status is None:
+        return response_obj
+    return [o for o in response_obj if task_matches(o, pipeline_dict, status)]
+
+
+def iter_tasks(
+    action: PorchAction, pipeline: Pipeline = None, client: HttpClient | None = None
+) -> Iterator:
+    """Iterates over tasks.
+
+    Similar to list_tasks, but the server's reply is streamed and decoded
+    incrementally. Tasks are yielded one at a time as they arrive, so memory
+    usage does not depend on the number of tasks.
+
+    If the `typed_results` attribute of the action is set, tasks are yielded
+    as npg_porch_cli.records.Task objects. Records yielded by one call share
+    a single Pipeline object per distinct pipeline and are filtered by
+    comparing this object rather than the pipeline dictionary of each task.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Yields:
+      Dictionaries or, in the typed mode, Task records representing registered
+      tasks.
+    """
+
+    supported = get_query_parameters(
+        porch_url=action.porch_url,
         method="GET",
+        path=PORCH_TASKS_PATH,
+        validate_ca_cert=action.validate_ca_cert,
+        client=client,
     )
-    if pipeline is not None:
-        pipeline_dict = asdict(pipeline)
-        response_obj = [o for o in response_obj if o["pipeline"] == pipeline_dict]
-    return response_obj
+    params, status_filtered, paginated = tasks_query(action, pipeline, supported)
+    status = None if status_filtered else action.task_status
+    tasks = iter_all_tasks(action, client, params, paginated)
+
+    if action.typed_results:
+        from npg_porch_cli.records import select_tasks
 
+        yield from select_tasks(tasks, pipeline=pipeline, status=status)
+        return
 
-def add_pipeline(action: PorchAction, pipeline: Pipeline) -> dict:
+    pipeline_dict = asdict(pipeline) if pipeline is not None else None
+    for task in tasks:
+        if task_matches(task, pipeline_dict, status):
+            yield task
+
+
+def add_pipeline(
+    action: PorchAction, pipeline: Pipeline, client: HttpClient | None = None
+) -> dict:
     """Registers a new pipeline with the porch server.
 
     Args:
@@ -250,6 +461,8 @@ def add_pipeline(action: PorchAction, pipeline: Pipeline) -> dict:
         npg_porch_cli.api.PorchAction object
       pipeline:
         npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
       A dictionary representing npg_porch_cli.api.Pipeline object
@@ -257,13 +470,17 @@ def add_pipeline(action: PorchAction, pipeline: Pipeline) -> dict:
 
     return send_request(
         validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
         method="POST",
         url=urljoin(action.porch_url, "pipelines"),
-        data=asdict(pipeline),
+        data=pipeline,
     )
 
 
-def add_task(action: PorchAction, pipeline: Pipeline):
+def add_task(action: PorchAction, pipeline: Pipeline, client: HttpClient | None = None):
     """Registers a new task with the porch server.
 
     Args:
@@ -271,6 +488,8 @@ def add_task(action: PorchAction, pipeline: Pipeline):
         npg_porch_cli.api.PorchAction object
       pipeline:
         npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
       A dictionary representing the new task. The status of the new task is
@@ -281,38 +500,191 @@ def add_task(action: PorchAction, pipeline: Pipeline):
         raise TypeError(f"task_input cannot be None for action '{action.action}'")
     return send_request(
         validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
         url=urljoin(action.porch_url, "tasks"),
         method="POST",
         data={
-            "pipeline": asdict(pipeline),
+            "pipeline": pipeline,
             "task_input": action.task_input,
             "status": INITIAL_PORCH_STATUS,
         },
     )
 
 
-def claim_task(action: PorchAction, pipeline: Pipeline):
+def add_tasks(
+    action: PorchAction, pipeline: Pipeline, client: HttpClient | None = None
+) -> dict:
+    """Registers many new tasks with the porch server.
+
+    The tasks are taken from the `task_inputs` attribute of the action, which
+    can be any iterable of task inputs, for example, a generator reading a
+    file line by line. If the server advertises a batch endpoint, the tasks
+    are sent in batches. Otherwise the tasks are sent one per request, up to
+    `concurrency` requests at a time. Failure to register a task does not
+    stop registration of other tasks. If the server rejects a batch, its
+    tasks are sent one by one. If a batch cannot be sent, for example,
+    because of a connection error or a timeout, its tasks are reported as
+    failed and the remaining batches are sent.
+
+    Task inputs are compared by their canonical hash, see
+    npg_porch_cli.canonical, and repeated task inputs are not sent to the
+    server. If the `snapshot_path` attribute of the action is set, task
+    inputs of tasks of the pipeline found in this snapshot, see
+    snapshot_tasks, are not sent either, and created tasks are added to the
+    snapshot.
+
+    To reuse connections to the server, the connection pool of the client
+    should not be smaller than the `concurrency` attribute of the action.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object
+      pipeline:
+        npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Returns:
+      A dictionary with the number of tasks that have been created
+      ('created'), that had already existed on the server or in the snapshot
+      ('existed'), that failed to be registered ('failed') and that repeat
+      a preceding task input ('duplicate'), and a list of per-task results
+      ('tasks') in the order of the task inputs. Each per-task result is a
+      dictionary with the 'task_input' and 'result' keys, failed results also
+      have the 'error' key.
+    """
+
+    if action.task_inputs is None:
+        raise TypeError(f"task_inputs cannot be None for action '{action.action}'")
+
+    # Imported here to keep the thread pool machinery off the start-up path
+    # of the CLI client for single-task actions.
+    from npg_porch_cli.bulk import run_concurrently
+
+    def new_task(task_input) -> dict:
+        return {
+            "pipeline": pipeline,
+            "task_input": task_input,
+            "status": INITIAL_PORCH_STATUS,
+        }
+
+    def add(item: tuple):
+        task_input, skipped = item
+        if skipped is not None:
+            raise skipped_error(skipped)
+        return send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            client=client,
+            timeouts=_timeouts(action, client),
+            token=action.token,
+            operation=action.action,
+            url=urljoin(action.porch_url, "tasks"),
+            method="POST",
+            data=new_task(task_input),
+        )
+
+    def add_batch(items: list[tuple]) -> list[tuple]:
+        task_inputs = [task_input for task_input, skipped in items if skipped is None]
+        try:
+            if task_inputs:
+                send_request(
+                    validate_ca_cert=action.validate_ca_cert,
+                    client=client,
+                    timeouts=_timeouts(action, client),
+                    token=action.token,
+                    operation=action.action,
+                    url=urljoin(action.porch_url, PORCH_TASKS_BATCH_PATH.lstrip("/")),
+                    method="POST",
+                    data=[new_task(task_input) for task_input in task_inputs],
+                )
+        except ServerErrorException:
+            # Fall back to adding tasks one by one to find out the outcome
+            # for each of them.
+            return list(run_concurrently(add, items, action.concurrency))
+        except (requests.exceptions.RequestException, CircuitOpenException) as e:
+            return batch_outcomes(items, e)
+        return batch_outcomes(items)
+
+    with open_snapshot(action) as snapshot:
+        items = mark_known_tasks(action.task_inputs, pipeline, snapshot)
+        if has_operation(
+            porch_url=action.porch_url,
+            method="POST",
+            path=PORCH_TASKS_BATCH_PATH,
+            validate_ca_cert=action.validate_ca_cert,
+            client=client,
+        ):
+            outcomes = (
+                outcome
+                for batch in batches(items, TASKS_BATCH_SIZE)
+                for outcome in add_batch(batch)
+            )
+        else:
+            outcomes = run_concurrently(add, items, action.concurrency)
+
+        summary = summarise(
+            outcomes,
+            success="created",
+            failures=("existed", "failed", "duplicate"),
+            classify=classify_add,
+            describe=lambda item: {"task_input": item[0]},
+        )
+        record_created(snapshot, action, pipeline, summary)
+
+    return summary
+
+
+def claim_task(
+    action: PorchAction, pipeline: Pipeline, client: HttpClient | None = None
+):
     """Claims a task that belongs to the pipeline.
 
+    If the `num_tasks` attribute of the action is greater than one and the
+    server advertises the `num_tasks` parameter of the claim endpoint, up to
+    this number of tasks is claimed.
+
     Args:
       action:
         npg_porch_cli.api.PorchAction object
       pipeline:
         npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
-      A dictionary representing the claimed task.
+      A list of dictionaries representing the claimed tasks. The list is
+      empty if there are no tasks to claim.
     """
 
+    params = None
+    if action.num_tasks > 1 and "num_tasks" in get_query_parameters(
+        porch_url=action.porch_url,
+        method="POST",
+        path=PORCH_TASKS_CLAIM_PATH,
+        validate_ca_cert=action.validate_ca_cert,
+        client=client,
+    ):
+        params = {"num_tasks": action.num_tasks}
+
     return send_request(
         validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
         url=urljoin(action.porch_url, "tasks/claim"),
         method="POST",
-        data=asdict(pipeline),
+        data=pipeline,
+        params=params,
     )
 
 
-def update_task(action: PorchAction, pipeline: Pipeline):
+def update_task(
+    action: PorchAction, pipeline: Pipeline, client: HttpClient | None = None
+):
     """Updates the status of an existing task.
 
     Args:
@@ -320,6 +692,8 @@ def update_task(action: PorchAction, pipeline: Pipeline):
         npg_porch_cli.api.PorchAction object
       pipeline:
         npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
       A dictionary representing the updated task.
@@ -331,17 +705,94 @@ def update_task(action: PorchAction, pipeline: Pipeline):
         raise TypeError(f"task_status cannot be None for action '{action.action}'")
     return send_request(
         validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
         url=urljoin(action.porch_url, "tasks/"),
         method="PUT",
         data={
-            "pipeline": asdict(pipeline),
+            "pipeline": pipeline,
             "task_input": action.task_input,
             "status": action.task_status,
         },
     )
 
 
-def create_token(action: PorchAction, pipeline: Pipeline, description: str):
+def update_tasks(
+    action: PorchAction, pipeline: Pipeline, client: HttpClient | None = None
+) -> dict:
+    """Updates the status of many existing tasks.
+
+    The updates are taken from the `task_updates` attribute of the action,
+    which can be any iterable of (task_input, task_status) pairs. All
+    statuses are validated against the server's schema, which is retrieved
+    once. The tasks are updated up to `concurrency` requests at a time.
+    Failure to update a task does not stop updating other tasks.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object
+      pipeline:
+        npg_porch_cli.api.Pipeline object
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Returns:
+      A dictionary with the number of tasks that have been updated ('updated')
+      and that failed to be updated ('failed'), and a list of per-task results
+      ('tasks') in the order of the updates. Each per-task result is a
+      dictionary with the 'task_input', 'status' and 'result' keys, failed
+      results also have the 'error' key.
+    """
+
+    if action.task_updates is None:
+        raise TypeError(f"task_updates cannot be None for action '{action.action}'")
+
+    from npg_porch_cli.bulk import run_concurrently
+
+    url = urljoin(action.porch_url, "tasks/")
+    valid_statuses = get_task_statuses(
+        porch_url=action.porch_url,
+        validate_ca_cert=action.validate_ca_cert,
+        client=client,
+    )
+
+    def update(task_update: tuple):
+        task_input, task_status = task_update
+        return send_request(
+            validate_ca_cert=action.validate_ca_cert,
+            client=client,
+            timeouts=_timeouts(action, client),
+            token=action.token,
+            operation=action.action,
+            url=url,
+            method="PUT",
+            data={
+                "pipeline": pipeline,
+                "task_input": task_input,
+                "status": validate_task_status(task_status, valid_statuses),
+            },
+        )
+
+    return summarise(
+        run_concurrently(update, action.task_updates, action.concurrency),
+        success="updated",
+        failures=("failed",),
+        classify=lambda exception: "failed",
+        describe=lambda task_update: {
+            "task_input": task_update[0],
+            "status": task_update[1],
+        },
+    )
+
+
+def create_token(
+    action: PorchAction,
+    pipeline: Pipeline,
+    description: str,
+    client: HttpClient | None = None,
+):
     """Creates a new token for the pipeline.
 
     Args:
@@ -351,6 +802,8 @@ def create_token(action: PorchAction, pipeline: Pipeline, description: str):
         npg_porch_cli.api.Pipeline object
       description:
         A short token description
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
 
     Returns:
       A dictionary containing a new token.
@@ -361,19 +814,99 @@ def create_token(action: PorchAction, pipeline: Pipeline, description: str):
 
     return send_request(
         validate_ca_cert=action.validate_ca_cert,
+        client=client,
+        timeouts=_timeouts(action, client),
+        token=action.token,
+        operation=action.action,
         url=urljoin(action.porch_url, f"pipelines/{pipeline.name}/token/{description}"),
         method="POST",
     )
 
 
+def snapshot_tasks(
+    action: PorchAction, pipeline: Pipeline = None, client: HttpClient | None = None
+) -> dict:
+    """Saves tasks listed by the server to a local snapshot file or updates
+    the existing snapshot, see npg_porch_cli.snapshot.TaskSnapshot.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object with the `snapshot_path`
+        attribute set to the path of the snapshot file.
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional. If given, only tasks of
+        this pipeline are saved or updated.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Returns:
+      A dictionary with the refresh mode, 'full' or 'incremental', the number
+      of tasks retrieved from the server and the number of tasks in the
+      snapshot.
+    """
+
+    from npg_porch_cli.snapshot import TaskSnapshot
+
+    if action.snapshot_path is None:
+        raise TypeError(f"snapshot_path cannot be None for action '{action.action}'")
+    with TaskSnapshot(action.snapshot_path) as snapshot:
+        return snapshot.refresh(action=action, pipeline=pipeline, client=client)
+
+
+def query_tasks(
+    action: PorchAction, pipeline: Pipeline = None, client: HttpClient | None = None
+) -> list:
+    """Lists tasks saved in a local snapshot file by the snapshot action.
+    No requests are sent to the server, except for retrieving the server's
+    schema to validate the task status.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object with the `snapshot_path`
+        attribute set to the path of the snapshot file.
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional, not used
+
+    Returns:
+      A list of dictionaries representing tasks. If the pipeline argument is
+      defined, only tasks of this pipeline are listed. If the `task_status`
+      attribute of the action is defined, only tasks with this status are
+      listed. If the `task_input` attribute of the action is defined, only
+      tasks with this task input are listed.
+    """
+
+    from npg_porch_cli.snapshot import TaskSnapshot
+
+    if action.snapshot_path is None:
+        raise TypeError(f"snapshot_path cannot be None for action '{action.action}'")
+    if not os.path.exists(action.snapshot_path):
+        raise ValueError(f"Snapshot '{action.snapshot_path}' does not exist")
+    with TaskSnapshot(action.snapshot_path) as snapshot:
+        snapshot.check_server(action.porch_url)
+        return snapshot.query(
+            pipeline=pipeline, status=action.task_status, task_input=action.task_input
+        )
+
+
 _PORCH_CLIENT_ACTIONS = {
     "list_tasks": list_tasks,
     "list_pipelines": list_pipelines,
     "add_pipeline": add_pipeline,
     "add_task": add_task,
+    "add_tasks": add_tasks,
     "claim_task": claim_task,
     "update_task": update_task,
+    "update_tasks": update_tasks,
     "create_token": create_token,
+    "snapshot": snapshot_tasks,
+    "query": query_tasks,
+}
+
+_PORCH_STREAMING_ACTIONS = {
+    "list_tasks": iter_tasks,
+    "list_pipelines": iter_pipelines,
 }
 
 
@@ -381,8 +914,13 @@ def send_request(
     validate_ca_cert: bool,
     url: str,
     method: str,
-    data: dict | None = None,
+    data: dict | list | Pipeline | None = None,
     auth_type: str | None = "token",
+    client: HttpClient | None = None,
+    params: dict | None = None,
+    timeouts: Timeouts | None = None,
+    token: str | None = None,
+    operation: str | None = None,
 ):
     """Sends an HTTP request to a JSON API web service.
 
@@ -399,13 +937,31 @@ def send_request(
       method:
         The HTTP method to use (GET, POST, etc.)
       data:
-        Optional payload for the request as a Python object.
+        Optional payload for the request as a Python object. Dataclass
+        objects, for example, Pipeline objects, are encoded as JSON objects,
+        see npg_porch_cli.serialization.
       auth_type:
         Authorization type, defaults to 'token'. If no authorization
         is required, set the value explicitly to None. Only the token
         type authorization is implemented at the moment. For this type
-        of authorization to work, set NPG_PORCH_TOKEN environment
-        variable.
+        of authorization to work, either set NPG_PORCH_TOKEN environment
+        variable or pass the token explicitly.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional. The client's
+        pooled session is used to send the request. If not given, a default
+        shared client is used so that connections to the server are reused
+        between calls.
+      params:
+        Optional query parameters for the request as a dictionary.
+      timeouts:
+        npg_porch_cli.http_client.Timeouts object, optional. If not given,
+        the default timeouts of the client are used.
+      token:
+        The authorization token, optional. If not given, the value of the
+        NPG_PORCH_TOKEN environment variable is used.
+      operation:
+        The name of the operation the request is sent for, optional, see
+        npg_porch_cli.http_client.HttpClient.request.
 
     Example:
 
@@ -426,40 +982,105 @@ def send_request(
       Server's decoded reply.
     """
 
-    headers = {
-        "Content-Type": "application/json",
-        "Accept": "application/json",
-    }
-    if auth_type is not None:
-        if auth_type == "token":
-            headers["Authorization"] = "Bearer " + get_token()
-        else:
-            raise ValueError(f"Authorization type {auth_type} is not implemented")
+    with profiling.call(operation):
+        response = _send(
+            validate_ca_cert=validate_ca_cert,
+            url=url,
+            method=method,
+            data=data,
+            auth_type=auth_type,
+            client=client,
+            params=params,
+            timeouts=timeouts,
+            token=token,
+            operation=operation,
+        )
+        with profiling.phase("decode"):
+            return serialization.loads(response.content)
+
 
+def iter_request(
+    validate_ca_cert: bool,
+    url: str,
+    method: str,
+    data: dict | list | Pipeline | None = None,
+    auth_type: str | None = "token",
+    client: HttpClient | None = None,
+    params: dict | None = None,
+    timeouts: Timeouts | None = None,
+    token: str | None = None,
+    operation: str | None = None,
+) -> Iterator:
+    """Sends an HTTP request to a JSON API web service and yields elements of
+    the JSON array the service replies with.
+
+    The reply is read from the network and decoded incrementally, so it is
+    never held in memory in full. Arguments are the same as for send_request.
+
+    Raises ServerErrorException if the status code of the response is not
+    in the 200 – 299 range.
+    """
+
+    response = _send(
+        validate_ca_cert=validate_ca_cert,
+        url=url,
+        method=method,
+        data=data,
+        auth_type=auth_type,
+        client=client,
+        params=params,
+        timeouts=timeouts,
+        token=token,
+        operation=operation,
+        stream=True,
+    )
+    with closing(response):
+        yield from iter_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+
+
+def _send(
+    validate_ca_cert: bool,
+    url: str,
+    method: str,
+    data: dict | list | Pipeline | None,
+    auth_type: str | None,
+    client: HttpClient | None,
+    params: dict | None,
+    timeouts: Timeouts | None = None,
+    token: str | None = None,
+    operation: str | None = None,
+    stream: bool = False,
+    headers: dict | None = None,
+):
     request_args = {
-        "headers": headers,
-        "timeout": CLIENT_TIMEOUT,
+        "headers": request_headers(auth_type, token) | (headers or {}),
+        "timeouts": timeouts,
+        "operation": operation,
         "verify": validate_ca_cert,
     }
     if data is not None:
-        request_args["json"] = data
+        with profiling.phase("encode"):
+            request_args["data"] = serialization.dumps(data)
+    if params is not None:
+        request_args["params"] = params
+    if stream:
+        request_args["stream"] = True
 
-    response = requests.request(method, url, **request_args)
-    if not response.ok:
-        detail = ""
-        try:
-            data = response.json()
-            if "detail" in data:
-                detail = data["detail"]
-        except Exception:
-            pass
-
-        message = (
-            f'Status code {response.status_code} "{response.reason}" '
-            f"received from {response.url}"
-        )
-        if detail:
-            message += f".\nDetail: {detail}"
-        raise ServerErrorException(message)
+    if client is None:
+        client = get_default_client()
+    response = client.request(method, url, **request_args)
+    raise_for_status(response)
+
+    return response
+
+
+def _timeouts(action: PorchAction, client: HttpClient | None) -> Timeouts:
+    """Returns timeouts for the action, either set for the action itself or
+    configured for this kind of action in the client.
+    """
 
-    return response.json()
+    if action.timeouts is not None:
+        return action.timeouts
+    if client is None:
+        client = get_default_client()
+    return client.timeouts_for(action.action)
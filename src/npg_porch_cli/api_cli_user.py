@@ -21,8 +21,37 @@
 
 import argparse
 import json
+import os
+import sys
 
-from npg_porch_cli.api import Pipeline, PorchAction, list_client_actions, send
+from npg_porch_cli.defaults import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_WATCH_INTERVAL,
+    NPG_PORCH_TOKEN_ENV_VAR,
+)
+
+# Names of the actions of npg_porch_cli.api. They are listed here rather than
+# retrieved from the api module, which loads the HTTP client stack, so that
+# the arguments are parsed and checked without importing it. The api module
+# and other heavy modules are imported only once an action is run.
+_CLIENT_ACTIONS = (
+    "add_pipeline",
+    "add_task",
+    "add_tasks",
+    "claim_task",
+    "create_token",
+    "list_pipelines",
+    "list_tasks",
+    "query",
+    "snapshot",
+    "update_task",
+    "update_tasks",
+)
+_STREAMING_ACTIONS = ("list_pipelines", "list_tasks")
+_BULK_ACTIONS = ("add_tasks", "update_tasks")
+_SNAPSHOT_ACTIONS = ("query", "snapshot")
 
 
 def run():
@@ -45,15 +74,26 @@ def run():
         add_pipeline
         create_token
         add_task
+        add_tasks
         claim_task
         update_task
+        update_tasks
+        snapshot
+        query
+
+    In addition to client actions, the following commands are available:
+        batch
+        daemon
+        watch
+        worker
 
     Though most of named arguments are optional, some actions require
     certain combinations of arguments to be defined.
 
     All list actions do not require any optional arguments defined. If
     `--pipeline_name` is defined, `list_tasks` returns a list of tasks for
-    this pipeline, otherwise all registered tasks are returned.
+    this pipeline, otherwise all registered tasks are returned. If `--status`
+    is defined, `list_tasks` returns only tasks with this status.
 
     All non-list actions require `--pipeline`, `pipeline_url` and
     `--pipeline_version` defined.
@@ -62,8 +102,133 @@ def run():
     be defined. In addition to this, for the `update_task` action `--status`
     should be defined.
 
+    The `add_tasks` action requires the `--tasks_file` to be defined. The
+    file should contain one task definition JSON per line. To read the task
+    definitions from STDIN, set `--tasks_file` to `-`. Up to `--concurrency`
+    tasks are registered at a time. Repeated task definitions are sent once.
+    If `--snapshot_file` is defined, tasks found in this snapshot, see the
+    `snapshot` action, are not sent, and created tasks are added to it.
+
+    The `update_tasks` action also requires the `--tasks_file`. If `--status`
+    is defined, the file should contain one task definition JSON per line and
+    all tasks are updated to this status. Otherwise each line should be a JSON
+    object with `task_input` and `status` keys, for example,
+    `{"task_input": {"id_run": 409}, "status": "CANCELLED"}`.
+
+    The `claim_task` action claims up to `--num_tasks` tasks, one by default.
+
+    The `snapshot` action saves tasks listed by the server, all tasks or, if
+    `--pipeline` is defined, tasks of this pipeline, to a local SQLite file,
+    `--snapshot_file`, or updates the existing file. Only tasks modified
+    since the previous snapshot are retrieved if the server supports it.
+    The `query` action lists tasks from the `--snapshot_file` without
+    listing them on the server, filtered by the pipeline, `--status` and the
+    task input, `--task_json`, if these options are defined.
+
+    The `worker` command claims tasks of the pipeline and runs the
+    `--command` for each of them, up to `--concurrency` tasks at a time.
+    The task JSON is passed to the command on its STDIN. The task status is
+    set to RUNNING before the command starts and to DONE or FAILED depending
+    on the command's exit code. The worker runs until interrupted, until
+    `--max_tasks` tasks have been claimed, or, if `--exit_when_idle` is set,
+    until there is nothing left to claim.
+
+    The `watch` command polls the server for changes of tasks every
+    `--interval` seconds and prints a line of JSON with the `task`, its
+    `status` and its `previous_status` for every task which is new or whose
+    status has changed since the previous poll. If `--pipeline` is defined,
+    only tasks of this pipeline are watched; if `--status` is defined, only
+    changes to this status are printed. Existing tasks are not printed. The
+    command runs until interrupted or until `--max_polls` polls have been
+    made. Only tasks modified since the previous poll are listed if the
+    server supports it, and listings which have not changed are not sent
+    again if the server supports conditional requests.
+
+    The `batch` command executes a stream of actions read from the
+    `--commands_file`, STDIN by default, one JSON command per line, for
+    example,
+    `{"action": "update_task", "pipeline": {"name": "p1", "uri": "https://p1.com",
+    "version": "1.0"}, "task_input": {"id_run": 409}, "status": "DONE"}`.
+    `--base_url`, the pipeline options and other common options, if given,
+    are used for commands which do not define them. All actions are sent
+    over one pooled session. A result record is printed for each command as
+    a line of JSON with the position of the command (`index`), its `id`,
+    if given, and either the `result` or the `error`. Commands are executed
+    one at a time unless `--concurrency` is set. Results are printed in the
+    order of the commands unless `--unordered` is set. The exit code is 1
+    if any command failed.
+
+    The `daemon` command runs a local daemon, which listens on a Unix domain
+    socket and keeps a warm connection to the server and a cached copy of the
+    server's schema. While the daemon is running, the client forwards all
+    actions except bulk actions, `snapshot`, `query` and streamed listings
+    to it, and falls back to sending the action directly if the daemon is
+    not running. The socket path is given by the NPG_PORCH_DAEMON_SOCKET
+    environment variable and defaults to a per-user socket in
+    XDG_RUNTIME_DIR or in a private directory in /tmp. Actions are forwarded
+    only if the socket and its directory belong to the user and are not
+    accessible to others. The daemon does not need `--base_url`; it exits on
+    SIGTERM or, if `--idle_timeout` is set, after this number of seconds
+    without requests. Forwarded actions carry the caller's NPG_PORCH_TOKEN;
+    if it is not set, the daemon's token is used.
+
     The `create_token` action requires that the `--description` is defined.
 
+    For list actions, the `--stream` option prints out listed objects one
+    per line as they are received from the server, rather than a single
+    JSON array once the whole reply has been received.
+
+    The server's reply is printed as JSON indented by two spaces. The
+    `--compact` option prints it on a single line, which is faster and
+    smaller for long listings.
+
+    The `--connect_timeout` and `--read_timeout` options set the time in
+    seconds to wait for a connection to the server and for the server's
+    reply. The `--deadline` option sets the overall time limit for each
+    request to the server, including retries of the failed request.
+
+    The `--rate_limit` option sets the maximum number of requests per second
+    sent to the server and the `--max_in_flight` option the maximum number
+    of requests in flight at any time. If `--throttle_dir` is set, these
+    limits are shared by all processes on the host which use the same
+    directory, for example, by many jobs updating tasks in parallel.
+    Actions are not forwarded to the daemon when limits are set; the daemon
+    command applies the limits to all actions forwarded to it.
+
+    The `--circuit_breaker` option stops sending requests to the server for
+    30 seconds once at least half of at least 5 requests within a minute have
+    failed or taken longer than 30 seconds, see npg_porch_cli.breaker, and
+    then sends a trial request. Requests which are not sent fail at once.
+    The worker waits for the server to recover rather than exiting. The
+    option is useful for long-running commands. Actions are not forwarded to
+    the daemon when this option is set.
+
+    Replies of the server are compressed if the server supports it. The
+    `--compress_requests` option also compresses large request bodies, for
+    example, of bulk actions, with gzip; the server should accept compressed
+    requests. The `--response_cache` option keeps replies to list actions in
+    memory and requests them again only if they have changed, if the server
+    supports conditional requests. It is useful for long-running commands,
+    for example, for the daemon. Actions are not forwarded to the daemon when
+    either of these options is set.
+
+    The `--stats` option prints metrics of the requests sent to the server,
+    the number of requests, their latency, the number of bytes sent and
+    received, retries and errors per action and status code, to STDERR once
+    the action or command has finished. The metrics are printed as JSON or,
+    with `--stats prometheus`, in the Prometheus text format. Actions are
+    not forwarded to the daemon when `--stats` is set; for the daemon
+    command, the metrics are printed when the daemon exits.
+
+    The `--profile` option prints a breakdown of the time spent in calls to
+    the server by phase (action validation, JSON encoding, DNS, connect,
+    TLS, sending the request, waiting for the server, download, decoding)
+    to STDERR on exit; with `--profile calls` a line is also printed for
+    every call. `--profile_dump FILE` profiles the client with cProfile and
+    writes the statistics to the file. Profiling can also be enabled without
+    the CLI options, see npg_porch_cli.profiling. Actions are not forwarded
+    to the daemon when profiling is enabled.
+
     NPG_PORCH_TOKEN environment variable should be set to the value of
     either an admin or project-specific token.
 
@@ -78,9 +243,11 @@ def run():
         "action",
         type=str,
         help="Action to send to npg_porch server API",
-        choices=list_client_actions(),
+        choices=list(_CLIENT_ACTIONS) + sorted(_CLI_COMMANDS),
+    )
+    parser.add_argument(
+        "--base_url", type=str, help="Base URL, required for all but the daemon"
     )
-    parser.add_argument("--base_url", type=str, required=True, help="Base URL")
     parser.add_argument(
         "--validate_ca_cert",
         action=argparse.BooleanOptionalAction,
@@ -100,23 +267,311 @@ def run():
     xor_options.add_argument(
         "--task_file", type=str, help="A Porch task written to disk in JSON format"
     )
-    parser.add_argument("--status", type=str, help="New status to set, optional")
+    xor_options.add_argument(
+        "--tasks_file",
+        type=str,
+        help="A file with one Porch task JSON per line, '-' for STDIN, optional",
+    )
+    parser.add_argument(
+        "--status",
+        type=str,
+        help="New status to set or, for list_tasks, status to filter by, optional",
+    )
     parser.add_argument("--description", type=str, help="Token description, optional")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        help="The number of concurrent requests for bulk actions, "
+        f"defaults to {DEFAULT_CONCURRENCY}, and for batch, defaults to 1",
+    )
+    parser.add_argument(
+        "--num_tasks",
+        type=int,
+        default=1,
+        help="The number of tasks to claim, defaults to 1",
+    )
+    parser.add_argument(
+        "--command",
+        type=str,
+        help="For the worker, a command to run for each claimed task",
+    )
+    parser.add_argument(
+        "--max_tasks",
+        type=int,
+        help="For the worker, the maximum number of tasks to claim, optional",
+    )
+    parser.add_argument(
+        "--exit_when_idle",
+        action="store_true",
+        help="For the worker, exit when there are no tasks to claim",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        help="For watch, time in seconds between polls, "
+        f"defaults to {DEFAULT_WATCH_INTERVAL}",
+    )
+    parser.add_argument(
+        "--max_polls",
+        type=int,
+        help="For watch, the maximum number of polls, optional",
+    )
+    parser.add_argument(
+        "--snapshot_file",
+        type=str,
+        help="For snapshot and query, the path of the SQLite snapshot file",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="For list actions, print one JSON object per line as it arrives",
+    )
+
+    parser.add_argument(
+        "--connect_timeout",
+        type=float,
+        help="Time in seconds to wait for a connection, "
+        f"defaults to {DEFAULT_CONNECT_TIMEOUT}",
+    )
+    parser.add_argument(
+        "--read_timeout",
+        type=float,
+        help="Time in seconds to wait for the server's reply, "
+        f"defaults to {DEFAULT_READ_TIMEOUT}",
+    )
+    parser.add_argument(
+        "--deadline",
+        type=float,
+        help="Overall time limit in seconds for each request, including "
+        "retries, optional",
+    )
+
+    parser.add_argument(
+        "--rate_limit",
+        type=float,
+        help="The maximum number of requests per second, optional",
+    )
+    parser.add_argument(
+        "--max_in_flight",
+        type=int,
+        help="The maximum number of concurrent requests, optional",
+    )
+    parser.add_argument(
+        "--throttle_dir",
+        type=str,
+        help="A directory for sharing --rate_limit and --max_in_flight "
+        "between processes on this host, optional",
+    )
+
+    parser.add_argument(
+        "--circuit_breaker",
+        action="store_true",
+        help="Stop sending requests to the server for a while when most of "
+        "the recent requests have failed",
+    )
+
+    parser.add_argument(
+        "--response_cache",
+        action="store_true",
+        help="Keep replies to list actions and revalidate them with "
+        "conditional requests",
+    )
+    parser.add_argument(
+        "--compress_requests",
+        action="store_true",
+        help="Compress large request bodies with gzip, the server should "
+        "accept compressed requests",
+    )
+
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Print the server's reply as JSON on a single line",
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="json",
+        choices=["json", "prometheus"],
+        help="Print request metrics to STDERR on exit, as JSON by default",
+    )
+
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="summary",
+        choices=["summary", "calls"],
+        help="Print a breakdown of time spent in calls to the server to STDERR, "
+        "a summary on exit by default or also for every call",
+    )
+    parser.add_argument(
+        "--profile_dump",
+        type=str,
+        help="Profile the client with cProfile and write the statistics to "
+        "this file",
+    )
+
+    parser.add_argument(
+        "--commands_file",
+        type=str,
+        default="-",
+        help="For batch, a file with one JSON command per line, STDIN by default",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="For batch, print results as soon as they are available",
+    )
+    parser.add_argument(
+        "--idle_timeout",
+        type=float,
+        help="For the daemon, exit after this number of seconds without requests",
+    )
 
     args = parser.parse_args()
+    if args.base_url is None and args.action not in ("batch", "daemon"):
+        parser.error("the following arguments are required: --base_url")
+    if args.stream and args.action not in _STREAMING_ACTIONS:
+        parser.error(
+            "--stream is only valid for actions: " + ", ".join(_STREAMING_ACTIONS)
+        )
 
+    if args.stats is None and not _profiled(args):
+        _run(parser, args)
+        return
+
+    profiler = None
+    if _profiled(args):
+        from npg_porch_cli import profiling
+
+        profiler = profiling.enable(
+            per_call=args.profile == "calls", dump_path=args.profile_dump
+        )
+    registry = None
+    if args.stats is not None:
+        from npg_porch_cli.http_client import get_default_client
+        from npg_porch_cli.metrics import get_registry
+
+        registry = get_registry()
+        observers = get_default_client().observers
+        if registry not in observers:
+            observers.append(registry)
+    try:
+        _run(parser, args)
+    finally:
+        if registry is not None:
+            print(registry.dump(args.stats).rstrip("\n"), file=sys.stderr)
+        if profiler is not None:
+            profiling.disable()
+            if args.profile is not None:
+                print(profiler.report(), file=sys.stderr)
+
+
+def _run(parser, args):
+    """Runs the action or command, prints out the result."""
+
+    throttle = _throttle(args)
+    if (
+        throttle is not None
+        or args.circuit_breaker
+        or args.response_cache
+        or args.compress_requests
+    ):
+        from npg_porch_cli.http_client import get_default_client
+
+        client = get_default_client()
+        client.throttle = throttle
+        client.circuit_breaker = _circuit_breaker(args)
+        client.response_cache = _response_cache(args)
+        client.compress_requests = args.compress_requests
+
+    if args.action in _CLI_COMMANDS:
+        _CLI_COMMANDS[args.action](parser, args)
+        return
+
+    if (
+        args.action not in _BULK_ACTIONS
+        and args.action not in _SNAPSHOT_ACTIONS
+        and not args.stream
+        and args.stats is None
+        and not _profiled(args)
+        and throttle is None
+        and not args.circuit_breaker
+        and not args.response_cache
+        and not args.compress_requests
+    ):
+        from npg_porch_cli.daemon import DaemonUnavailable, default_socket_path, forward
+
+        socket_path = default_socket_path()
+        if os.path.exists(socket_path):
+            try:
+                result = forward(_command(args), socket_path)
+            except DaemonUnavailable as e:
+                if isinstance(e.__cause__, PermissionError):
+                    print(e, file=sys.stderr)
+            else:
+                _print_json(result, indent=not args.compact)
+                return
+
+    from npg_porch_cli.api import send, stream
+
+    action, pipeline = _action_and_pipeline(args)
+    if args.stream:
+        for obj in stream(action=action, pipeline=pipeline):
+            _print_json(obj, flush=True)
+        return
+
+    _print_json(
+        send(action=action, pipeline=pipeline, description=args.description),
+        indent=not args.compact,
+    )
+
+
+def _print_json(obj, indent: bool = False, flush: bool = False):
+    """Prints the object as JSON to STDOUT, on a single line by default."""
+
+    from npg_porch_cli.serialization import dumps
+
+    print(dumps(obj, indent=indent).decode(), flush=flush)
+
+
+def _task_json(args) -> str | None:
     if args.task_file:
         with open(args.task_file) as fh:
-            task_json = fh.read()
-    else:
-        task_json = args.task_json
+            return fh.read()
+    return args.task_json
 
+
+def _action_and_pipeline(args, action_name: str | None = None) -> tuple:
+    """Returns the npg_porch_cli.api.PorchAction and npg_porch_cli.api.Pipeline
+    objects defined by the command line arguments. The pipeline is None if
+    the pipeline name is not given.
+    """
+
+    from npg_porch_cli.api import Pipeline, PorchAction
+    from npg_porch_cli.http_client import Timeouts
+
+    task_inputs = None
+    task_updates = None
+    if args.tasks_file:
+        if args.action == "update_tasks":
+            task_updates = _read_task_updates(args.tasks_file, args.status)
+        else:
+            task_inputs = _read_jsonl(args.tasks_file)
+
+    timeouts = _timeouts(args)
     action = PorchAction(
         porch_url=args.base_url,
         validate_ca_cert=args.validate_ca_cert,
-        action=args.action,
-        task_json=task_json,
+        action=action_name or args.action,
+        task_json=_task_json(args),
         task_status=args.status,
+        task_inputs=task_inputs,
+        task_updates=task_updates,
+        concurrency=args.concurrency or DEFAULT_CONCURRENCY,
+        num_tasks=args.num_tasks,
+        timeouts=Timeouts(**timeouts) if timeouts else None,
+        snapshot_path=args.snapshot_file,
     )
     pipeline = None
     if args.pipeline is not None:
@@ -124,9 +579,241 @@ def run():
             name=args.pipeline, uri=args.pipeline_url, version=args.pipeline_version
         )
 
-    print(
-        json.dumps(
-            send(action=action, pipeline=pipeline, description=args.description),
-            indent=2,
-        )
+    return action, pipeline
+
+
+def _timeouts(args) -> dict | None:
+    if all(
+        value is None
+        for value in (args.connect_timeout, args.read_timeout, args.deadline)
+    ):
+        return None
+    return {
+        "connect": args.connect_timeout or DEFAULT_CONNECT_TIMEOUT,
+        "read": args.read_timeout or DEFAULT_READ_TIMEOUT,
+        "deadline": args.deadline,
+    }
+
+
+def _command(args) -> dict:
+    """Returns the command, see npg_porch_cli.commands, defined by the command
+    line arguments. The command carries the caller's token, if set.
+    """
+
+    task_json = _task_json(args)
+    command = {
+        "action": args.action,
+        "porch_url": args.base_url,
+        "validate_ca_cert": args.validate_ca_cert,
+        "task_input": json.loads(task_json) if task_json is not None else None,
+        "status": args.status,
+        "description": args.description,
+        "num_tasks": args.num_tasks,
+        "timeouts": _timeouts(args),
+        "token": os.environ.get(NPG_PORCH_TOKEN_ENV_VAR),
+    }
+    if args.pipeline is not None:
+        command["pipeline"] = {
+            "name": args.pipeline,
+            "uri": args.pipeline_url,
+            "version": args.pipeline_version,
+        }
+    return command
+
+
+def _profiled(args) -> bool:
+    return args.profile is not None or args.profile_dump is not None
+
+
+def _client_options(args) -> dict:
+    """Returns the observers and other options for HTTP clients created by
+    CLI commands.
+    """
+
+    return {
+        "observers": _observers(args),
+        "throttle": _throttle(args),
+        "circuit_breaker": _circuit_breaker(args),
+        "response_cache": _response_cache(args),
+        "compress_requests": args.compress_requests,
+    }
+
+
+def _observers(args) -> list:
+    if args.stats is None:
+        return []
+
+    from npg_porch_cli.metrics import get_registry
+
+    return [get_registry()]
+
+
+def _throttle(args):
+    """Returns the npg_porch_cli.throttle.Throttle object defined by the
+    command line arguments, None if no limits are set.
+    """
+
+    if args.rate_limit is None and args.max_in_flight is None:
+        return None
+
+    from npg_porch_cli.throttle import Throttle
+
+    return Throttle(
+        rate=args.rate_limit,
+        max_in_flight=args.max_in_flight,
+        lock_dir=args.throttle_dir,
+    )
+
+
+def _circuit_breaker(args):
+    if not args.circuit_breaker:
+        return None
+
+    from npg_porch_cli.breaker import CircuitBreaker
+
+    return CircuitBreaker()
+
+
+def _response_cache(args):
+    if not args.response_cache:
+        return None
+
+    from npg_porch_cli.response_cache import ResponseCache
+
+    return ResponseCache()
+
+
+def _read_jsonl(file_path: str):
+    """Yields objects from a file with one JSON document per line, skipping
+    empty lines. If the file path is '-', reads from STDIN.
+    """
+
+    fh = sys.stdin if file_path == "-" else open(file_path)
+    try:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+
+def _read_task_updates(file_path: str, task_status: str | None):
+    """Yields (task_input, task_status) pairs from a file with one JSON
+    document per line.
+    """
+
+    for obj in _read_jsonl(file_path):
+        if task_status is None:
+            yield (obj["task_input"], obj["status"])
+        else:
+            yield (obj, task_status)
+
+
+def _run_worker(parser, args):
+    """Runs the worker command, prints out a summary."""
+
+    action, pipeline = _action_and_pipeline(args, action_name="claim_task")
+    if pipeline is None or args.command is None:
+        parser.error("worker requires --pipeline and --command")
+
+    from npg_porch_cli.worker import claim_and_run, command_runner
+
+    summary = claim_and_run(
+        action=action,
+        pipeline=pipeline,
+        function=command_runner(args.command),
+        concurrency=action.concurrency,
+        max_tasks=args.max_tasks,
+        exit_when_idle=args.exit_when_idle,
     )
+    _print_json(summary, indent=not args.compact)
+
+
+def _run_batch(parser, args):
+    """Runs the batch command, prints out a result record for each command."""
+
+    from npg_porch_cli.commands import execute_many
+    from npg_porch_cli.http_client import DEFAULT_POOL_MAXSIZE, HttpClient
+
+    defaults = {
+        "porch_url": args.base_url,
+        "validate_ca_cert": args.validate_ca_cert,
+        "timeouts": _timeouts(args),
+    }
+    if args.pipeline is not None:
+        defaults["pipeline"] = {
+            "name": args.pipeline,
+            "uri": args.pipeline_url,
+            "version": args.pipeline_version,
+        }
+    defaults = {key: value for key, value in defaults.items() if value is not None}
+    concurrency = args.concurrency or 1
+
+    failed = False
+    fh = sys.stdin if args.commands_file == "-" else open(args.commands_file)
+    try:
+        lines = (line for line in fh if line.strip())
+        with HttpClient(
+            pool_maxsize=max(concurrency, DEFAULT_POOL_MAXSIZE),
+            **_client_options(args),
+        ) as client:
+            for record in execute_many(
+                lines,
+                defaults=defaults,
+                client=client,
+                concurrency=concurrency,
+                ordered=not args.unordered,
+            ):
+                failed = failed or "error" in record
+                _print_json(record, flush=True)
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+    if failed:
+        sys.exit(1)
+
+
+def _run_watch(parser, args):
+    """Runs the watch command, prints out an event for each change of a task."""
+
+    from npg_porch_cli.http_client import HttpClient
+    from npg_porch_cli.watch import watch_tasks
+
+    action, pipeline = _action_and_pipeline(args, action_name="list_tasks")
+    interval = DEFAULT_WATCH_INTERVAL if args.interval is None else args.interval
+    with HttpClient(**_client_options(args)) as client:
+        for event in watch_tasks(
+            action=action,
+            pipeline=pipeline,
+            client=client,
+            interval=interval,
+            max_polls=args.max_polls,
+        ):
+            _print_json(
+                {
+                    "task": event.task,
+                    "status": event.status,
+                    "previous_status": event.previous_status,
+                },
+                flush=True,
+            )
+
+
+def _run_daemon(parser, args):
+    """Runs the daemon command until it is stopped."""
+
+    from npg_porch_cli.daemon import serve
+    from npg_porch_cli.http_client import HttpClient
+
+    with HttpClient(**_client_options(args)) as client:
+        serve(client=client, idle_timeout=args.idle_timeout)
+
+
+_CLI_COMMANDS = {
+    "batch": _run_batch,
+    "daemon": _run_daemon,
+    "watch": _run_watch,
+    "worker": _run_worker,
+}
@@ -0,0 +1,245 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A circuit breaker for unhealthy porch servers.
+
+A CircuitBreaker keeps a circuit per server, i.e. per scheme, host and
+port of the URL, which is in one of three states:
+
+  closed    - requests are sent; the outcomes of recent requests are kept
+  open      - requests are not sent, CircuitOpenException is raised at once
+  half_open - a limited number of trial requests are sent, other requests
+              are rejected as in the open state
+
+The circuit opens when, within the `window`, at least `min_requests`
+requests have been sent and the proportion of failed requests reaches the
+`failure_rate`. A request fails if it raises a connection error or a
+timeout, if the server replies with one of the `failure_statuses` or if
+the reply takes longer than `slow_request_duration`. After `open_duration`
+seconds, the circuit becomes half-open. It closes when the trial requests
+succeed and opens again when one of them fails.
+
+The breaker is used by npg_porch_cli.http_client.HttpClient, which checks
+it before every attempt to send a request, including retries, and reports
+the state of the circuit to its observers.
+"""
+
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from npg_porch_cli.exceptions import CircuitOpenException
+
+CIRCUIT_STATES = ("closed", "open", "half_open")
+FAILURE_STATUSES = frozenset([500, 502, 503, 504])
+
+# The delay in seconds suggested to requests rejected while the trial
+# requests of a half-open circuit are in flight.
+HALF_OPEN_RETRY_AFTER = 1.0
+
+
+@dataclass(kw_only=True)
+class CircuitBreaker:
+    """A circuit breaker for requests to porch servers.
+
+    Attributes:
+      failure_rate:
+        The proportion of failed requests in the window, which opens the
+        circuit.
+      min_requests:
+        The minimum number of requests in the window before the failure
+        rate is considered.
+      window:
+        The time in seconds over which the outcomes of requests are kept.
+      slow_request_duration:
+        The time in seconds, after which a request counts as failed even if
+        it succeeds, optional.
+      open_duration:
+        The time in seconds the circuit stays open before trial requests
+        are sent.
+      half_open_requests:
+        The number of trial requests, which should succeed for the circuit
+        to close.
+      failure_statuses:
+        HTTP status codes of replies counted as failures.
+    """
+
+    failure_rate: float = field(default=0.5)
+    min_requests: int = field(default=5)
+    window: float = field(default=60.0)
+    slow_request_duration: float | None = field(default=30.0)
+    open_duration: float = field(default=30.0)
+    half_open_requests: int = field(default=1)
+    failure_statuses: frozenset[int] = field(default=FAILURE_STATUSES)
+    _circuits: dict[str, "_Circuit"] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        "Post-constructor hook. Ensures the parameters are valid."
+        if not 0 < self.failure_rate <= 1:
+            raise ValueError("Failure rate should be greater than 0 and at most 1")
+        if self.min_requests < 1 or self.half_open_requests < 1:
+            raise ValueError("The number of requests should be a positive integer")
+        if self.window <= 0 or self.open_duration <= 0:
+            raise ValueError("Durations should be positive numbers")
+
+    def acquire(self, url: str) -> Callable[[bool | None], None]:
+        """Checks that a request to the URL can be sent.
+
+        Raises CircuitOpenException if the circuit for the server is open or
+        if it is half-open and all trial requests are in flight.
+
+        Returns:
+          A callable, which should be called once the request is complete
+          with true if the request failed, false if it succeeded and None if
+          its outcome should not be counted, for example, if it was not
+          sent.
+        """
+
+        return self._circuit(url).acquire()
+
+    def failed(self, status_code: int, duration: float) -> bool:
+        """Returns true if the reply with the status code received after
+        `duration` seconds counts as a failure.
+        """
+
+        return status_code in self.failure_statuses or (
+            self.slow_request_duration is not None
+            and duration > self.slow_request_duration
+        )
+
+    def state(self, url: str) -> str:
+        """Returns the state of the circuit for the server of the URL, see
+        CIRCUIT_STATES.
+        """
+
+        return self._circuit(url).current_state()
+
+    def _circuit(self, url: str) -> "_Circuit":
+        parts = urlsplit(url)
+        server = f"{parts.scheme}://{parts.netloc}"
+        circuit = self._circuits.get(server)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.get(server)
+                if circuit is None:
+                    circuit = _Circuit(self, server)
+                    self._circuits[server] = circuit
+        return circuit
+
+
+class _Circuit:
+    def __init__(self, breaker: CircuitBreaker, server: str):
+        self.breaker = breaker
+        self.server = server
+        self.state = "closed"
+        self._lock = threading.Lock()
+        self._outcomes: deque[tuple[float, bool]] = deque()
+        self._failures = 0
+        self._opened = 0.0
+        self._trials = 0
+        self._successes = 0
+        # Incremented on every change of state, so that outcomes of requests
+        # sent in an earlier state are not counted.
+        self._generation = 0
+
+    def current_state(self) -> str:
+        with self._lock:
+            self._expire(time.monotonic())
+            return self.state
+
+    def acquire(self) -> Callable[[bool | None], None]:
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            if self.state == "open":
+                retry_after = self._opened + self.breaker.open_duration - now
+                raise CircuitOpenException(
+                    f"Circuit for {self.server} is open, "
+                    f"retry in {retry_after:.1f} seconds",
+                    retry_after=retry_after,
+                )
+            if self.state == "half_open":
+                if self._trials >= self.breaker.half_open_requests:
+                    raise CircuitOpenException(
+                        f"Circuit for {self.server} is half-open, "
+                        "trial requests are in flight",
+                        retry_after=HALF_OPEN_RETRY_AFTER,
+                    )
+                self._trials += 1
+            generation = self._generation
+
+        def release(failed: bool | None):
+            self._record(generation, failed)
+
+        return release
+
+    def _record(self, generation: int, failed: bool | None):
+        with self._lock:
+            if generation != self._generation:
+                return
+            now = time.monotonic()
+            if self.state == "half_open":
+                if failed is None:
+                    self._trials -= 1
+                elif failed:
+                    self._open(now)
+                else:
+                    self._successes += 1
+                    if self._successes >= self.breaker.half_open_requests:
+                        self._change("closed")
+                return
+            if failed is None:
+                return
+
+            self._outcomes.append((now, failed))
+            self._failures += failed
+            self._prune(now)
+            total = len(self._outcomes)
+            if (
+                total >= self.breaker.min_requests
+                and self._failures >= self.breaker.failure_rate * total
+            ):
+                self._open(now)
+
+    def _expire(self, now: float):
+        if self.state == "open" and now - self._opened >= self.breaker.open_duration:
+            self._change("half_open")
+
+    def _open(self, now: float):
+        self._change("open")
+        self._opened = now
+
+    def _change(self, state: str):
+        self.state = state
+        self._generation += 1
+        self._outcomes.clear()
+        self._failures = 0
+        self._trials = 0
+        self._successes = 0
+
+    def _prune(self, now: float):
+        start = now - self.breaker.window
+        while self._outcomes and self._outcomes[0][0] < start:
+            self._failures -= self._outcomes.popleft()[1]
@@ -0,0 +1,95 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from npg_porch_cli.defaults import DEFAULT_CONCURRENCY
+
+
+def run_concurrently(
+    function: Callable,
+    items: Iterable,
+    max_workers: int = DEFAULT_CONCURRENCY,
+    ordered: bool = True,
+) -> Iterator[tuple]:
+    """Calls the function for each item using a pool of threads.
+
+    At most `max_workers` calls run at the same time and at most twice as
+    many items are taken from the iterable ahead of the calls, so that
+    arbitrarily long iterables, for example, lines of a large file, can be
+    processed.
+
+    Exceptions raised by the function do not stop the processing.
+
+    Args:
+      function:
+        A callable taking a single item as an argument.
+      items:
+        An iterable of items.
+      max_workers:
+        The maximum number of concurrent calls.
+      ordered:
+        If true, the default, the results are yielded in the order of the
+        items, otherwise as soon as they are available.
+
+    Yields:
+      (item, result, exception) tuples. If the call raised an exception,
+      result is None, otherwise exception is None.
+    """
+
+    if max_workers < 1:
+        raise ValueError("The number of workers should be a positive integer")
+
+    window = 2 * max_workers
+    pending: dict[Future, int] = {}
+    done_items: dict[int, tuple] = {}
+    next_index = 0
+
+    def outcome(future: Future, item) -> tuple:
+        exception = future.exception()
+        if exception is not None:
+            return (item, None, exception)
+        return (item, future.result(), None)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        items_iter = iter(enumerate(items))
+        exhausted = False
+        submitted: dict[int, object] = {}
+        while True:
+            while not exhausted and len(pending) + len(done_items) < window:
+                try:
+                    index, item = next(items_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                submitted[index] = item
+                pending[executor.submit(function, item)] = index
+            if not pending:
+                break
+
+            completed, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in completed:
+                index = pending.pop(future)
+                result = outcome(future, submitted.pop(index))
+                if ordered:
+                    done_items[index] = result
+                else:
+                    yield result
+            while next_index in done_items:
+                yield done_items.pop(next_index)
+                next_index += 1
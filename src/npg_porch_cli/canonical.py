@@ -0,0 +1,74 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Canonical representation and hashing of task inputs.
+
+Task inputs which are equal as JSON values have the same canonical
+representation regardless of the order of keys, whitespace and the Python
+types used to build them. Floating point numbers with integral values are
+represented as integers, for example, {"id_run": 409.0} and {"id_run": 409}
+are the same task input, and subclasses of str, int and float, for example,
+enum members, are represented as their plain values.
+"""
+
+import hashlib
+import json
+
+
+def canonicalize(obj):
+    """Returns a copy of a JSON-compatible object with numbers and strings
+    normalised to plain int, float and str values and tuples converted to
+    lists.
+    """
+
+    if obj is None or obj is True or obj is False:
+        return obj
+    if isinstance(obj, str):
+        return str(obj)
+    if isinstance(obj, bool):
+        return bool(obj)
+    if isinstance(obj, int):
+        return int(obj)
+    if isinstance(obj, float):
+        return int(obj) if obj.is_integer() else float(obj)
+    if isinstance(obj, dict):
+        return {str(key): canonicalize(value) for key, value in obj.items()}
+    if isinstance(obj, list | tuple):
+        return [canonicalize(value) for value in obj]
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def canonical_json(obj) -> str:
+    """Returns the canonical JSON representation of the object, normalised
+    by canonicalize, with sorted keys and without whitespace.
+    """
+
+    return json.dumps(
+        canonicalize(obj),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        allow_nan=False,
+    )
+
+
+def task_input_hash(task_input) -> str:
+    """Returns the SHA-256 hex digest of the canonical JSON representation of
+    the task input.
+    """
+
+    return hashlib.sha256(canonical_json(task_input).encode()).hexdigest()
@@ -0,0 +1,406 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A long-lived client object for a porch server.
+
+PorchClient resolves the server URL, the token, the default pipeline, the
+timeouts and the HTTP session once and provides a method for each client
+action, so that calls in a loop do not repeat this setup. Valid task
+statuses are retrieved from the server once per client.
+
+Example:
+
+  from npg_porch_cli.api import Pipeline
+  from npg_porch_cli.client import PorchClient
+
+  with PorchClient(
+      porch_url="https://myporch.com",
+      pipeline=Pipeline(
+          name="Snakemake_Cardinal",
+          uri="https://github.com/wtsi-npg/snakemake_cardinal",
+          version="1.0",
+      ),
+  ) as client:
+      pipelines = client.list_pipelines()
+      for id_run in (409, 410):
+          client.update_task(task_input={"id_run": id_run}, status="FAILED")
+
+  client = PorchClient.from_config_file("porch.ini")
+"""
+
+import copy
+import threading
+from collections.abc import Iterable, Iterator
+from dataclasses import fields
+
+from npg_porch_cli import api
+from npg_porch_cli.api import Pipeline, PorchAction, get_token, validate_task_status
+from npg_porch_cli.defaults import DEFAULT_WATCH_INTERVAL
+from npg_porch_cli.http_client import HttpClient, Timeouts
+from npg_porch_cli.schema import get_task_statuses
+
+_ACTION_FIELDS = frozenset(f.name for f in fields(PorchAction))
+
+
+class PorchClient:
+    """A client for a porch server and, optionally, a pipeline.
+
+    Args:
+      porch_url:
+        The URL of the porch server.
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional, the default pipeline of
+        actions. Required by actions other than list actions unless given
+        for each call.
+      token:
+        The authorization token, optional. If not given, the value of the
+        NPG_PORCH_TOKEN environment variable at the time the client is
+        created is used; if it is not set, AuthException is raised.
+      validate_ca_cert:
+        A flag instructing to validate the server's CA SSL certificate, true
+        by default.
+      timeouts:
+        npg_porch_cli.http_client.Timeouts object, optional, the timeouts of
+        all actions, overrides the timeouts of the HTTP client.
+      http_client:
+        npg_porch_cli.http_client.HttpClient object, optional. If not given,
+        the client creates its own, which is closed when the client is closed.
+    """
+
+    def __init__(
+        self,
+        porch_url: str,
+        pipeline: Pipeline | None = None,
+        token: str | None = None,
+        validate_ca_cert: bool = True,
+        timeouts: Timeouts | None = None,
+        http_client: HttpClient | None = None,
+    ):
+        if not porch_url:
+            raise TypeError("'porch_url' cannot be None or empty")
+        self.porch_url = porch_url
+        self.pipeline = pipeline
+        self.token = token or get_token()
+        self.validate_ca_cert = validate_ca_cert
+        self.timeouts = timeouts
+        self._owns_http_client = http_client is None
+        self.http_client = http_client if http_client is not None else HttpClient()
+        self._task_statuses: list[str] | None = None
+        self._actions: dict[str, PorchAction] = {}
+
+    @classmethod
+    def from_config(cls, porch_conf, **kwargs) -> "PorchClient":
+        """Creates a client from the configuration.
+
+        Args:
+          porch_conf:
+            npg_porch_cli.config.PorchClientConfig object, which defines the
+            server, the pipeline, the token and the timeouts.
+          kwargs:
+            Other arguments for the PorchClient constructor, optional. If
+            `http_client` is not given, an HTTP client with the timeouts of
+            the configuration is created, see
+            npg_porch_cli.config.get_http_client.
+        """
+
+        from npg_porch_cli.config import get_http_client
+
+        arguments = {
+            "porch_url": porch_conf.api_url,
+            "pipeline": Pipeline(
+                name=porch_conf.pipeline_name,
+                uri=porch_conf.pipeline_uri,
+                version=porch_conf.pipeline_version,
+            ),
+            "token": porch_conf.npg_porch_token,
+        }
+        arguments.update(kwargs)
+        owns_http_client = arguments.get("http_client") is None
+        if owns_http_client:
+            arguments["http_client"] = get_http_client(porch_conf)
+        client = cls(**arguments)
+        client._owns_http_client = owns_http_client
+        return client
+
+    @classmethod
+    def from_config_file(
+        cls, conf_file_path: str, conf_file_section: str = "PORCH", **kwargs
+    ) -> "PorchClient":
+        """Creates a client from a configuration file, see
+        npg_porch_cli.config.get_config_data and from_config.
+        """
+
+        from npg_porch_cli.config import get_config_data
+
+        return cls.from_config(
+            get_config_data(conf_file_path, conf_file_section), **kwargs
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the HTTP client if it has been created by this client."""
+
+        if self._owns_http_client:
+            self.http_client.close()
+
+    @property
+    def task_statuses(self) -> list[str]:
+        """Valid task statuses, retrieved from the server once."""
+
+        if self._task_statuses is None:
+            self._task_statuses = get_task_statuses(
+                porch_url=self.porch_url,
+                validate_ca_cert=self.validate_ca_cert,
+                client=self.http_client,
+            )
+        return self._task_statuses
+
+    def list_pipelines(self) -> list:
+        """Lists all pipelines, see npg_porch_cli.api.list_pipelines."""
+
+        return api.list_pipelines(
+            action=self._action("list_pipelines"), client=self.http_client
+        )
+
+    def iter_pipelines(self) -> Iterator[dict]:
+        """Iterates over pipelines, see npg_porch_cli.api.iter_pipelines."""
+
+        return api.iter_pipelines(
+            action=self._action("list_pipelines"), client=self.http_client
+        )
+
+    def list_tasks(
+        self,
+        status: str | None = None,
+        pipeline: Pipeline | None = None,
+        typed_results: bool = False,
+    ) -> list:
+        """Lists tasks of the pipeline, the default pipeline if not given, or,
+        if the client has no default pipeline, all tasks, see
+        npg_porch_cli.api.list_tasks.
+        """
+
+        return api.list_tasks(
+            action=self._action(
+                "list_tasks", task_status=status, typed_results=typed_results
+            ),
+            pipeline=pipeline or self.pipeline,
+            client=self.http_client,
+        )
+
+    def iter_tasks(
+        self,
+        status: str | None = None,
+        pipeline: Pipeline | None = None,
+        typed_results: bool = False,
+    ) -> Iterator:
+        """Iterates over tasks, see list_tasks and
+        npg_porch_cli.api.iter_tasks.
+        """
+
+        return api.iter_tasks(
+            action=self._action(
+                "list_tasks", task_status=status, typed_results=typed_results
+            ),
+            pipeline=pipeline or self.pipeline,
+            client=self.http_client,
+        )
+
+    def add_pipeline(self, pipeline: Pipeline | None = None) -> dict:
+        """Registers the pipeline, see npg_porch_cli.api.add_pipeline."""
+
+        return api.add_pipeline(
+            action=self._action("add_pipeline"),
+            pipeline=self._pipeline(pipeline),
+            client=self.http_client,
+        )
+
+    def add_task(self, task_input: dict, pipeline: Pipeline | None = None) -> dict:
+        """Registers a task, see npg_porch_cli.api.add_task."""
+
+        return api.add_task(
+            action=self._action("add_task", task_input=task_input),
+            pipeline=self._pipeline(pipeline),
+            client=self.http_client,
+        )
+
+    def add_tasks(
+        self,
+        task_inputs: Iterable[dict],
+        pipeline: Pipeline | None = None,
+        concurrency: int | None = None,
+        snapshot_path: str | None = None,
+    ) -> dict:
+        """Registers many tasks, see npg_porch_cli.api.add_tasks."""
+
+        arguments = {"task_inputs": task_inputs, "snapshot_path": snapshot_path}
+        if concurrency is not None:
+            arguments["concurrency"] = concurrency
+        return api.add_tasks(
+            action=self._action("add_tasks", **arguments),
+            pipeline=self._pipeline(pipeline),
+            client=self.http_client,
+        )
+
+    def claim_task(self, num_tasks: int = 1, pipeline: Pipeline | None = None) -> list:
+        """Claims up to `num_tasks` tasks, see npg_porch_cli.api.claim_task."""
+
+        return api.claim_task(
+            action=self._action("claim_task", num_tasks=num_tasks),
+            pipeline=self._pipeline(pipeline),
+            client=self.http_client,
+        )
+
+    def update_task(
+        self, task_input: dict, status: str, pipeline: Pipeline | None = None
+    ) -> dict:
+        """Sets the status of a task, see npg_porch_cli.api.update_task."""
+
+        return api.update_task(
+            action=self._action(
+                "update_task", task_input=task_input, task_status=status
+            ),
+            pipeline=self._pipeline(pipeline),
+            client=self.http_client,
+        )
+
+    def update_tasks(
+        self,
+        task_updates: Iterable[tuple[dict, str]],
+        pipeline: Pipeline | None = None,
+        concurrency: int | None = None,
+    ) -> dict:
+        """Sets statuses of many tasks, see npg_porch_cli.api.update_tasks."""
+
+        arguments = {"task_updates": task_updates}
+        if concurrency is not None:
+            arguments["concurrency"] = concurrency
+        return api.update_tasks(
+            action=self._action("update_tasks", **arguments),
+            pipeline=self._pipeline(pipeline),
+            client=self.http_client,
+        )
+
+    def create_token(self, description: str, pipeline: Pipeline | None = None) -> dict:
+        """Creates a token for the pipeline, see
+        npg_porch_cli.api.create_token.
+        """
+
+        return api.create_token(
+            action=self._action("create_token"),
+            pipeline=self._pipeline(pipeline),
+            description=description,
+            client=self.http_client,
+        )
+
+    def snapshot(self, snapshot_path: str, pipeline: Pipeline | None = None) -> dict:
+        """Saves tasks to a local snapshot file, see
+        npg_porch_cli.api.snapshot_tasks.
+        """
+
+        return api.snapshot_tasks(
+            action=self._action("snapshot", snapshot_path=snapshot_path),
+            pipeline=pipeline or self.pipeline,
+            client=self.http_client,
+        )
+
+    def query(
+        self,
+        snapshot_path: str,
+        status: str | None = None,
+        task_input: dict | None = None,
+        pipeline: Pipeline | None = None,
+    ) -> list:
+        """Lists tasks saved in a local snapshot file, see
+        npg_porch_cli.api.query_tasks.
+        """
+
+        return api.query_tasks(
+            action=self._action(
+                "query",
+                snapshot_path=snapshot_path,
+                task_status=status,
+                task_input=task_input,
+            ),
+            pipeline=pipeline or self.pipeline,
+            client=self.http_client,
+        )
+
+    def watch(
+        self,
+        status: str | None = None,
+        pipeline: Pipeline | None = None,
+        interval: float = DEFAULT_WATCH_INTERVAL,
+        initial: bool = False,
+        max_polls: int | None = None,
+        stop_event: threading.Event | None = None,
+    ) -> Iterator:
+        """Yields changes of tasks, see npg_porch_cli.watch.watch_tasks."""
+
+        from npg_porch_cli.watch import watch_tasks
+
+        return watch_tasks(
+            action=self._action("list_tasks", task_status=status),
+            pipeline=pipeline or self.pipeline,
+            client=self.http_client,
+            interval=interval,
+            initial=initial,
+            max_polls=max_polls,
+            stop_event=stop_event,
+        )
+
+    def _pipeline(self, pipeline: Pipeline | None) -> Pipeline:
+        pipeline = pipeline or self.pipeline
+        if pipeline is None:
+            raise TypeError("Pipeline should be given or set for the client")
+        return pipeline
+
+    def _action(self, name: str, task_status: str | None = None, **kwargs):
+        """Returns a PorchAction object for the action.
+
+        A template action is created and validated once per action name.
+        Actions for calls are shallow copies of the template with call
+        arguments set. Of the changed fields, PorchAction validates only the
+        status. It is validated against the client's list of statuses, so
+        that the copy does not look up the server's schema with the default
+        HTTP client, as the PorchAction constructor would.
+        """
+
+        template = self._actions.get(name)
+        if template is None:
+            template = PorchAction(
+                porch_url=self.porch_url,
+                action=name,
+                validate_ca_cert=self.validate_ca_cert,
+                timeouts=self.timeouts,
+                token=self.token,
+            )
+            self._actions[name] = template
+        unknown = kwargs.keys() - _ACTION_FIELDS
+        if unknown:
+            raise TypeError(f"Unknown action fields: {', '.join(sorted(unknown))}")
+        action = copy.copy(template)
+        if task_status is not None:
+            action.task_status = validate_task_status(task_status, self.task_statuses)
+        for key, value in kwargs.items():
+            setattr(action, key, value)
+        return action
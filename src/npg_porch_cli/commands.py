@@ -0,0 +1,218 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Client actions described by JSON-compatible dictionaries.
+
+A command is a dictionary with the name of the action and its arguments,
+for example,
+
+  {
+    "action": "update_task",
+    "porch_url": "https://myporch.com",
+    "pipeline": {"name": "p1", "uri": "https://some.com/p1", "version": "1.0"},
+    "task_input": {"id_run": 409},
+    "status": "DONE"
+  }
+
+Commands are used to pass actions between processes and to read them from
+files, one JSON document per line. A command can have an 'id' key, which is
+not used to send the action, but is copied to the result record, see
+execute_many.
+"""
+
+import json
+from collections.abc import Iterable, Iterator
+
+from npg_porch_cli.api import Pipeline, PorchAction, send
+from npg_porch_cli.bulk import run_concurrently
+from npg_porch_cli.exceptions import ServerErrorException
+from npg_porch_cli.http_client import HttpClient, Timeouts, get_default_client
+
+COMMAND_KEYS = frozenset(
+    [
+        "action",
+        "porch_url",
+        "validate_ca_cert",
+        "pipeline",
+        "task_input",
+        "status",
+        "description",
+        "task_inputs",
+        "task_updates",
+        "concurrency",
+        "num_tasks",
+        "timeouts",
+        "token",
+        "snapshot_path",
+        "id",
+    ]
+)
+
+
+def parse_command(command: dict) -> tuple[PorchAction, Pipeline | None, str | None]:
+    """Creates the objects needed to send the action described by a command.
+
+    Args:
+      command:
+        A dictionary with the 'action' and 'porch_url' keys and, optionally,
+        other keys listed in COMMAND_KEYS. 'pipeline' is a dictionary with
+        the pipeline's name, uri and version. 'status' is the task status.
+        'task_updates' is a list of dictionaries with the 'task_input' and
+        'status' keys. 'timeouts' is a dictionary with the 'connect', 'read'
+        and 'deadline' keys.
+
+    Returns:
+      A tuple of the npg_porch_cli.api.PorchAction object, the
+      npg_porch_cli.api.Pipeline object or None and the token description
+      or None.
+    """
+
+    if not isinstance(command, dict):
+        raise TypeError("Command should be a JSON object")
+    unknown = set(command) - COMMAND_KEYS
+    if unknown:
+        raise ValueError("Unknown command keys: " + ", ".join(sorted(unknown)))
+
+    arguments = {
+        "porch_url": command.get("porch_url"),
+        "action": command.get("action"),
+        "task_input": command.get("task_input"),
+        "task_status": command.get("status"),
+        "task_inputs": command.get("task_inputs"),
+        "token": command.get("token"),
+        "snapshot_path": command.get("snapshot_path"),
+    }
+    for key in ("validate_ca_cert", "concurrency", "num_tasks"):
+        if command.get(key) is not None:
+            arguments[key] = command[key]
+    if command.get("task_updates") is not None:
+        arguments["task_updates"] = [
+            (update["task_input"], update["status"])
+            for update in command["task_updates"]
+        ]
+    if command.get("timeouts") is not None:
+        arguments["timeouts"] = Timeouts(**command["timeouts"])
+
+    pipeline = None
+    if command.get("pipeline") is not None:
+        pipeline = Pipeline(**command["pipeline"])
+
+    return PorchAction(**arguments), pipeline, command.get("description")
+
+
+def execute(command: dict, client: HttpClient | None = None) -> dict | list:
+    """Sends the action described by the command to the porch server.
+
+    Args:
+      command:
+        A dictionary describing the action, see parse_command.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Returns:
+      The server's response as a Python data structure, see
+      npg_porch_cli.api.send.
+    """
+
+    action, pipeline, description = parse_command(command)
+    return send(
+        action=action, pipeline=pipeline, description=description, client=client
+    )
+
+
+def execute_many(
+    commands: Iterable[dict | str],
+    defaults: dict | None = None,
+    client: HttpClient | None = None,
+    concurrency: int = 1,
+    ordered: bool = True,
+) -> Iterator[dict]:
+    """Sends the actions described by the commands to the porch server.
+
+    All actions are sent via the same client, so that connections and the
+    server's schema are reused. Failure of a command does not stop
+    execution of other commands.
+
+    Args:
+      commands:
+        An iterable of commands, see parse_command, either as dictionaries
+        or as JSON strings, for example, lines of a file.
+      defaults:
+        A dictionary of default values for command keys, optional, for
+        example, the URL of the porch server.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+      concurrency:
+        The maximum number of commands executed at the same time, 1 by
+        default. If it is greater than one, commands are not guaranteed to
+        be executed in the order they are given, so successive status
+        changes of the same task should not be sent this way.
+      ordered:
+        If true, the default, the results are yielded in the order of the
+        commands, otherwise as soon as they are available.
+
+    Yields:
+      A record for each command, a dictionary with the 'index' key, the
+      position of the command in the input, the 'id' key if the command has
+      an id, and either the 'result' key, the server's response, or the
+      'error' key, see describe_error.
+    """
+
+    if client is None:
+        client = get_default_client()
+
+    def decode(command):
+        if isinstance(command, (str, bytes)):
+            try:
+                command = json.loads(command)
+            except ValueError as e:
+                return e
+        if isinstance(command, dict) and defaults:
+            command = defaults | command
+        return command
+
+    def run(item: tuple):
+        _, command = item
+        if isinstance(command, Exception):
+            raise command
+        return execute(command, client=client)
+
+    items = ((index, decode(command)) for index, command in enumerate(commands))
+    for (index, command), result, error in run_concurrently(
+        run, items, max_workers=concurrency, ordered=ordered
+    ):
+        record = {"index": index}
+        if isinstance(command, dict) and "id" in command:
+            record["id"] = command["id"]
+        if error is None:
+            record["result"] = result
+        else:
+            record["error"] = describe_error(error)
+        yield record
+
+
+def describe_error(error: Exception) -> dict:
+    """Returns a JSON-compatible description of an error raised by a command.
+
+    The description has the 'type' and 'message' keys and, for
+    npg_porch_cli.exceptions.ServerErrorException, the 'status_code' key.
+    """
+
+    description = {"type": type(error).__name__, "message": str(error)}
+    if isinstance(error, ServerErrorException):
+        description["status_code"] = error.status_code
+    return description
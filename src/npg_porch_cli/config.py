@@ -4,11 +4,26 @@ from os.path import isfile
 
 from npg.conf import IniData, config_class
 
+from npg_porch_cli.http_client import HttpClient, Timeouts, parse_action_timeouts
+from npg_porch_cli.throttle import Throttle
+
 
 @config_class(kw_only=True)
 class PorchClientConfig:
     """
     Suggested config file content for interacting with a Porch server instance
+
+    The timeout fields are optional. `connect_timeout`, `read_timeout` and
+    `deadline` are numbers of seconds and apply to all actions.
+    `action_timeouts` overrides them for individual actions, for example,
+    `claim_task=1,2,5; list_tasks=10,600`, see
+    npg_porch_cli.http_client.parse_action_timeouts.
+
+    The request limit fields are optional, see npg_porch_cli.throttle.
+    `rate_limit` is the maximum number of requests per second and
+    `max_in_flight` the maximum number of concurrent requests. If
+    `throttle_dir` is set, the limits are shared by all processes on the
+    host which use this directory.
     """
 
     api_url: str = field(repr=True)
@@ -16,6 +31,13 @@ class PorchClientConfig:
     pipeline_uri: str = field(repr=True)
     pipeline_version: str = field(repr=True)
     npg_porch_token: str
+    connect_timeout: str | None = field(default=None)
+    read_timeout: str | None = field(default=None)
+    deadline: str | None = field(default=None)
+    action_timeouts: str | None = field(default=None)
+    rate_limit: str | None = field(default=None)
+    max_in_flight: str | None = field(default=None)
+    throttle_dir: str | None = field(default=None)
 
 
 def get_config_data(
@@ -50,3 +72,45 @@ def get_config_data(
         raise FileNotFoundError(f"{conf_file_path} is not present or cannot be read")
 
     return porch_conf
+
+
+def get_http_client(porch_conf: PorchClientConfig, **kwargs) -> HttpClient:
+    """
+    Creates an HTTP client with the timeouts and the request limits defined
+    by the configuration.
+
+    Args:
+
+      porch_conf:
+        npg_porch_cli.config.PorchClientConfig object
+      kwargs:
+        Other arguments for the npg_porch_cli.http_client.HttpClient
+        constructor, optional.
+
+    Returns:
+      npg_porch_cli.http_client.HttpClient object
+    """
+
+    defaults = Timeouts()
+    timeouts = Timeouts(
+        connect=float(porch_conf.connect_timeout or defaults.connect),
+        read=float(porch_conf.read_timeout or defaults.read),
+        deadline=float(porch_conf.deadline) if porch_conf.deadline else None,
+    )
+    action_timeouts = {}
+    if porch_conf.action_timeouts:
+        action_timeouts = parse_action_timeouts(porch_conf.action_timeouts)
+
+    if porch_conf.rate_limit or porch_conf.max_in_flight:
+        kwargs.setdefault(
+            "throttle",
+            Throttle(
+                rate=float(porch_conf.rate_limit) if porch_conf.rate_limit else None,
+                max_in_flight=(
+                    int(porch_conf.max_in_flight) if porch_conf.max_in_flight else None
+                ),
+                lock_dir=porch_conf.throttle_dir or None,
+            ),
+        )
+
+    return HttpClient(timeouts=timeouts, action_timeouts=action_timeouts, **kwargs)
@@ -0,0 +1,284 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A local daemon which sends client actions on behalf of other processes.
+
+The daemon listens on a Unix domain socket and holds a warm HTTP client and
+schema cache, so that the processes which forward their actions to it do
+not pay for connecting to the server and retrieving its schema.
+
+Requests and replies are JSON documents, one per line. A request is a
+command, see npg_porch_cli.commands. A reply is either {"result": ...} or
+{"error": {"type": ..., "message": ..., "status_code": ...}}. A connection
+can be used for any number of requests.
+
+Only the client side of the protocol, `forward`, is imported by the CLI
+client before it knows whether the daemon is running, therefore this
+module imports the HTTP client stack only when the daemon is started.
+"""
+
+import json
+import os
+import socket
+import stat
+import threading
+import time
+
+from npg_porch_cli.exceptions import AuthException, ServerErrorException
+
+NPG_PORCH_DAEMON_SOCKET_ENV_VAR = "NPG_PORCH_DAEMON_SOCKET"
+CONNECT_TIMEOUT = 1.0
+# Forwarded actions may wait for the server's retries, but a listener which
+# does not reply should not block the client forever.
+REPLY_TIMEOUT = 600.0
+
+_ERROR_TYPES = {
+    "AuthException": AuthException,
+    "TypeError": TypeError,
+    "ValueError": ValueError,
+}
+
+
+class DaemonUnavailable(Exception):
+    """Raised when no daemon is listening on the socket or the socket is not
+    private to the user.
+    """
+
+
+def default_socket_path() -> str:
+    """Returns the path of the daemon's socket.
+
+    The path is given by the NPG_PORCH_DAEMON_SOCKET environment variable.
+    If it is not set, a socket in XDG_RUNTIME_DIR or, if it is not set
+    either, in a private per-user directory in TMPDIR or /tmp is used.
+    """
+
+    path = os.environ.get(NPG_PORCH_DAEMON_SOCKET_ENV_VAR)
+    if path:
+        return path
+    name = f"npg_porch_client-{os.getuid()}"
+    directory = os.environ.get("XDG_RUNTIME_DIR")
+    if directory:
+        return os.path.join(directory, f"{name}.sock")
+    directory = os.path.join(os.environ.get("TMPDIR", "/tmp"), name)
+    return os.path.join(directory, "daemon.sock")
+
+
+def check_socket(socket_path: str):
+    """Checks that the socket and its directory belong to the current user
+    and are not accessible to other users, so that the caller's token is not
+    sent to a listener started by someone else.
+
+    Raises DaemonUnavailable if the socket does not exist or fails a check.
+    """
+
+    try:
+        _check_private(os.path.dirname(os.path.abspath(socket_path)), stat.S_ISDIR)
+        _check_private(socket_path, stat.S_ISSOCK)
+    except FileNotFoundError as e:
+        raise DaemonUnavailable(f"No daemon is listening on {socket_path}") from e
+    except PermissionError as e:
+        raise DaemonUnavailable(f"Not using the daemon: {e}") from e
+
+
+def forward(
+    command: dict, socket_path: str | None = None, timeout: float = REPLY_TIMEOUT
+) -> dict | list:
+    """Sends the command to the daemon and returns the result.
+
+    Errors are raised as npg_porch_cli.exceptions.ServerErrorException,
+    npg_porch_cli.exceptions.AuthException, ValueError or TypeError if the
+    daemon reports an error of this type, otherwise as Exception. TimeoutError
+    is raised if the daemon does not reply within `timeout` seconds.
+
+    Raises DaemonUnavailable if no daemon is listening on the socket or if
+    the socket fails the checks of check_socket. In this case the command
+    has not been sent and can be sent directly.
+    """
+
+    if socket_path is None:
+        socket_path = default_socket_path()
+    check_socket(socket_path)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except OSError as e:
+            raise DaemonUnavailable(f"No daemon is listening on {socket_path}") from e
+        sock.settimeout(timeout)
+        sock.sendall(json.dumps(command).encode() + b"\n")
+        with sock.makefile("rb") as reader:
+            line = reader.readline()
+    finally:
+        sock.close()
+
+    if not line:
+        raise ConnectionError("The daemon closed the connection without a reply")
+    reply = json.loads(line)
+    if "error" in reply:
+        raise _error(reply["error"])
+    return reply["result"]
+
+
+def serve(
+    socket_path: str | None = None,
+    client=None,
+    idle_timeout: float | None = None,
+    ready: threading.Event | None = None,
+    stop_event: threading.Event | None = None,
+):
+    """Runs the daemon until it is interrupted, stopped by SIGTERM or the
+    stop event is set.
+
+    Args:
+      socket_path:
+        The path of the Unix domain socket to listen on, optional, see
+        default_socket_path. The socket is accessible only to the user who
+        runs the daemon. The directory of the socket should be owned by the
+        user and not be accessible to other users, otherwise PermissionError
+        is raised. The directory of the default socket in TMPDIR is created
+        if it does not exist.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional. By default, a
+        new client is created.
+      idle_timeout:
+        If given, the daemon exits after this number of seconds without
+        requests.
+      ready:
+        A threading.Event object, optional, which is set once the daemon
+        is listening.
+      stop_event:
+        A threading.Event object, optional. When it is set, the daemon
+        stops.
+    """
+
+    import signal
+    import socketserver
+
+    # Import the HTTP client stack and the commands now, so that the first
+    # forwarded command does not wait for it.
+    from npg_porch_cli.commands import describe_error, execute
+    from npg_porch_cli.http_client import HttpClient
+
+    if socket_path is None:
+        socket_path = default_socket_path()
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    if socket_path == default_socket_path():
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    _check_private(directory, stat.S_ISDIR)
+    own_client = client is None
+    if own_client:
+        client = HttpClient()
+    _remove_stale_socket(socket_path)
+
+    activity = {"last": time.monotonic(), "active": 0}
+    activity_lock = threading.Lock()
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                with activity_lock:
+                    activity["active"] += 1
+                try:
+                    reply = {"result": execute(json.loads(line), client=client)}
+                except Exception as e:
+                    reply = {"error": describe_error(e)}
+                finally:
+                    with activity_lock:
+                        activity["active"] -= 1
+                        activity["last"] = time.monotonic()
+                self.wfile.write(json.dumps(reply).encode() + b"\n")
+                self.wfile.flush()
+
+    old_umask = os.umask(0o177)
+    try:
+        server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+    finally:
+        os.umask(old_umask)
+    server.daemon_threads = True
+
+    stopped = stop_event if stop_event is not None else threading.Event()
+
+    def idle() -> bool:
+        with activity_lock:
+            return (
+                activity["active"] == 0
+                and time.monotonic() - activity["last"] > idle_timeout
+            )
+
+    def watch():
+        # shutdown() waits for serve_forever() to return, so it is called
+        # from this thread rather than from the thread serving requests.
+        interval = 1.0 if idle_timeout is None else min(idle_timeout, 1.0)
+        while not stopped.wait(interval):
+            if idle_timeout is not None and idle():
+                break
+        server.shutdown()
+
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *args: stopped.set())
+    threading.Thread(target=watch, daemon=True).start()
+    if ready is not None:
+        ready.set()
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stopped.set()
+        server.server_close()
+        if own_client:
+            client.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def _remove_stale_socket(socket_path: str):
+    if not os.path.exists(socket_path):
+        return
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)
+    else:
+        raise RuntimeError(f"A daemon is already listening on {socket_path}")
+    finally:
+        sock.close()
+
+
+def _check_private(path: str, is_type):
+    info = os.lstat(path)
+    if not is_type(info.st_mode):
+        raise PermissionError(f"{path} is not of the expected file type")
+    if info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not owned by the current user")
+    if info.st_mode & 0o077:
+        raise PermissionError(f"{path} is accessible to other users")
+
+
+def _error(description: dict) -> Exception:
+    if description["type"] == "ServerErrorException":
+        return ServerErrorException(
+            description["message"], status_code=description.get("status_code")
+        )
+    return _ERROR_TYPES.get(description["type"], Exception)(description["message"])
@@ -0,0 +1,634 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import gzip
+import random
+import threading
+import time
+from collections.abc import Callable
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from npg_porch_cli import profiling
+from npg_porch_cli.breaker import CircuitBreaker
+from npg_porch_cli.defaults import DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
+from npg_porch_cli.metrics import RequestEvent
+from npg_porch_cli.response_cache import CONDITIONAL_HEADERS, ResponseCache
+from npg_porch_cli.throttle import Throttle, ThrottleTimeout
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+DEFAULT_MAX_RETRIES = 0
+DEFAULT_COMPRESS_MIN_SIZE = 1024
+# Faster than the default level and only slightly larger output for JSON.
+COMPRESS_LEVEL = 5
+
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS", "PUT", "DELETE"])
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+
+
+class DeadlineExceeded(requests.exceptions.Timeout):
+    """Raised when the overall deadline of a request expires before the
+    request can be sent or retried.
+    """
+
+
+@dataclass(kw_only=True, frozen=True)
+class Timeouts:
+    """Timeouts for a request.
+
+    The connect and read timeouts apply to each attempt to send the request.
+    The deadline applies to the request as a whole, including all retries
+    and delays between them. No attempt is started and no retry is scheduled
+    once the deadline has passed, and the timeouts of the last attempt are
+    shortened so that it does not run much past the deadline.
+
+    Attributes:
+      connect:
+        The time in seconds to wait for a connection to the server.
+      read:
+        The time in seconds to wait for the server to send data.
+      deadline:
+        The overall time limit in seconds, optional.
+    """
+
+    connect: float = field(default=DEFAULT_CONNECT_TIMEOUT)
+    read: float = field(default=DEFAULT_READ_TIMEOUT)
+    deadline: float | None = field(default=None)
+
+    def __post_init__(self):
+        "Post-constructor hook. Ensures the timeouts are valid."
+        if self.connect <= 0 or self.read <= 0:
+            raise ValueError("Timeouts should be positive numbers")
+        if self.deadline is not None and self.deadline <= 0:
+            raise ValueError("Deadline should be a positive number")
+
+    @classmethod
+    def parse(cls, value: str) -> "Timeouts":
+        """Creates a Timeouts object from a string.
+
+        The string contains comma-separated connect and read timeouts and,
+        optionally, a deadline, for example, '1,5' or '10,600,1800'.
+        """
+
+        parts = [part.strip() for part in value.split(",")]
+        if len(parts) not in (2, 3) or not all(parts):
+            raise ValueError(
+                f"Invalid timeouts '{value}', expected 'connect,read[,deadline]'"
+            )
+        numbers = [float(part) for part in parts]
+        return cls(
+            connect=numbers[0],
+            read=numbers[1],
+            deadline=numbers[2] if len(numbers) == 3 else None,
+        )
+
+
+def parse_action_timeouts(value: str) -> dict[str, Timeouts]:
+    """Parses timeouts for individual actions.
+
+    The value is a semicolon-separated list of action=timeouts pairs, where
+    the timeouts are in the format accepted by Timeouts.parse, for example,
+    'claim_task=1,2,5; list_tasks=10,600'.
+
+    Returns:
+      A dictionary mapping action names to Timeouts objects.
+    """
+
+    action_timeouts = {}
+    for entry in value.split(";"):
+        if not entry.strip():
+            continue
+        name, sep, timeouts = entry.partition("=")
+        if not sep or not name.strip():
+            raise ValueError(
+                f"Invalid action timeouts '{entry.strip()}', "
+                "expected 'action=connect,read[,deadline]'"
+            )
+        action_timeouts[name.strip()] = Timeouts.parse(timeouts)
+    return action_timeouts
+
+
+@dataclass(kw_only=True)
+class RetryPolicy:
+    """A policy for retrying failed requests.
+
+    Requests with idempotent methods (GET, PUT, etc.) are retried when the
+    connection fails, the request times out or the server replies with one
+    of the `retry_statuses`. Requests with other methods, for example, POST
+    requests adding or claiming tasks, are retried only if the connection
+    to the server could not be established, i.e. when the request provably
+    never reached the server.
+
+    The delay before a retry grows exponentially with the number of attempts,
+    `backoff_factor * 2 ** (attempt - 1)` seconds capped at `max_backoff`,
+    with full jitter, i.e. the actual delay is random between zero and this
+    value. If the server's reply has a Retry-After header, the delay it
+    specifies is used instead, up to `max_retry_after` seconds.
+
+    Attributes:
+      max_attempts:
+        The maximum number of attempts, including the first one. Set to 1
+        to disable retries.
+      backoff_factor:
+        The base of the backoff delay in seconds.
+      max_backoff:
+        The maximum backoff delay in seconds.
+      max_retry_after:
+        The maximum delay in seconds accepted from a Retry-After header.
+      retry_statuses:
+        HTTP status codes of the replies to retry.
+    """
+
+    max_attempts: int = field(default=3)
+    backoff_factor: float = field(default=0.5)
+    max_backoff: float = field(default=30.0)
+    max_retry_after: float = field(default=120.0)
+    retry_statuses: frozenset[int] = field(default=RETRY_STATUSES)
+
+    def __post_init__(self):
+        "Post-constructor hook. Ensures the number of attempts is valid."
+        if self.max_attempts < 1:
+            raise ValueError("The number of attempts should be a positive integer")
+
+    def retry_error(self, method: str, error: Exception, attempt: int) -> bool:
+        """Returns true if the request which raised the error should be retried."""
+
+        if attempt >= self.max_attempts:
+            return False
+        if method.upper() in IDEMPOTENT_METHODS:
+            return isinstance(
+                error,
+                (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+            )
+        return _not_sent(error)
+
+    def retry_response(
+        self, method: str, response: requests.Response, attempt: int
+    ) -> bool:
+        """Returns true if the request which got the response should be retried."""
+
+        return (
+            attempt < self.max_attempts
+            and method.upper() in IDEMPOTENT_METHODS
+            and response.status_code in self.retry_statuses
+        )
+
+    def delay(self, attempt: int, response: requests.Response | None = None) -> float:
+        """Returns the delay in seconds before the next attempt."""
+
+        if response is not None:
+            retry_after = _retry_after(response)
+            if retry_after is not None:
+                return min(retry_after, self.max_retry_after)
+        backoff = min(self.max_backoff, self.backoff_factor * 2 ** (attempt - 1))
+        return random.uniform(0, backoff)
+
+
+def _not_sent(error: Exception) -> bool:
+    """Returns true if the error shows that the request never reached the
+    server.
+    """
+
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", error.args[0])
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+def _retry_after(response: requests.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass(kw_only=True)
+class HttpClient:
+    """An HTTP client that owns a pooled, keep-alive requests.Session.
+
+    The underlying session is created on first use. All requests sent via
+    the same client object reuse TCP connections and TLS sessions to the
+    server, which removes a connect and a handshake from every call.
+
+    Attributes:
+      pool_connections:
+        The number of per-host connection pools to cache.
+      pool_maxsize:
+        The maximum number of connections kept open for a single host.
+        Set this to at least the number of threads sharing the client.
+      max_retries:
+        The number of retries for failed connection attempts, passed to
+        the transport adapter.
+      keep_alive:
+        A flag defining whether connections are kept open between requests,
+        true by default.
+      retry_policy:
+        npg_porch_cli.http_client.RetryPolicy object, defines how requests
+        are retried.
+      timeouts:
+        npg_porch_cli.http_client.Timeouts object, the default timeouts for
+        requests.
+      action_timeouts:
+        A dictionary mapping names of client actions to Timeouts objects,
+        overrides the default timeouts for these actions.
+      observers:
+        A list of callables, which are called with an
+        npg_porch_cli.metrics.RequestEvent object for every request sent
+        via the client once it has completed or failed. Observers are
+        called in the thread which sent the request and should return
+        quickly and not raise.
+      throttle:
+        npg_porch_cli.throttle.Throttle object, optional, limits the rate of
+        requests and the number of requests in flight. Each attempt to send
+        a request, including retries, is subject to the limits. Waiting for
+        the limits counts towards the deadline of the request.
+      circuit_breaker:
+        npg_porch_cli.breaker.CircuitBreaker object, optional. While the
+        circuit for a server is open, attempts to send a request to it,
+        including retries, fail at once with
+        npg_porch_cli.exceptions.CircuitOpenException. The state of the
+        circuit is reported to the observers.
+      response_cache:
+        npg_porch_cli.response_cache.ResponseCache object, optional. If
+        set, GET requests are made conditional on cached replies and
+        unchanged replies are served from the cache. Observers see the
+        server's '304 Not Modified' reply.
+      compress_requests:
+        A flag defining whether request bodies of at least
+        `compress_min_size` bytes are compressed with gzip, false by
+        default. Enable it only if the server accepts compressed requests.
+      compress_min_size:
+        The minimum size in bytes of a request body to compress.
+    """
+
+    pool_connections: int = field(default=DEFAULT_POOL_CONNECTIONS)
+    pool_maxsize: int = field(default=DEFAULT_POOL_MAXSIZE)
+    max_retries: int = field(default=DEFAULT_MAX_RETRIES)
+    keep_alive: bool = field(default=True)
+    retry_policy: RetryPolicy = field(default_factory=RetryPolicy)
+    timeouts: Timeouts = field(default_factory=Timeouts)
+    action_timeouts: dict[str, Timeouts] = field(default_factory=dict)
+    observers: list[Callable[[RequestEvent], None]] = field(default_factory=list)
+    throttle: Throttle | None = field(default=None)
+    circuit_breaker: CircuitBreaker | None = field(default=None)
+    response_cache: ResponseCache | None = field(default=None)
+    compress_requests: bool = field(default=False)
+    compress_min_size: int = field(default=DEFAULT_COMPRESS_MIN_SIZE)
+    _session: requests.Session | None = field(default=None, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def __post_init__(self):
+        "Post-constructor hook. Ensures the pool parameters are valid."
+        if self.pool_connections < 1 or self.pool_maxsize < 1:
+            raise ValueError("Connection pool size should be a positive integer")
+        if self.max_retries < 0:
+            raise ValueError("The number of retries cannot be negative")
+
+    @property
+    def session(self) -> requests.Session:
+        """Returns the requests.Session object, creating it if necessary."""
+
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._create_session()
+        return self._session
+
+    def timeouts_for(self, action: str | None) -> Timeouts:
+        """Returns timeouts for the client action, falling back to the
+        default timeouts of the client.
+        """
+
+        return self.action_timeouts.get(action, self.timeouts)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        timeouts: Timeouts | None = None,
+        operation: str | None = None,
+        **kwargs,
+    ) -> requests.Response:
+        """Sends an HTTP request using the pooled session.
+
+        Failed requests are retried according to the client's retry policy
+        unless the deadline would pass before the next attempt. If all
+        attempts fail, the last response is returned or the last error is
+        raised. DeadlineExceeded is raised if the deadline passes before
+        the first attempt.
+
+        Args:
+          method:
+            The HTTP method to use.
+          url:
+            A URL to send the request to.
+          timeouts:
+            npg_porch_cli.http_client.Timeouts object, optional. If not
+            given, the default timeouts of the client are used.
+          operation:
+            The name of the operation the request is sent for, optional,
+            for example, the name of a client action. It is passed to the
+            observers of the client.
+
+        Other arguments are the same as for requests.Session.request, except
+        `timeout`, which is set from the timeouts.
+        """
+
+        if timeouts is None:
+            timeouts = self.timeouts
+
+        cache_key = None
+        cached = None
+        if self.response_cache is not None and method.upper() == "GET":
+            headers = kwargs.get("headers") or {}
+            if not any(name in headers for name in CONDITIONAL_HEADERS):
+                cache_key = self.response_cache.key(url, kwargs.get("params"), headers)
+                cached = self.response_cache.get(cache_key)
+                if cached is not None:
+                    kwargs["headers"] = headers | cached.conditional_headers()
+        if self.compress_requests:
+            _compress_body(kwargs, self.compress_min_size)
+
+        with profiling.call(operation):
+            response = self._observed_request(method, url, timeouts, operation, kwargs)
+        if cache_key is not None:
+            response = self.response_cache.update(
+                cache_key, cached, response, stream=kwargs.get("stream", False)
+            )
+        return response
+
+    def _observed_request(
+        self,
+        method: str,
+        url: str,
+        timeouts: Timeouts,
+        operation: str | None,
+        kwargs: dict,
+    ) -> requests.Response:
+        if not self.observers:
+            return self._request(method, url, timeouts, [0], kwargs)
+
+        attempts = [0]
+        start = time.perf_counter()
+        try:
+            response = self._request(method, url, timeouts, attempts, kwargs)
+        except Exception as e:
+            self._notify(
+                RequestEvent(
+                    operation=operation,
+                    method=method,
+                    url=url,
+                    duration=time.perf_counter() - start,
+                    bytes_sent=_body_size(getattr(e, "request", None)),
+                    retries=max(attempts[0] - 1, 0),
+                    exception=e,
+                    circuit_state=self._circuit_state(url),
+                )
+            )
+            raise
+        self._notify(
+            RequestEvent(
+                operation=operation,
+                method=method,
+                url=url,
+                status_code=response.status_code,
+                duration=time.perf_counter() - start,
+                bytes_sent=_body_size(response.request),
+                bytes_received=_content_size(response, kwargs.get("stream", False)),
+                retries=attempts[0] - 1,
+                circuit_state=self._circuit_state(url),
+            )
+        )
+        return response
+
+    def _request(
+        self, method: str, url: str, timeouts: Timeouts, attempts: list, kwargs: dict
+    ) -> requests.Response:
+        expires = None
+        if timeouts.deadline is not None:
+            expires = time.monotonic() + timeouts.deadline
+
+        attempt = 0
+        while True:
+            attempt += 1
+            attempts[0] = attempt
+            response, error = self._attempt(method, url, timeouts, expires, kwargs)
+            if error is not None:
+                if not self.retry_policy.retry_error(method, error, attempt):
+                    raise error
+                delay = self.retry_policy.delay(attempt)
+                if not _before_deadline(expires, delay):
+                    raise error
+                time.sleep(delay)
+                continue
+
+            if not self.retry_policy.retry_response(method, response, attempt):
+                return response
+            delay = self.retry_policy.delay(attempt, response)
+            if not _before_deadline(expires, delay):
+                return response
+            response.close()
+            time.sleep(delay)
+
+    def _attempt(
+        self,
+        method: str,
+        url: str,
+        timeouts: Timeouts,
+        expires: float | None,
+        kwargs: dict,
+    ) -> tuple[requests.Response | None, Exception | None]:
+        """Sends the request once, subject to the circuit breaker and the
+        throttle of the client. Returns either the response or the error.
+
+        Errors caused by the deadline of the caller rather than by the
+        server, the deadline expiring before the request is sent or a
+        timeout shortened by the deadline, are not counted by the circuit
+        breaker.
+        """
+
+        # Fails before asking the circuit breaker if the deadline has passed.
+        _attempt_timeout(timeouts, expires)
+        release = None
+        if self.circuit_breaker is not None:
+            release = self.circuit_breaker.acquire(url)
+        failed = None
+        try:
+            # The request slot is not held while waiting for a retry.
+            with self._throttled(url, timeouts, expires):
+                timeout = _attempt_timeout(timeouts, expires)
+                kwargs["timeout"] = timeout
+                start = time.perf_counter()
+                try:
+                    response = self._send(method, url, kwargs)
+                except requests.exceptions.RequestException as e:
+                    failed = not (
+                        isinstance(e, requests.exceptions.Timeout)
+                        and timeout != (timeouts.connect, timeouts.read)
+                    )
+                    return None, e
+            if release is not None:
+                failed = self.circuit_breaker.failed(
+                    response.status_code, time.perf_counter() - start
+                )
+            return response, None
+        finally:
+            if release is not None:
+                release(failed)
+
+    def _circuit_state(self, url: str) -> str | None:
+        if self.circuit_breaker is None:
+            return None
+        return self.circuit_breaker.state(url)
+
+    def _throttled(self, url: str, timeouts: Timeouts, expires: float | None):
+        if self.throttle is None:
+            return nullcontext()
+        return self._throttle_limit(url, timeouts, expires)
+
+    @contextmanager
+    def _throttle_limit(self, url: str, timeouts: Timeouts, expires: float | None):
+        timeout = None if expires is None else expires - time.monotonic()
+        try:
+            with profiling.phase("throttle"):
+                release = self.throttle.acquire(url, timeout)
+        except ThrottleTimeout as e:
+            raise DeadlineExceeded(
+                f"Deadline of {timeouts.deadline} seconds exceeded "
+                "waiting for the request limits"
+            ) from e
+        try:
+            yield
+        finally:
+            release()
+
+    def _send(self, method: str, url: str, kwargs: dict) -> requests.Response:
+        if profiling.get_profiler() is None or kwargs.get("stream"):
+            return self.session.request(method, url, **kwargs)
+        # Read the body here rather than in requests, so that the time it
+        # takes is reported.
+        response = self.session.request(method, url, **dict(kwargs, stream=True))
+        with profiling.phase("download"):
+            response.content
+        return response
+
+    def _notify(self, event: RequestEvent):
+        for observer in self.observers:
+            observer(event)
+
+    def close(self):
+        """Closes all pooled connections. The client can be used again."""
+
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _create_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=self.max_retries,
+        )
+        profiling.instrument_adapter(adapter)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        if not self.keep_alive:
+            session.headers["Connection"] = "close"
+        return session
+
+
+def _compress_body(kwargs: dict, min_size: int):
+    """Compresses the request body with gzip if it is large enough."""
+
+    data = kwargs.get("data")
+    if not isinstance(data, bytes) or len(data) < min_size:
+        return
+    with profiling.phase("encode"):
+        kwargs["data"] = gzip.compress(data, compresslevel=COMPRESS_LEVEL)
+    kwargs["headers"] = (kwargs.get("headers") or {}) | {"Content-Encoding": "gzip"}
+
+
+def _attempt_timeout(timeouts: Timeouts, expires: float | None) -> tuple[float, float]:
+    if expires is None:
+        return (timeouts.connect, timeouts.read)
+    remaining = expires - time.monotonic()
+    if remaining <= 0:
+        raise DeadlineExceeded(f"Deadline of {timeouts.deadline} seconds exceeded")
+    return (min(timeouts.connect, remaining), min(timeouts.read, remaining))
+
+
+def _body_size(request: requests.PreparedRequest | None) -> int:
+    body = getattr(request, "body", None)
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return 0
+
+
+def _content_size(response: requests.Response, stream: bool) -> int | None:
+    # The body of a streamed reply has not been read yet.
+    if stream:
+        length = response.headers.get("Content-Length")
+        return int(length) if length and length.isdigit() else None
+    return len(response.content)
+
+
+def _before_deadline(expires: float | None, delay: float) -> bool:
+    return expires is None or time.monotonic() + delay < expires
+
+
+_default_client: HttpClient | None = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> HttpClient:
+    """Returns a shared HttpClient object, creating it on first use.
+
+    This client is used by all functions of the npg_porch_cli.api module
+    unless a client is passed explicitly.
+    """
+
+    global _default_client
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = HttpClient()
+    return _default_client
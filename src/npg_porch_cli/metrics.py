@@ -0,0 +1,323 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Instrumentation of requests to the porch server.
+
+An observer is any callable taking a RequestEvent object. Observers are
+registered with an HTTP client, see npg_porch_cli.http_client.HttpClient,
+and are called once for every request the client sends, after the request
+has completed or failed, including all retries.
+
+MetricsRegistry is an observer which aggregates events in memory and dumps
+the aggregated metrics in the Prometheus text format or as JSON.
+
+Example:
+
+  from npg_porch_cli.http_client import HttpClient
+  from npg_porch_cli.metrics import MetricsRegistry
+
+  registry = MetricsRegistry()
+  client = HttpClient(observers=[registry])
+  ...
+  print(registry.to_prometheus())
+"""
+
+import json
+import threading
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from npg_porch_cli.breaker import CIRCUIT_STATES
+
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+METRICS_PREFIX = "npg_porch_client"
+
+
+@dataclass(kw_only=True)
+class RequestEvent:
+    """A completed or failed request to the porch server.
+
+    Attributes:
+      operation:
+        The name of the client action the request was sent for or another
+        name of the operation, for example, 'get_schema'. None if not known.
+      method:
+        The HTTP method.
+      url:
+        The URL of the request.
+      status_code:
+        The HTTP status code of the reply, None if the request failed.
+      duration:
+        The time in seconds from sending the request, including all retries,
+        to receiving the reply or failing.
+      bytes_sent:
+        The size of the request body in bytes.
+      bytes_received:
+        The size of the reply body in bytes, None if not known, for example,
+        for streamed replies without a Content-Length header.
+      retries:
+        The number of retries.
+      exception:
+        The exception raised, None if the reply has been received.
+      circuit_state:
+        The state of the client's circuit breaker for the server once the
+        request has completed or failed, see npg_porch_cli.breaker. None if
+        the client has no circuit breaker.
+    """
+
+    operation: str | None = field(default=None)
+    method: str
+    url: str
+    status_code: int | None = field(default=None)
+    duration: float
+    bytes_sent: int = field(default=0)
+    bytes_received: int | None = field(default=None)
+    retries: int = field(default=0)
+    exception: Exception | None = field(default=None)
+    circuit_state: str | None = field(default=None)
+
+    @property
+    def status(self) -> str:
+        """The status code as a string or 'error' if the request failed."""
+
+        return "error" if self.status_code is None else str(self.status_code)
+
+
+@dataclass
+class _Series:
+    buckets: list[int]
+    count: int = 0
+    duration_sum: float = 0.0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    retries: int = 0
+
+
+class MetricsRegistry:
+    """An in-process registry of request metrics.
+
+    Metrics are aggregated per operation and status, i.e. the HTTP status
+    code or 'error' for failed requests: the number of requests, a latency
+    histogram, the number of bytes sent and received and the number of
+    retries. Exceptions are counted per operation and exception type. The
+    latest state of the circuit breaker is kept per server; requests rejected
+    by an open circuit are counted as CircuitOpenException exceptions.
+
+    The registry is thread-safe and can be shared by many clients.
+
+    Args:
+      buckets:
+        Upper bounds in seconds of the latency histogram buckets, optional.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._exceptions: dict[tuple[str, str], int] = {}
+        self._circuits: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent):
+        self.observe(event)
+
+    def observe(self, event: RequestEvent):
+        """Records the event."""
+
+        operation = event.operation or ""
+        key = (operation, event.status)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = _Series(buckets=[0] * len(self.buckets))
+                self._series[key] = series
+            series.count += 1
+            series.duration_sum += event.duration
+            for index, bound in enumerate(self.buckets):
+                if event.duration <= bound:
+                    series.buckets[index] += 1
+            series.bytes_sent += event.bytes_sent
+            series.bytes_received += event.bytes_received or 0
+            series.retries += event.retries
+            if event.exception is not None:
+                exception_key = (operation, type(event.exception).__name__)
+                self._exceptions[exception_key] = (
+                    self._exceptions.get(exception_key, 0) + 1
+                )
+            if event.circuit_state is not None:
+                self._circuits[_server(event.url)] = event.circuit_state
+
+    def reset(self):
+        """Drops all recorded metrics."""
+
+        with self._lock:
+            self._series.clear()
+            self._exceptions.clear()
+            self._circuits.clear()
+
+    def snapshot(self) -> dict:
+        """Returns the recorded metrics as a JSON-compatible dictionary.
+
+        The dictionary has the 'requests' key, a list of per operation and
+        status metrics, the 'exceptions' key, a list of per operation and
+        exception type counts, and the 'circuits' key, a list of the latest
+        circuit breaker states per server. Histogram buckets are cumulative
+        and keyed by their upper bounds.
+        """
+
+        with self._lock:
+            requests = [
+                {
+                    "operation": operation,
+                    "status": status,
+                    "count": series.count,
+                    "duration_sum": series.duration_sum,
+                    "duration_buckets": {
+                        str(bound): count
+                        for bound, count in zip(self.buckets, series.buckets)
+                    },
+                    "bytes_sent": series.bytes_sent,
+                    "bytes_received": series.bytes_received,
+                    "retries": series.retries,
+                }
+                for (operation, status), series in sorted(self._series.items())
+            ]
+            exceptions = [
+                {"operation": operation, "exception": name, "count": count}
+                for (operation, name), count in sorted(self._exceptions.items())
+            ]
+            circuits = [
+                {"server": server, "state": state}
+                for server, state in sorted(self._circuits.items())
+            ]
+        return {"requests": requests, "exceptions": exceptions, "circuits": circuits}
+
+    def to_json(self) -> str:
+        """Returns the recorded metrics as a JSON document, see snapshot."""
+
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Returns the recorded metrics in the Prometheus text format."""
+
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name: str, kind: str, description: str):
+            lines.append(f"# HELP {METRICS_PREFIX}_{name} {description}")
+            lines.append(f"# TYPE {METRICS_PREFIX}_{name} {kind}")
+
+        def sample(name: str, labels: dict, value):
+            label_text = ",".join(
+                f'{key}="{_escape(str(val))}"' for key, val in labels.items()
+            )
+            lines.append(f"{METRICS_PREFIX}_{name}{{{label_text}}} {value}")
+
+        family("requests_total", "counter", "Requests sent to the porch server.")
+        for s in snapshot["requests"]:
+            labels = {"operation": s["operation"], "status": s["status"]}
+            sample("requests_total", labels, s["count"])
+
+        family(
+            "request_duration_seconds",
+            "histogram",
+            "Duration of requests, including retries.",
+        )
+        for s in snapshot["requests"]:
+            labels = {"operation": s["operation"], "status": s["status"]}
+            for bound, count in s["duration_buckets"].items():
+                sample("request_duration_seconds_bucket", labels | {"le": bound}, count)
+            sample(
+                "request_duration_seconds_bucket", labels | {"le": "+Inf"}, s["count"]
+            )
+            sample("request_duration_seconds_sum", labels, s["duration_sum"])
+            sample("request_duration_seconds_count", labels, s["count"])
+
+        for name, key, description in (
+            ("request_bytes_total", "bytes_sent", "Bytes sent in request bodies."),
+            ("response_bytes_total", "bytes_received", "Bytes received in replies."),
+            ("retries_total", "retries", "Retries of failed requests."),
+        ):
+            family(name, "counter", description)
+            for s in snapshot["requests"]:
+                labels = {"operation": s["operation"], "status": s["status"]}
+                sample(name, labels, s[key])
+
+        family("exceptions_total", "counter", "Requests which raised an exception.")
+        for e in snapshot["exceptions"]:
+            labels = {"operation": e["operation"], "exception": e["exception"]}
+            sample("exceptions_total", labels, e["count"])
+
+        family(
+            "circuit_state",
+            "gauge",
+            "State of the circuit breaker per server, 1 for the current state.",
+        )
+        for c in snapshot["circuits"]:
+            for state in CIRCUIT_STATES:
+                sample(
+                    "circuit_state",
+                    {"server": c["server"], "state": state},
+                    int(state == c["state"]),
+                )
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, format: str = "json") -> str:
+        """Returns the recorded metrics in the given format, either 'json' or
+        'prometheus'.
+        """
+
+        if format == "json":
+            return self.to_json()
+        if format == "prometheus":
+            return self.to_prometheus()
+        raise ValueError(f"Metrics format '{format}' is not supported")
+
+
+def _server(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Returns a shared MetricsRegistry object.
+
+    The shared registry is not registered with any client by default.
+    """
+
+    return _registry
@@ -0,0 +1,407 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""An opt-in profiler for client calls.
+
+When profiling is enabled, the time spent in each call to the porch server
+is broken down into phases:
+
+  action    - creating and validating a PorchAction object, except for the
+              requests it sends
+  encode    - encoding the request body as JSON
+  throttle  - waiting for the client's request limits, see
+              npg_porch_cli.throttle
+  dns       - resolving the server's host name
+  connect   - establishing a TCP connection
+  tls       - the TLS handshake
+  request   - sending the request
+  server    - waiting for the server's reply headers
+  download  - reading the reply body
+  decode    - decoding the reply body
+  other     - time not attributed to any of the above
+
+The dns, connect and tls phases are only present when a new connection is
+opened. Times of phases are exclusive, i.e. a phase does not include the
+time of phases nested in it, for example, the schema retrieval triggered by
+validation of a PorchAction object is not part of the action phase.
+
+Profiling is enabled either by calling `enable` or by setting the
+NPG_PORCH_PROFILE environment variable before npg_porch_cli.api is
+imported. With NPG_PORCH_PROFILE=1 a summary is printed to STDERR when the
+process exits, with NPG_PORCH_PROFILE=calls a breakdown of every call is
+printed as well. If the NPG_PORCH_PROFILE_DUMP environment variable is set
+to a file path, the process is also profiled with cProfile and the
+statistics are written to this file, which can be examined with the pstats
+module. cProfile only profiles the thread which enabled it.
+
+This module is imported by the HTTP client stack and adds a negligible
+overhead when profiling is not enabled.
+"""
+
+import atexit
+import os
+import sys
+import threading
+import time
+from contextlib import nullcontext
+
+NPG_PORCH_PROFILE_ENV_VAR = "NPG_PORCH_PROFILE"
+NPG_PORCH_PROFILE_DUMP_ENV_VAR = "NPG_PORCH_PROFILE_DUMP"
+
+PHASES = (
+    "action",
+    "encode",
+    "throttle",
+    "dns",
+    "connect",
+    "tls",
+    "request",
+    "server",
+    "download",
+    "decode",
+    "other",
+)
+
+_NULL_CONTEXT = nullcontext()
+
+
+class Profiler:
+    """Accumulates the time of client calls and their phases.
+
+    Args:
+      per_call:
+        If true, a breakdown of every call is written to the output as soon
+        as the call has finished.
+      dump_path:
+        A file path, optional. If given, cProfile is run while the profiler
+        is enabled and its statistics are written to this file when the
+        profiler is stopped.
+      output:
+        A file-like object to write reports to, STDERR by default.
+    """
+
+    def __init__(
+        self, per_call: bool = False, dump_path: str | None = None, output=None
+    ):
+        self.per_call = per_call
+        self.dump_path = dump_path
+        self.output = output
+        self._phases: dict[str, list] = {}
+        self._calls: dict[str, list] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._cprofile = None
+
+    def start(self):
+        """Starts cProfile if a dump file is given."""
+
+        if self.dump_path is not None and self._cprofile is None:
+            import cProfile
+
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def stop(self):
+        """Stops cProfile, if running, and writes its statistics to the dump
+        file.
+        """
+
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.dump_path)
+            self._cprofile = None
+
+    def phase(self, name: str) -> "_Phase":
+        """Returns a context manager timing a phase of a call."""
+
+        return _Phase(self, name)
+
+    def call(self, operation: str | None):
+        """Returns a context manager timing a call to the server.
+
+        Calls nested in another call in the same thread, for example, the
+        request sent by an action function, are accounted to the outer call.
+        """
+
+        if getattr(self._local, "call", None) is not None:
+            return _NULL_CONTEXT
+        return _Call(self, operation or "")
+
+    def snapshot(self) -> dict:
+        """Returns the accumulated times as a dictionary with the 'calls' and
+        'phases' keys. Each maps a name to a dictionary with the number of
+        occurrences, 'count', and the total and maximum time in seconds,
+        'total' and 'max'.
+        """
+
+        def convert(stats: dict) -> dict:
+            return {
+                name: {"count": count, "total": total, "max": maximum}
+                for name, (count, total, maximum) in stats.items()
+            }
+
+        with self._lock:
+            return {
+                "calls": convert(self._calls),
+                "phases": convert(
+                    {
+                        name: self._phases[name]
+                        for name in PHASES
+                        if name in self._phases
+                    }
+                ),
+            }
+
+    def report(self) -> str:
+        """Returns a summary of the accumulated times as a text table."""
+
+        snapshot = self.snapshot()
+        lines = []
+        for title, stats in (
+            ("call", snapshot["calls"]),
+            ("phase", snapshot["phases"]),
+        ):
+            lines.append(
+                f"{title:<16} {'count':>8} {'total_ms':>12} {'mean_ms':>10} {'max_ms':>10}"
+            )
+            for name, s in stats.items():
+                lines.append(
+                    f"{name:<16} {s['count']:>8} {s['total'] * 1000:>12.3f} "
+                    f"{s['total'] * 1000 / s['count']:>10.3f} {s['max'] * 1000:>10.3f}"
+                )
+        return "\n".join(lines)
+
+    def _write(self, text: str):
+        print(text, file=self.output or sys.stderr, flush=True)
+
+    def _add(self, stats: dict, name: str, elapsed: float):
+        with self._lock:
+            entry = stats.get(name)
+            if entry is None:
+                stats[name] = [1, elapsed, elapsed]
+            else:
+                entry[0] += 1
+                entry[1] += elapsed
+                entry[2] = max(entry[2], elapsed)
+
+
+class _Phase:
+    def __init__(self, profiler: Profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        local = self.profiler._local
+        self.parent = getattr(local, "phase", None)
+        self.nested = 0.0
+        local.phase = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.perf_counter() - self.start
+        self.profiler._local.phase = self.parent
+        if self.parent is not None:
+            self.parent.nested += elapsed
+        exclusive = elapsed - self.nested
+        self.profiler._add(self.profiler._phases, self.name, exclusive)
+        call = getattr(self.profiler._local, "call", None)
+        if call is not None:
+            call.phases[self.name] = call.phases.get(self.name, 0.0) + exclusive
+
+
+class _Call:
+    def __init__(self, profiler: Profiler, operation: str):
+        self.profiler = profiler
+        self.operation = operation
+        self.phases: dict[str, float] = {}
+
+    def __enter__(self):
+        self.profiler._local.call = self
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.perf_counter() - self.start
+        profiler = self.profiler
+        profiler._local.call = None
+        other = max(elapsed - sum(self.phases.values()), 0.0)
+        profiler._add(profiler._phases, "other", other)
+        profiler._add(profiler._calls, self.operation, elapsed)
+        if profiler.per_call:
+            phases = " ".join(
+                f"{name}={self.phases[name] * 1000:.3f}"
+                for name in PHASES
+                if name in self.phases
+            )
+            profiler._write(
+                f"npg_porch_cli profile: {self.operation} "
+                f"total={elapsed * 1000:.3f} {phases} other={other * 1000:.3f} (ms)"
+            )
+
+
+_profiler: Profiler | None = None
+
+
+def enable(
+    per_call: bool = False, dump_path: str | None = None, output=None
+) -> Profiler:
+    """Enables profiling, replacing the current profiler, if any.
+
+    See Profiler for the description of arguments.
+
+    Returns:
+      The new Profiler object.
+    """
+
+    global _profiler
+    disable()
+    _profiler = Profiler(per_call=per_call, dump_path=dump_path, output=output)
+    _profiler.start()
+    return _profiler
+
+
+def disable() -> Profiler | None:
+    """Disables profiling, stops cProfile, if running, and writes its dump.
+
+    Returns:
+      The disabled Profiler object or None if profiling was not enabled.
+    """
+
+    global _profiler
+    profiler, _profiler = _profiler, None
+    if profiler is not None:
+        profiler.stop()
+    return profiler
+
+
+def get_profiler() -> Profiler | None:
+    """Returns the current Profiler object, None if profiling is disabled."""
+
+    return _profiler
+
+
+def phase(name: str):
+    """Returns a context manager timing a phase of a call, a no-op context
+    manager if profiling is disabled.
+    """
+
+    if _profiler is None:
+        return _NULL_CONTEXT
+    return _profiler.phase(name)
+
+
+def call(operation: str | None):
+    """Returns a context manager timing a call to the server, a no-op context
+    manager if profiling is disabled.
+    """
+
+    if _profiler is None:
+        return _NULL_CONTEXT
+    return _profiler.call(operation)
+
+
+def instrument_adapter(adapter):
+    """Makes the requests.adapters.HTTPAdapter object use HTTP connections
+    which time the dns, connect, tls, request and server phases while
+    profiling is enabled.
+    """
+
+    adapter.poolmanager.pool_classes_by_scheme = _profiled_pool_classes()
+
+
+_pool_classes = None
+
+
+def _profiled_pool_classes() -> dict:
+    global _pool_classes
+    if _pool_classes is not None:
+        return _pool_classes
+
+    import socket
+
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    class ProfiledMixin:
+        def _new_conn(self):
+            if _profiler is None:
+                return super()._new_conn()
+            with phase("connect"):
+                host = self._dns_host
+                try:
+                    with phase("dns"):
+                        address = socket.getaddrinfo(
+                            host, self.port, 0, socket.SOCK_STREAM
+                        )[0][4][0]
+                except OSError:
+                    # Let urllib3 resolve the name again and report the error.
+                    return super()._new_conn()
+                # Connect to the resolved address, so that the name is not
+                # resolved twice. Unlike urllib3, this does not try other
+                # addresses of the host if the first one fails.
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                finally:
+                    self._dns_host = host
+
+        def request(self, *args, **kwargs):
+            with phase("request"):
+                return super().request(*args, **kwargs)
+
+        def getresponse(self, *args, **kwargs):
+            with phase("server"):
+                return super().getresponse(*args, **kwargs)
+
+    class ProfiledHTTPConnection(ProfiledMixin, HTTPConnection):
+        pass
+
+    class ProfiledHTTPSConnection(ProfiledMixin, HTTPSConnection):
+        def connect(self):
+            with phase("tls"):
+                return super().connect()
+
+    class ProfiledHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = ProfiledHTTPConnection
+
+    class ProfiledHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = ProfiledHTTPSConnection
+
+    _pool_classes = {
+        "http": ProfiledHTTPConnectionPool,
+        "https": ProfiledHTTPSConnectionPool,
+    }
+    return _pool_classes
+
+
+def _enable_from_environment():
+    value = os.environ.get(NPG_PORCH_PROFILE_ENV_VAR, "")
+    dump_path = os.environ.get(NPG_PORCH_PROFILE_DUMP_ENV_VAR) or None
+    if value.lower() in ("", "0", "false", "no") and dump_path is None:
+        return
+    profiler = enable(per_call=value.lower() == "calls", dump_path=dump_path)
+
+    def report():
+        if _profiler is profiler:
+            disable()
+            profiler._write(profiler.report())
+
+    atexit.register(report)
+
+
+_enable_from_environment()
@@ -0,0 +1,189 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Compact typed records for large task listings.
+
+A listing of tasks decoded into dictionaries holds a copy of the pipeline
+dictionary and of the task input for every task. Task records share a single
+Pipeline object per distinct pipeline, store the status as a TaskStatus
+member and keep the task input as compact JSON. Filtering records by
+pipeline and status compares objects by identity rather than comparing
+dictionaries.
+
+Records trade speed for memory. The listing is decoded in full, as for
+dictionaries, then the task input of each record is encoded again as
+compact JSON, and it is decoded once more every time the `task_input`
+attribute is accessed. Building records is therefore slower than decoding
+the listing into dictionaries, about 20% for a listing of small task
+inputs, while the records take a fraction of the memory. Records are
+useful for listings which are too large to hold as dictionaries, not for
+speeding up listings.
+
+Records are returned by npg_porch_cli.api.list_tasks and
+npg_porch_cli.api.iter_tasks if the `typed_results` attribute of the action
+is set.
+"""
+
+import sys
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
+from enum import StrEnum
+
+from npg_porch_cli import serialization
+from npg_porch_cli.api import PORCH_STATUSES, Pipeline
+
+TaskStatus = StrEnum("TaskStatus", [(status, status) for status in PORCH_STATUSES])
+TaskStatus.__doc__ = """Task statuses known to the client.
+
+Members are strings, so they compare equal to, and are encoded in JSON as,
+their values, for example, TaskStatus.DONE == "DONE".
+"""
+_STATUSES = {member.value: member for member in TaskStatus}
+
+
+@dataclass(kw_only=True, slots=True)
+class Task:
+    """A task registered with the porch server.
+
+    Attributes:
+      pipeline:
+        npg_porch_cli.api.Pipeline object, shared by all records created by
+        the same TaskRecordFactory for tasks of this pipeline, therefore it
+        should not be changed.
+      task_input_id:
+        The identifier of the task input assigned by the server.
+      status:
+        The status of the task, a TaskStatus member or, if the server has
+        statuses unknown to the client, a string.
+      task_input_json:
+        The task input as a compact JSON string, re-encoded from the decoded
+        listing.
+    """
+
+    pipeline: Pipeline
+    task_input_id: str | None = field(default=None)
+    status: TaskStatus | str | None = field(default=None)
+    task_input_json: str = field(default="null", repr=False)
+
+    @property
+    def task_input(self) -> dict:
+        """The task input, decoded on every access."""
+
+        return serialization.loads(self.task_input_json)
+
+    def to_dict(self) -> dict:
+        """Returns the task as a dictionary in the format of the server."""
+
+        return {
+            "pipeline": {
+                "name": self.pipeline.name,
+                "uri": self.pipeline.uri,
+                "version": self.pipeline.version,
+            },
+            "task_input_id": self.task_input_id,
+            "task_input": self.task_input,
+            "status": None if self.status is None else str(self.status),
+        }
+
+
+class TaskRecordFactory:
+    """Creates Task records from tasks decoded into dictionaries.
+
+    The factory keeps one Pipeline object per distinct pipeline and reuses it
+    for all records of tasks of this pipeline.
+    """
+
+    def __init__(self):
+        self._pipelines: dict[tuple, Pipeline] = {}
+
+    def pipeline(self, pipeline: Pipeline | dict) -> Pipeline:
+        """Returns the shared Pipeline object equal to the given pipeline,
+        which is either a Pipeline object or a dictionary.
+        """
+
+        if isinstance(pipeline, Pipeline):
+            key = (pipeline.name, pipeline.uri, pipeline.version)
+        else:
+            key = (pipeline["name"], pipeline["uri"], pipeline["version"])
+        shared = self._pipelines.get(key)
+        if shared is None:
+            shared = Pipeline(name=key[0], uri=key[1], version=key[2])
+            self._pipelines[key] = shared
+        return shared
+
+    def task(self, task: dict) -> Task:
+        """Returns a Task record for the task given as a dictionary."""
+
+        return Task(
+            pipeline=self.pipeline(task["pipeline"]),
+            task_input_id=task.get("task_input_id"),
+            status=task_status(task.get("status")),
+            # Some backends over-allocate the buffer of the encoded bytes,
+            # a string holds a compact copy.
+            task_input_json=serialization.dumps(task.get("task_input")).decode(),
+        )
+
+
+def task_status(status: str | None) -> TaskStatus | str | None:
+    """Converts a status string to a TaskStatus member. Statuses unknown to
+    the client are returned as interned strings.
+    """
+
+    if status is None:
+        return None
+    member = _STATUSES.get(status)
+    if member is None:
+        return sys.intern(status)
+    return member
+
+
+def select_tasks(
+    tasks: Iterable[dict],
+    pipeline: Pipeline | None = None,
+    status: str | None = None,
+    factory: TaskRecordFactory | None = None,
+) -> Iterator[Task]:
+    """Converts tasks given as dictionaries to Task records and yields
+    records of tasks matching the filters.
+
+    Args:
+      tasks:
+        An iterable of tasks decoded into dictionaries.
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional. If given, only tasks of
+        this pipeline are yielded.
+      status:
+        A task status, optional. If given, only tasks with this status are
+        yielded.
+      factory:
+        TaskRecordFactory object, optional. Passing the same factory to
+        several calls makes all records share Pipeline objects.
+
+    Yields:
+      Task records.
+    """
+
+    if factory is None:
+        factory = TaskRecordFactory()
+    wanted = factory.pipeline(pipeline) if pipeline is not None else None
+    status = task_status(status)
+    for task in tasks:
+        record = factory.task(task)
+        if (wanted is None or record.pipeline is wanted) and (
+            status is None or record.status == status
+        ):
+            yield record
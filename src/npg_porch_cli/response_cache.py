@@ -0,0 +1,238 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A cache of replies to GET requests revalidated with conditional requests.
+
+Replies which have an ETag or a Last-Modified header are kept in memory,
+keyed by the URL with the query and by the credentials of the request.
+When the same URL is requested again, the request carries the
+If-None-Match and If-Modified-Since headers. If the server replies with
+'304 Not Modified', the client is given the cached reply instead, so an
+unchanged listing costs a round trip with an empty reply.
+
+The cache is used by npg_porch_cli.http_client.HttpClient if it is set as
+its `response_cache`. Requests which already have conditional headers are
+not cached. The least recently used replies are dropped once the total
+size of the cached bodies exceeds `max_size`.
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_RESPONSE_CACHE_SIZE = 32 * 1024 * 1024
+
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+@dataclass(kw_only=True)
+class CachedResponse:
+    """A cached reply.
+
+    Attributes:
+      body:
+        The decoded body of the reply.
+      content_type:
+        The value of the Content-Type header, optional.
+      etag:
+        The value of the ETag header, optional.
+      last_modified:
+        The value of the Last-Modified header, optional.
+    """
+
+    body: bytes
+    content_type: str | None = field(default=None)
+    etag: str | None = field(default=None)
+    last_modified: str | None = field(default=None)
+
+    def conditional_headers(self) -> dict:
+        """Returns HTTP headers for revalidating the cached reply."""
+
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def response(self, not_modified: requests.Response) -> requests.Response:
+        """Returns a requests.Response object with the cached body for the
+        '304 Not Modified' reply of the server.
+        """
+
+        response = requests.Response()
+        response.status_code = 200
+        response.reason = "OK"
+        response.url = not_modified.url
+        response.request = not_modified.request
+        response.elapsed = not_modified.elapsed
+        response.encoding = "utf-8"
+        response.headers = CaseInsensitiveDict({"Content-Length": str(len(self.body))})
+        for name, value in (
+            ("Content-Type", self.content_type),
+            ("ETag", self.etag),
+            ("Last-Modified", self.last_modified),
+        ):
+            if value is not None:
+                response.headers[name] = value
+        response._content = self.body
+        response._content_consumed = True
+        return response
+
+
+@dataclass(kw_only=True)
+class ResponseCache:
+    """A thread-safe in-memory cache of replies to GET requests, see the
+    module documentation.
+
+    Attributes:
+      max_size:
+        The maximum total size in bytes of the cached bodies.
+    """
+
+    max_size: int = field(default=DEFAULT_RESPONSE_CACHE_SIZE)
+    hits: int = field(default=0, init=False)
+    _entries: OrderedDict = field(
+        default_factory=OrderedDict, init=False, repr=False, compare=False
+    )
+    _size: int = field(default=0, init=False, repr=False)
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        "Post-constructor hook. Ensures the size is valid."
+        if self.max_size < 1:
+            raise ValueError("Cache size should be a positive integer")
+
+    @staticmethod
+    def key(url: str, params: dict | None, headers: dict | None) -> tuple:
+        """Returns the cache key of a request."""
+
+        if params:
+            query = urlencode(sorted(params.items()), doseq=True)
+            url = f"{url}{'&' if '?' in url else '?'}{query}"
+        return (url, (headers or {}).get("Authorization"))
+
+    def get(self, key: tuple) -> CachedResponse | None:
+        """Returns the cached reply for the key, None if there is none."""
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+            return cached
+
+    def update(
+        self,
+        key: tuple,
+        cached: CachedResponse | None,
+        response: requests.Response,
+        stream: bool = False,
+    ) -> requests.Response:
+        """Updates the cache from the server's reply to a request, which was
+        made conditional on the cached reply, if any. Returns the reply to
+        give to the client.
+
+        Args:
+          key:
+            The cache key of the request.
+          cached:
+            The cached reply the request was made conditional on, optional.
+          response:
+            The server's reply.
+          stream:
+            True if the body of the reply is streamed. The body is cached
+            once it has been read in full with `iter_content`.
+        """
+
+        if response.status_code == 304 and cached is not None:
+            response.close()
+            with self._lock:
+                self.hits += 1
+            return cached.response(response)
+
+        if response.status_code != 200:
+            return response
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if etag is None and last_modified is None:
+            self._remove(key)
+            return response
+
+        entry = CachedResponse(
+            body=b"",
+            content_type=response.headers.get("Content-Type"),
+            etag=etag,
+            last_modified=last_modified,
+        )
+        if not stream:
+            entry.body = response.content
+            self._store(key, entry)
+        else:
+            response.iter_content = self._tee(key, entry, response.iter_content)
+        return response
+
+    def clear(self):
+        """Drops all cached replies."""
+
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _tee(self, key: tuple, entry: CachedResponse, iter_content):
+        def iter_and_store(chunk_size=1, decode_unicode=False) -> Iterator:
+            chunks = []
+            size = 0
+            for chunk in iter_content(chunk_size, decode_unicode):
+                if chunks is not None:
+                    size += len(chunk)
+                    if size > self.max_size or not isinstance(chunk, bytes):
+                        chunks = None
+                    else:
+                        chunks.append(chunk)
+                yield chunk
+            if chunks is not None:
+                entry.body = b"".join(chunks)
+                self._store(key, entry)
+
+        return iter_and_store
+
+    def _store(self, key: tuple, entry: CachedResponse):
+        size = len(entry.body)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
+            if size > self.max_size:
+                return
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_size:
+                _, dropped = self._entries.popitem(last=False)
+                self._size -= len(dropped.body)
+
+    def _remove(self, key: tuple):
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous.body)
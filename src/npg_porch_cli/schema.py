@@ -0,0 +1,412 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from urllib.parse import urljoin
+
+from npg_porch_cli.exceptions import ServerErrorException
+from npg_porch_cli.http_client import HttpClient, get_default_client
+
+PORCH_OPENAPI_SCHEMA_URL = "api/v1/openapi.json"
+PORCH_TASK_STATUS_ENUM_NAME = "TaskStateEnum"
+
+DEFAULT_SCHEMA_TTL = 3600
+
+NPG_PORCH_CACHE_DIR_ENV_VAR = "NPG_PORCH_CACHE_DIR"
+
+
+@dataclass(kw_only=True)
+class ServerSchema:
+    """A summary of the porch server's OpenAPI schema document.
+
+    Only the parts of the schema the client needs are retained, together
+    with the validators that are used to revalidate the cached copy.
+    """
+
+    porch_url: str
+    task_statuses: list[str]
+    operation_parameters: dict[str, list[str]] = field(default_factory=dict)
+    etag: str | None = field(default=None)
+    last_modified: str | None = field(default=None)
+    fetched_at: float = field(default=0.0)
+
+    def query_parameters(self, method: str, path: str) -> set[str]:
+        """Returns a set of names of query parameters the server advertises
+        for the API endpoint.
+
+        Args:
+          method:
+            HTTP method, for example, 'GET'.
+          path:
+            Endpoint path as listed in the OpenAPI schema, for example, '/tasks/'.
+        """
+
+        return set(self.operation_parameters.get(f"{method.upper()} {path}", []))
+
+    def has_operation(self, method: str, path: str) -> bool:
+        """Returns true if the server advertises the API endpoint."""
+
+        return f"{method.upper()} {path}" in self.operation_parameters
+
+
+@dataclass(kw_only=True)
+class SchemaCache:
+    """A cache of porch server schemas keyed by the server URL.
+
+    Schemas are kept in memory and, if `cache_dir` is set, are persisted
+    to disk so that they can be shared between processes. A cached schema
+    which is older than `ttl` seconds is revalidated with a conditional
+    request, which costs a 304 reply if the schema has not changed. If `ttl`
+    is None, cached schemas never expire and have to be invalidated
+    explicitly, for example, after the server is upgraded.
+
+    Attributes:
+      cache_dir:
+        A directory to persist the schemas in, optional.
+      ttl:
+        Time in seconds after which a cached schema is revalidated.
+    """
+
+    cache_dir: str | None = field(default=None)
+    ttl: float | None = field(default=DEFAULT_SCHEMA_TTL)
+    _schemas: dict[str, ServerSchema] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+    _fetch_locks: dict[str, threading.Lock] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    def get(
+        self,
+        porch_url: str,
+        validate_ca_cert: bool = True,
+        client: HttpClient | None = None,
+    ) -> ServerSchema:
+        """Returns the schema for the porch server.
+
+        The schema is retrieved from the server only if it is not cached
+        or the cached copy has expired.
+
+        Args:
+          porch_url:
+            The base URL of the porch server.
+          validate_ca_cert:
+            A boolean flag defining whether the server CA certificate
+            will be validated.
+          client:
+            npg_porch_cli.http_client.HttpClient object, optional
+        """
+
+        with self._lock:
+            schema = self._cached(porch_url)
+            if schema is not None and not self.expired(schema):
+                return schema
+            fetch_lock = self._fetch_locks.setdefault(porch_url, threading.Lock())
+
+        # The schema is retrieved once for concurrent callers, without
+        # blocking access to the schemas of other servers.
+        with fetch_lock:
+            with self._lock:
+                schema = self._cached(porch_url)
+            if schema is not None and not self.expired(schema):
+                return schema
+            url = urljoin(porch_url, PORCH_OPENAPI_SCHEMA_URL)
+            if client is None:
+                client = get_default_client()
+            response = client.request(
+                "GET",
+                url,
+                headers=self.conditional_headers(schema),
+                verify=validate_ca_cert,
+                operation="get_schema",
+            )
+            return self.update(porch_url, schema, response)
+
+    def peek(self, porch_url: str) -> ServerSchema | None:
+        """Returns the cached schema for the porch server without contacting
+        the server. The returned schema might have expired, see `expired`.
+        None is returned if there is no cached schema.
+        """
+
+        with self._lock:
+            return self._cached(porch_url)
+
+    def expired(self, schema: ServerSchema) -> bool:
+        """Returns true if the cached schema should be revalidated."""
+
+        if self.ttl is None:
+            return False
+        return time.time() - schema.fetched_at > self.ttl
+
+    def conditional_headers(self, schema: ServerSchema | None) -> dict:
+        """Returns HTTP headers for revalidating the cached schema."""
+
+        headers = {}
+        if schema is not None:
+            if schema.etag:
+                headers["If-None-Match"] = schema.etag
+            if schema.last_modified:
+                headers["If-Modified-Since"] = schema.last_modified
+        return headers
+
+    def update(
+        self, porch_url: str, cached: ServerSchema | None, response
+    ) -> ServerSchema:
+        """Updates the cache from the server's response to a (conditional)
+        request for the OpenAPI schema document and returns the schema.
+
+        This method allows for retrieving the document by other means than
+        the `get` method, for example, asynchronously.
+
+        Args:
+          porch_url:
+            The base URL of the porch server.
+          cached:
+            The cached schema the request was made for, see `peek`.
+          response:
+            The server's response, a requests.Response object or an object
+            with the same `ok`, `status_code`, `reason`, `url` and `headers`
+            attributes and the `json` method.
+        """
+
+        with self._lock:
+            return self._update(porch_url, cached, response)
+
+    def invalidate(self, porch_url: str | None = None):
+        """Removes a cached schema, both from memory and from disk.
+
+        Args:
+          porch_url:
+            The base URL of the porch server. If not given, all cached
+            schemas are removed.
+        """
+
+        with self._lock:
+            urls = list(self._schemas.keys()) if porch_url is None else [porch_url]
+            for url in urls:
+                self._schemas.pop(url, None)
+            if self.cache_dir is None or not os.path.isdir(self.cache_dir):
+                return
+            if porch_url is None:
+                paths = [
+                    os.path.join(self.cache_dir, name)
+                    for name in os.listdir(self.cache_dir)
+                    if name.startswith("schema-") and name.endswith(".json")
+                ]
+            else:
+                paths = [self._path(porch_url)]
+            for path in paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def _cached(self, porch_url: str) -> ServerSchema | None:
+        schema = self._schemas.get(porch_url)
+        if schema is None:
+            schema = self._load(porch_url)
+            if schema is not None:
+                self._schemas[porch_url] = schema
+        return schema
+
+    def _path(self, porch_url: str) -> str:
+        digest = hashlib.sha256(porch_url.encode()).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"schema-{digest}.json")
+
+    def _load(self, porch_url: str) -> ServerSchema | None:
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._path(porch_url)) as fh:
+                schema = ServerSchema(**json.load(fh))
+        except (OSError, ValueError, TypeError):
+            return None
+        return schema if schema.porch_url == porch_url else None
+
+    def _store(self, schema: ServerSchema):
+        if self.cache_dir is None:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as fh:
+            json.dump(asdict(schema), fh)
+        os.replace(tmp_path, self._path(schema.porch_url))
+
+    def _update(
+        self, porch_url: str, cached: ServerSchema | None, response
+    ) -> ServerSchema:
+        if cached is not None and response.status_code == 304:
+            cached.fetched_at = time.time()
+            schema = cached
+        elif not response.ok:
+            raise ServerErrorException(
+                f"Failed to get OpenAPI Schema. "
+                f'Status code {response.status_code} "{response.reason}" '
+                f"received from {response.url}",
+                status_code=response.status_code,
+            )
+        else:
+            document = response.json()
+            schema = ServerSchema(
+                porch_url=porch_url,
+                task_statuses=_parse_task_statuses(
+                    document, urljoin(porch_url, PORCH_OPENAPI_SCHEMA_URL)
+                ),
+                operation_parameters=_parse_operation_parameters(document),
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+                fetched_at=time.time(),
+            )
+        self._schemas[porch_url] = schema
+        self._store(schema)
+        return schema
+
+
+def _parse_task_statuses(document: dict, url: str) -> list[str]:
+    valid_statuses = []
+    error_message = f"Failed to get enumeration of valid statuses from {url}"
+    try:
+        valid_statuses = document["components"]["schemas"][PORCH_TASK_STATUS_ENUM_NAME][
+            "enum"
+        ]
+    except Exception as e:
+        raise Exception(f"{error_message}: " + e.__str__())
+
+    if len(valid_statuses) == 0:
+        raise Exception(error_message)
+
+    return valid_statuses
+
+
+def _parse_operation_parameters(document: dict) -> dict[str, list[str]]:
+    operation_parameters = {}
+    for path, operations in document.get("paths", {}).items():
+        for method, operation in operations.items():
+            if not isinstance(operation, dict):
+                continue
+            operation_parameters[f"{method.upper()} {path}"] = [
+                p["name"]
+                for p in operation.get("parameters", [])
+                if p.get("in") == "query" and "name" in p
+            ]
+    return operation_parameters
+
+
+_schema_cache = SchemaCache(cache_dir=os.environ.get(NPG_PORCH_CACHE_DIR_ENV_VAR))
+
+
+def get_schema_cache() -> SchemaCache:
+    """Returns the schema cache shared by all client code in this package.
+
+    If the NPG_PORCH_CACHE_DIR environment variable is set, the shared
+    cache persists schemas in this directory.
+    """
+
+    return _schema_cache
+
+
+def invalidate_schema_cache(porch_url: str | None = None):
+    """Invalidates the shared schema cache, for example, after a porch server
+    upgrade.
+
+    Args:
+      porch_url:
+        The base URL of the porch server. If not given, schemas for all
+        servers are invalidated.
+    """
+
+    _schema_cache.invalidate(porch_url)
+
+
+def get_task_statuses(
+    porch_url: str, validate_ca_cert: bool = True, client: HttpClient | None = None
+) -> list[str]:
+    """Returns a list of valid task statuses for the porch server.
+
+    The list is retrieved from the server's OpenAPI schema document via
+    the shared schema cache.
+    """
+
+    return _schema_cache.get(
+        porch_url=porch_url, validate_ca_cert=validate_ca_cert, client=client
+    ).task_statuses
+
+
+def get_query_parameters(
+    porch_url: str,
+    method: str,
+    path: str,
+    validate_ca_cert: bool = True,
+    client: HttpClient | None = None,
+) -> set[str]:
+    """Returns a set of names of query parameters the porch server advertises
+    for the API endpoint.
+
+    An empty set is returned if the server's OpenAPI schema document cannot
+    be retrieved or parsed.
+    """
+
+    schema = _optional_schema(porch_url, validate_ca_cert, client)
+    if schema is None:
+        return set()
+    return schema.query_parameters(method, path)
+
+
+def has_operation(
+    porch_url: str,
+    method: str,
+    path: str,
+    validate_ca_cert: bool = True,
+    client: HttpClient | None = None,
+) -> bool:
+    """Returns true if the porch server advertises the API endpoint.
+
+    False is returned if the server's OpenAPI schema document cannot be
+    retrieved or parsed.
+    """
+
+    schema = _optional_schema(porch_url, validate_ca_cert, client)
+    if schema is None:
+        return False
+    return schema.has_operation(method, path)
+
+
+def _optional_schema(
+    porch_url: str, validate_ca_cert: bool, client: HttpClient | None
+) -> ServerSchema | None:
+    """Returns the schema for the porch server or None if it cannot be
+    retrieved or parsed, for callers which can do without it.
+    """
+
+    try:
+        return _schema_cache.get(
+            porch_url=porch_url, validate_ca_cert=validate_ca_cert, client=client
+        )
+    except Exception:
+        # Any error, of the server, of the connection or of a document
+        # without the expected content, means the features of the server
+        # are not known.
+        return None
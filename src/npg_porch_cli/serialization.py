@@ -0,0 +1,183 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""JSON encoding and decoding of request and reply bodies.
+
+The fastest available backend is used: orjson or msgspec if installed,
+otherwise the json module of the standard library. orjson is installed with
+the `fast` extra, for example, `pip install npg_porch_cli[fast]`. The
+NPG_PORCH_JSON environment variable, if set to the name of a backend,
+selects this backend instead.
+
+All backends encode dataclasses, for example, npg_porch_cli.api.Pipeline,
+as JSON objects directly, without converting them to dictionaries first.
+"""
+
+import json
+import os
+from collections.abc import Callable
+from dataclasses import dataclass, fields, is_dataclass
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+NPG_PORCH_JSON_ENV_VAR = "NPG_PORCH_JSON"
+BACKENDS = ("orjson", "msgspec", "json")
+
+
+@dataclass(kw_only=True, frozen=True)
+class Backend:
+    """A JSON backend.
+
+    Attributes:
+      name:
+        The name of the backend, one of BACKENDS.
+      dumps:
+        A callable encoding an object as compact UTF-8 encoded JSON.
+      dumps_indented:
+        A callable encoding an object as UTF-8 encoded JSON indented by two
+        spaces.
+      loads:
+        A callable decoding JSON given as bytes or a string. Invalid JSON
+        is reported by raising ValueError.
+    """
+
+    name: str
+    dumps: Callable[[object], bytes]
+    dumps_indented: Callable[[object], bytes]
+    loads: Callable[[bytes | str], object]
+
+
+def available_backends() -> list[str]:
+    """Returns names of the backends which can be used, fastest first."""
+
+    return [name for name in BACKENDS if _installed(name)]
+
+
+def get_backend() -> Backend:
+    """Returns the backend in use."""
+
+    return _backend
+
+
+def set_backend(name: str | None = None) -> Backend:
+    """Selects the backend to use.
+
+    Args:
+      name:
+        The name of the backend, one of BACKENDS, optional. If not given,
+        the backend named by the NPG_PORCH_JSON environment variable or,
+        if it is not set, the fastest available backend is selected.
+
+    Returns:
+      The selected Backend object.
+    """
+
+    global _backend
+    if name is None:
+        name = os.environ.get(NPG_PORCH_JSON_ENV_VAR) or available_backends()[0]
+    if name not in BACKENDS:
+        raise ValueError(
+            f"JSON backend '{name}' is not valid. "
+            "Valid backends: " + ", ".join(BACKENDS)
+        )
+    if not _installed(name):
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    _backend = _create_backend(name)
+    return _backend
+
+
+def dumps(obj, indent: bool = False) -> bytes:
+    """Encodes the object as UTF-8 encoded JSON, compact by default or
+    indented by two spaces.
+    """
+
+    if indent:
+        return _backend.dumps_indented(obj)
+    return _backend.dumps(obj)
+
+
+def loads(data: bytes | str):
+    """Decodes a JSON document."""
+
+    return _backend.loads(data)
+
+
+def _installed(name: str) -> bool:
+    return {"orjson": orjson, "msgspec": msgspec, "json": json}[name] is not None
+
+
+def _create_backend(name: str) -> Backend:
+    if name == "orjson":
+        return Backend(
+            name=name,
+            dumps=orjson.dumps,
+            dumps_indented=lambda obj: orjson.dumps(obj, option=orjson.OPT_INDENT_2),
+            loads=orjson.loads,
+        )
+
+    if name == "msgspec":
+        encoder = msgspec.json.Encoder()
+        decoder = msgspec.json.Decoder()
+
+        def loads(data):
+            # Errors are raised as ValueError, like by other backends.
+            try:
+                return decoder.decode(data)
+            except msgspec.DecodeError as e:
+                raise ValueError(str(e)) from e
+
+        return Backend(
+            name=name,
+            dumps=encoder.encode,
+            dumps_indented=lambda obj: msgspec.json.format(
+                encoder.encode(obj), indent=2
+            ),
+            loads=loads,
+        )
+
+    encoder = json.JSONEncoder(
+        default=_encode_dataclass, allow_nan=False, separators=(",", ":")
+    )
+    indented_encoder = json.JSONEncoder(
+        default=_encode_dataclass, allow_nan=False, indent=2
+    )
+    return Backend(
+        name=name,
+        dumps=lambda obj: encoder.encode(obj).encode(),
+        dumps_indented=lambda obj: indented_encoder.encode(obj).encode(),
+        loads=json.loads,
+    )
+
+
+def _encode_dataclass(obj) -> dict:
+    # Fields are encoded by the encoder itself, unlike dataclasses.asdict,
+    # which copies them recursively.
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_backend = None
+set_backend()
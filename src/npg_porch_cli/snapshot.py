@@ -0,0 +1,357 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A local snapshot of tasks for fast repeated queries.
+
+The snapshot is an SQLite database file holding the tasks listed by the
+porch server, indexed by pipeline, status and the canonical hash of the task
+input, see npg_porch_cli.canonical.task_input_hash. Queries, for example,
+"which tasks of the pipeline are FAILED" or "is this task input registered",
+are answered from the indexes without listing tasks on the server.
+
+The snapshot is refreshed by listing tasks on the server. If the server
+advertises the MODIFIED_SINCE_PARAMETER query parameter for listing tasks
+and the listed tasks have the MODIFIED_FIELD attribute, only tasks modified
+since the previous refresh are retrieved and merged into the snapshot.
+Otherwise, all tasks are retrieved and replace the content of the snapshot.
+Tasks deleted on the server stay in the snapshot until the next full
+refresh.
+
+Example:
+
+  from npg_porch_cli.api import PorchAction
+  from npg_porch_cli.snapshot import TaskSnapshot
+
+  with TaskSnapshot("tasks.sqlite") as snapshot:
+      snapshot.refresh(
+          PorchAction(porch_url="https://myporch.com", action="snapshot")
+      )
+      failed = snapshot.query(status="FAILED")
+"""
+
+import sqlite3
+import time
+from collections.abc import Iterable
+
+from npg_porch_cli import serialization
+from npg_porch_cli._tasks import iter_all_tasks, tasks_query
+from npg_porch_cli.api import PORCH_TASKS_PATH, Pipeline, PorchAction
+from npg_porch_cli.canonical import task_input_hash
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.schema import get_query_parameters
+
+MODIFIED_SINCE_PARAMETER = "modified_since"
+MODIFIED_FIELD = "modified"
+INSERT_BATCH_SIZE = 1000
+
+# Any pipeline, the scope of snapshots of all tasks.
+_ALL_PIPELINES = ("", "", "")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    pipeline_name TEXT NOT NULL,
+    pipeline_uri TEXT NOT NULL,
+    pipeline_version TEXT NOT NULL,
+    task_input_hash TEXT NOT NULL,
+    task_input_id TEXT,
+    status TEXT,
+    modified TEXT,
+    task TEXT NOT NULL,
+    PRIMARY KEY (pipeline_name, pipeline_uri, pipeline_version, task_input_hash)
+);
+CREATE INDEX IF NOT EXISTS tasks_by_status ON tasks (status, pipeline_name);
+CREATE INDEX IF NOT EXISTS tasks_by_input ON tasks (task_input_hash);
+CREATE TABLE IF NOT EXISTS refreshes (
+    pipeline_name TEXT NOT NULL,
+    pipeline_uri TEXT NOT NULL,
+    pipeline_version TEXT NOT NULL,
+    refreshed REAL NOT NULL,
+    modified TEXT,
+    PRIMARY KEY (pipeline_name, pipeline_uri, pipeline_version)
+);
+CREATE TABLE IF NOT EXISTS properties (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+class TaskSnapshot:
+    """A snapshot of tasks of a porch server stored in an SQLite file.
+
+    The snapshot should be closed when no longer needed, either by calling
+    `close` or by using the snapshot as a context manager.
+
+    Args:
+      path:
+        The path of the SQLite file. The file is created if it does not
+        exist.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.executescript(_SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Closes the SQLite file."""
+
+        self._db.close()
+
+    @property
+    def porch_url(self) -> str | None:
+        """The URL of the server the snapshot was taken from, None if the
+        snapshot has never been refreshed.
+        """
+
+        row = self._db.execute(
+            "SELECT value FROM properties WHERE name = 'porch_url'"
+        ).fetchone()
+        return row[0] if row else None
+
+    def refresh(
+        self,
+        action: PorchAction,
+        pipeline: Pipeline | None = None,
+        client: HttpClient | None = None,
+    ) -> dict:
+        """Updates the snapshot with tasks listed by the server.
+
+        Args:
+          action:
+            npg_porch_cli.api.PorchAction object, which defines the server
+            and the parameters of requests.
+          pipeline:
+            npg_porch_cli.api.Pipeline object, optional. If given, only tasks
+            of this pipeline are refreshed.
+          client:
+            npg_porch_cli.http_client.HttpClient object, optional
+
+        Returns:
+          A dictionary with the refresh mode, 'full' or 'incremental', the
+          number of tasks retrieved from the server, 'retrieved', and the
+          number of tasks in the snapshot, 'total'.
+        """
+
+        self.check_server(action.porch_url)
+        supported = get_query_parameters(
+            porch_url=action.porch_url,
+            method="GET",
+            path=PORCH_TASKS_PATH,
+            validate_ca_cert=action.validate_ca_cert,
+            client=client,
+        )
+        # All statuses are retrieved, the status filter applies to queries.
+        listing = PorchAction(
+            porch_url=action.porch_url,
+            action="list_tasks",
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=action.timeouts,
+            token=action.token,
+        )
+        params, _, paginated = tasks_query(listing, pipeline, supported)
+        scope = _pipeline_key(pipeline) if pipeline is not None else _ALL_PIPELINES
+
+        modified_since = None
+        if MODIFIED_SINCE_PARAMETER in supported:
+            row = self._db.execute(
+                "SELECT modified FROM refreshes WHERE pipeline_name = ? "
+                "AND pipeline_uri = ? AND pipeline_version = ?",
+                scope,
+            ).fetchone()
+            if row is None and pipeline is not None:
+                # A refresh of all tasks covers every pipeline.
+                row = self._db.execute(
+                    "SELECT modified FROM refreshes WHERE pipeline_name = '' "
+                    "AND pipeline_uri = '' AND pipeline_version = ''"
+                ).fetchone()
+            if row is not None and row[0] is not None:
+                modified_since = row[0]
+                params = params | {MODIFIED_SINCE_PARAMETER: modified_since}
+
+        started = time.time()
+        tasks = iter_all_tasks(listing, client, params, paginated)
+        if pipeline is not None:
+            # The server filters by pipeline name only.
+            tasks = (task for task in tasks if _pipeline_key(task["pipeline"]) == scope)
+
+        with self._db:
+            if modified_since is None:
+                if pipeline is None:
+                    self._db.execute("DELETE FROM tasks")
+                else:
+                    self._db.execute(
+                        "DELETE FROM tasks WHERE pipeline_name = ? "
+                        "AND pipeline_uri = ? AND pipeline_version = ?",
+                        scope,
+                    )
+            retrieved, modified = self._insert(tasks)
+            if modified is None:
+                modified = modified_since
+            self._db.execute(
+                "INSERT OR REPLACE INTO refreshes VALUES (?, ?, ?, ?, ?)",
+                scope + (started, modified),
+            )
+            self._set_porch_url(action.porch_url)
+
+        return {
+            "mode": "full" if modified_since is None else "incremental",
+            "retrieved": retrieved,
+            "total": self.count(),
+        }
+
+    def query(
+        self,
+        pipeline: Pipeline | None = None,
+        status: str | None = None,
+        task_input: dict | None = None,
+    ) -> list[dict]:
+        """Returns tasks in the snapshot matching all given filters, ordered
+        by pipeline and the hash of the task input.
+
+        Args:
+          pipeline:
+            npg_porch_cli.api.Pipeline object, optional
+          status:
+            A task status, optional
+          task_input:
+            A task input, optional. Task inputs are compared by their
+            canonical hash, so the order of keys does not matter.
+
+        Returns:
+          A list of dictionaries representing tasks, as listed by the server.
+        """
+
+        conditions = []
+        values = []
+        if pipeline is not None:
+            conditions.append(
+                "pipeline_name = ? AND pipeline_uri = ? AND pipeline_version = ?"
+            )
+            values.extend(_pipeline_key(pipeline))
+        if status is not None:
+            conditions.append("status = ?")
+            values.append(status)
+        if task_input is not None:
+            conditions.append("task_input_hash = ?")
+            values.append(task_input_hash(task_input))
+
+        sql = "SELECT task FROM tasks"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += (
+            " ORDER BY pipeline_name, pipeline_uri, pipeline_version, task_input_hash"
+        )
+        return [serialization.loads(row[0]) for row in self._db.execute(sql, values)]
+
+    def has_task(self, pipeline: Pipeline, task_input) -> bool:
+        """Returns true if the snapshot has a task of the pipeline with the
+        task input.
+        """
+
+        row = self._db.execute(
+            "SELECT 1 FROM tasks WHERE pipeline_name = ? AND pipeline_uri = ? "
+            "AND pipeline_version = ? AND task_input_hash = ?",
+            _pipeline_key(pipeline) + (task_input_hash(task_input),),
+        ).fetchone()
+        return row is not None
+
+    def record(self, porch_url: str, tasks: Iterable[dict]):
+        """Adds tasks known to be registered with the server, for example,
+        tasks which have just been created, to the snapshot.
+
+        Args:
+          porch_url:
+            The URL of the server the tasks are registered with.
+          tasks:
+            An iterable of dictionaries representing tasks.
+        """
+
+        self.check_server(porch_url)
+        with self._db:
+            self._insert(tasks)
+            self._set_porch_url(porch_url)
+
+    def count(self) -> int:
+        """Returns the number of tasks in the snapshot."""
+
+        return self._db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+
+    def check_server(self, porch_url: str):
+        """Raises ValueError if the snapshot has been taken from a server
+        other than the given one.
+        """
+
+        taken_from = self.porch_url
+        if taken_from is not None and taken_from != porch_url:
+            raise ValueError(
+                f"Snapshot '{self.path}' has been taken from '{taken_from}', "
+                f"not from '{porch_url}'"
+            )
+
+    def _set_porch_url(self, porch_url: str):
+        self._db.execute(
+            "INSERT OR REPLACE INTO properties VALUES ('porch_url', ?)", (porch_url,)
+        )
+
+    def _insert(self, tasks: Iterable[dict]) -> tuple[int, str | None]:
+        """Inserts or replaces the tasks, returns the number of tasks and the
+        latest modification time of the tasks, if known.
+        """
+
+        count = 0
+        modified = None
+        rows = []
+        for task in tasks:
+            task_modified = task.get(MODIFIED_FIELD)
+            if task_modified is not None and (
+                modified is None or task_modified > modified
+            ):
+                modified = task_modified
+            rows.append(
+                _pipeline_key(task["pipeline"])
+                + (
+                    task_input_hash(task.get("task_input")),
+                    task.get("task_input_id"),
+                    task.get("status"),
+                    task_modified,
+                    serialization.dumps(task).decode(),
+                )
+            )
+            if len(rows) == INSERT_BATCH_SIZE:
+                count += self._insert_rows(rows)
+                rows = []
+        count += self._insert_rows(rows)
+        return count, modified
+
+    def _insert_rows(self, rows: list[tuple]) -> int:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO tasks VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        return len(rows)
+
+
+def _pipeline_key(pipeline: Pipeline | dict) -> tuple[str, str, str]:
+    if isinstance(pipeline, Pipeline):
+        return (pipeline.name, pipeline.uri, pipeline.version)
+    return (pipeline["name"], pipeline["uri"], pipeline["version"])
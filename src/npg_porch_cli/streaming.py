@@ -0,0 +1,178 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+_WHITESPACE = " \t\n\r"
+_STRUCTURE = re.compile(r'[\[\]{}"]')
+_STRING_END = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r"[,\]\s]")
+
+
+class _ElementEnd:
+    """Finds the end of a JSON value which spans chunks of the input.
+
+    The position up to which the value has been scanned, the nesting depth
+    and whether the position is inside a string are kept between calls, so
+    that every character is scanned once however many chunks the value
+    spans.
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self.depth = 0
+        self.in_string = False
+
+    def find(self, buffer: str, start: int) -> int | None:
+        """Returns the end position of the value starting at the start
+        position of the buffer or None if the buffer does not contain the
+        whole value. The buffer should hold the text scanned by previous
+        calls, starting at the same value.
+        """
+
+        pos = start + self.offset
+        if buffer[start] not in '[{"':
+            # A number or a literal ends with the next delimiter.
+            match = _SCALAR_END.search(buffer, pos)
+            if match is not None:
+                return match.start()
+            self.offset = len(buffer) - start
+            return None
+
+        while True:
+            if self.in_string:
+                match = _STRING_END.search(buffer, pos)
+                if match is None:
+                    break
+                if match.group() == "\\":
+                    # Skips the escaped character, which might be in the
+                    # next chunk.
+                    pos = match.end() + 1
+                    continue
+                self.in_string = False
+                pos = match.end()
+                if self.depth == 0:
+                    return pos
+                continue
+            match = _STRUCTURE.search(buffer, pos)
+            if match is None:
+                break
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+        self.offset = max(pos, len(buffer)) - start
+        return None
+
+
+def iter_json_array(chunks: Iterable[bytes]) -> Iterator:
+    """Parses a JSON array incrementally, yielding its elements one at a time.
+
+    Only a single element of the array and a single chunk of the input are
+    held in memory at any time, regardless of the size of the array. An
+    element which spans chunks is decoded once it has been received in
+    full, the time it takes is linear in its size.
+
+    Args:
+      chunks:
+        An iterable of consecutive chunks of a UTF-8 encoded JSON document,
+        for example, requests.Response.iter_content().
+
+    Raises ValueError if the document is not a valid JSON array.
+    """
+
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    state = "start"
+    # Set while the current element spans chunks.
+    element_end = None
+
+    def parse(buffer: str, final: bool) -> tuple[list, str]:
+        nonlocal state, element_end
+        items = []
+        pos = 0
+        length = len(buffer)
+        while True:
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos == length:
+                break
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise ValueError("Expected a JSON array")
+                state = "first"
+                pos += 1
+            elif state in ("first", "next") and char == "]":
+                state = "end"
+                pos += 1
+            elif state == "next":
+                if char != ",":
+                    raise ValueError(f"Expected ',' or ']' at position {pos}")
+                state = "value"
+                pos += 1
+            elif state in ("first", "value"):
+                if element_end is None:
+                    try:
+                        item, end = decoder.raw_decode(buffer, pos)
+                    except json.JSONDecodeError:
+                        if final:
+                            raise
+                        end = None
+                    # A number might be continued in the next chunk, even
+                    # if a prefix of it has been decoded, for example, '1.'
+                    # as 1, unless a delimiter follows it.
+                    if end is None or (
+                        not final
+                        and buffer[pos] not in '[{"'
+                        and _SCALAR_END.match(buffer, end) is None
+                    ):
+                        element_end = _ElementEnd()
+                if element_end is not None:
+                    # Rather than decoding the element again for every new
+                    # chunk, it is decoded once its end is found.
+                    if not final and element_end.find(buffer, pos) is None:
+                        break
+                    element_end = None
+                    item, end = decoder.raw_decode(buffer, pos)
+                items.append(item)
+                state = "next"
+                pos = end
+            else:
+                raise ValueError("Unexpected data after the end of the JSON array")
+        return items, buffer[pos:]
+
+    for chunk in chunks:
+        buffer += text_decoder.decode(chunk)
+        items, buffer = parse(buffer, final=False)
+        yield from items
+
+    buffer += text_decoder.decode(b"", final=True)
+    items, buffer = parse(buffer, final=True)
+    yield from items
+    if state != "end":
+        raise ValueError("Incomplete JSON array")
@@ -0,0 +1,278 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""Client-side limits on the load put on the porch server.
+
+A Throttle limits the rate at which requests are sent to a server with a
+token bucket and the number of requests in flight to the server at any
+time. Limits apply per server, i.e. per scheme, host and port of the URL.
+
+By default, the limits are shared by all threads using the same Throttle
+object, usually via the same npg_porch_cli.http_client.HttpClient object.
+If `lock_dir` is set, the state of the limits is kept in files in this
+directory, guarded by file locks, and the limits are shared by all
+processes on the host using the same directory, for example, by all jobs
+running on a cluster node. File locks require a POSIX system.
+
+Example:
+
+  from npg_porch_cli.http_client import HttpClient
+  from npg_porch_cli.throttle import Throttle
+
+  client = HttpClient(
+      throttle=Throttle(rate=20, max_in_flight=4, lock_dir="/tmp/porch_limits")
+  )
+"""
+
+import os
+import re
+import struct
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+# The longest time in seconds to wait before checking again whether a
+# request slot held by another process has been released.
+MAX_SLOT_POLL_INTERVAL = 0.05
+
+# The state of a shared token bucket, the number of tokens and the time
+# it was computed.
+_BUCKET = struct.Struct("dd")
+
+
+class ThrottleTimeout(TimeoutError):
+    """Raised when a request cannot be sent within the limits before the
+    given timeout expires.
+    """
+
+
+@dataclass(kw_only=True)
+class Throttle:
+    """Limits on the requests sent to porch servers.
+
+    Attributes:
+      rate:
+        The maximum sustained number of requests per second, optional.
+      burst:
+        The maximum number of requests sent at once after a period of
+        inactivity, defaults to the rate rounded up.
+      max_in_flight:
+        The maximum number of requests in flight at any time, optional. A
+        request is in flight from the time it is sent until the reply is
+        received, or, for streamed replies, until the headers of the reply
+        are received.
+      lock_dir:
+        A directory for sharing the limits between processes, optional. It
+        is created if it does not exist.
+    """
+
+    rate: float | None = field(default=None)
+    burst: int | None = field(default=None)
+    max_in_flight: int | None = field(default=None)
+    lock_dir: str | None = field(default=None)
+    _limits: dict[str, "_Limits"] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        "Post-constructor hook. Ensures the limits are valid."
+        if self.rate is not None and self.rate <= 0:
+            raise ValueError("Rate limit should be a positive number")
+        if self.burst is not None and self.burst < 1:
+            raise ValueError("Burst size should be a positive integer")
+        if self.max_in_flight is not None and self.max_in_flight < 1:
+            raise ValueError(
+                "The number of requests in flight should be a positive integer"
+            )
+        if self.burst is None and self.rate is not None:
+            self.burst = max(1, int(-(-self.rate // 1)))
+
+    def acquire(self, url: str, timeout: float | None = None) -> Callable[[], None]:
+        """Waits until a request to the URL can be sent within the limits and
+        takes a request slot, which should be released once the request is
+        no longer in flight.
+
+        Args:
+          url:
+            The URL of the request.
+          timeout:
+            The maximum time in seconds to wait, optional. ThrottleTimeout
+            is raised if the request cannot be sent in this time.
+
+        Returns:
+          A callable, which releases the request slot.
+        """
+
+        expires = None if timeout is None else time.monotonic() + timeout
+        limits = self._limits_for(url)
+        release = limits.acquire_slot(expires)
+        try:
+            limits.take_token(expires)
+        except BaseException:
+            release()
+            raise
+        return release
+
+    def _limits_for(self, url: str) -> "_Limits":
+        parts = urlsplit(url)
+        server = f"{parts.scheme}://{parts.netloc}"
+        limits = self._limits.get(server)
+        if limits is None:
+            with self._lock:
+                limits = self._limits.get(server)
+                if limits is None:
+                    if self.lock_dir is None:
+                        limits = _Limits(self)
+                    else:
+                        limits = _SharedLimits(self, server)
+                    self._limits[server] = limits
+        return limits
+
+
+class _Limits:
+    """The limits for a server shared by threads of this process."""
+
+    def __init__(self, throttle: Throttle):
+        self.rate = throttle.rate
+        self.burst = throttle.burst
+        self._lock = threading.Lock()
+        self._tokens = float(self.burst or 0)
+        self._updated = time.monotonic()
+        self._slots = None
+        if throttle.max_in_flight is not None:
+            self._slots = threading.BoundedSemaphore(throttle.max_in_flight)
+
+    def acquire_slot(self, expires: float | None):
+        if self._slots is None:
+            return _noop
+        if not self._slots.acquire(timeout=_remaining(expires)):
+            raise ThrottleTimeout("No request slot available before the timeout")
+        return self._slots.release
+
+    def take_token(self, expires: float | None):
+        if self.rate is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, self._updated, wait = _reserve(
+                self._tokens, self._updated, now, self.rate, self.burst, expires
+            )
+        time.sleep(wait)
+
+
+class _SharedLimits(_Limits):
+    """The limits for a server shared by processes via files in the lock
+    directory.
+    """
+
+    def __init__(self, throttle: Throttle, server: str):
+        self.rate = throttle.rate
+        self.burst = throttle.burst
+        self.max_in_flight = throttle.max_in_flight
+        os.makedirs(throttle.lock_dir, exist_ok=True)
+        self._prefix = os.path.join(
+            throttle.lock_dir, re.sub(r"[^A-Za-z0-9.-]+", "_", server)
+        )
+        self._lock = threading.Lock()
+
+    def acquire_slot(self, expires: float | None):
+        if self.max_in_flight is None:
+            return _noop
+
+        import fcntl
+
+        delay = 0.001
+        while True:
+            for index in range(self.max_in_flight):
+                fd = os.open(f"{self._prefix}.slot{index}", os.O_RDWR | os.O_CREAT)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    continue
+                # Closing the file releases the lock.
+                return lambda: os.close(fd)
+            remaining = _remaining(expires)
+            if remaining is not None and remaining <= 0:
+                raise ThrottleTimeout("No request slot available before the timeout")
+            time.sleep(delay if remaining is None else min(delay, remaining))
+            delay = min(delay * 2, MAX_SLOT_POLL_INTERVAL)
+
+    def take_token(self, expires: float | None):
+        if self.rate is None:
+            return
+
+        import fcntl
+
+        # The wall clock time is used, since it is the same for all processes.
+        with self._lock:
+            fd = os.open(f"{self._prefix}.rate", os.O_RDWR | os.O_CREAT)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                data = os.pread(fd, _BUCKET.size, 0)
+                now = time.time()
+                if len(data) == _BUCKET.size:
+                    tokens, updated = _BUCKET.unpack(data)
+                else:
+                    tokens, updated = float(self.burst), now
+                if expires is not None:
+                    expires = expires - time.monotonic() + now
+                tokens, updated, wait = _reserve(
+                    tokens, updated, now, self.rate, self.burst, expires
+                )
+                os.pwrite(fd, _BUCKET.pack(tokens, updated), 0)
+            finally:
+                os.close(fd)
+        time.sleep(wait)
+
+
+def _reserve(
+    tokens: float,
+    updated: float,
+    now: float,
+    rate: float,
+    burst: int,
+    expires: float | None,
+) -> tuple[float, float, float]:
+    """Takes a token from the bucket, returns the new number of tokens, the
+    time it was computed and the time to wait until the token is available.
+    The number of tokens becomes negative when requests wait for tokens.
+
+    Raises ThrottleTimeout, without taking the token, if the token is not
+    available before the expiry time.
+    """
+
+    tokens = min(float(burst), tokens + max(now - updated, 0.0) * rate)
+    wait = 0.0 if tokens >= 1 else (1 - tokens) / rate
+    if expires is not None and now + wait > expires:
+        raise ThrottleTimeout("Request rate limit not met before the timeout")
+    return tokens - 1, now, wait
+
+
+def _remaining(expires: float | None) -> float | None:
+    if expires is None:
+        return None
+    return max(expires - time.monotonic(), 0.0)
+
+
+def _noop():
+    pass
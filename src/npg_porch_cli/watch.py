@@ -0,0 +1,268 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+"""A change feed of task statuses.
+
+A TaskWatcher lists tasks periodically, keeps the last seen status of every
+task and reports tasks which are new or whose status has changed since the
+previous poll. The cost of a poll depends on what the server supports:
+
+  - If the server advertises the `modified_since` query parameter for
+    listing tasks, see npg_porch_cli.snapshot.MODIFIED_SINCE_PARAMETER,
+    only tasks modified since the previous poll are listed.
+  - If the server replies with an ETag header, the next listing is
+    requested conditionally and a '304 Not Modified' reply ends the poll
+    without transferring any tasks. Conditional requests are not used if
+    the listing is paginated.
+  - Otherwise all tasks are listed and compared with the last seen state,
+    which is held as a compact digest of the identity of each task mapped
+    to its status.
+"""
+
+import hashlib
+import sys
+import threading
+from collections.abc import Iterator
+from contextlib import closing
+from dataclasses import dataclass, field
+from urllib.parse import urljoin
+
+from npg_porch_cli._tasks import iter_all_tasks, tasks_query
+from npg_porch_cli.api import (
+    PORCH_TASKS_PATH,
+    STREAM_CHUNK_SIZE,
+    Pipeline,
+    PorchAction,
+    _send,
+    _timeouts,
+)
+from npg_porch_cli.canonical import canonical_json
+from npg_porch_cli.defaults import DEFAULT_WATCH_INTERVAL
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.schema import get_query_parameters
+from npg_porch_cli.snapshot import MODIFIED_FIELD, MODIFIED_SINCE_PARAMETER
+from npg_porch_cli.streaming import iter_json_array
+
+
+@dataclass(kw_only=True)
+class TaskEvent:
+    """A change of a task.
+
+    Attributes:
+      task:
+        The task as listed by the server.
+      status:
+        The current status of the task.
+      previous_status:
+        The status of the task at the previous poll, None for tasks which
+        have not been seen before.
+    """
+
+    task: dict
+    status: str | None
+    previous_status: str | None = field(default=None)
+
+
+class TaskWatcher:
+    """Polls the server for changes of tasks.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object, defines the server to use. If
+        its `task_status` attribute is set, only changes to this status are
+        reported.
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional. If given, only tasks
+        of this pipeline are watched.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+    """
+
+    def __init__(
+        self,
+        action: PorchAction,
+        pipeline: Pipeline | None = None,
+        client: HttpClient | None = None,
+    ):
+        self.action = action
+        self.pipeline = pipeline
+        self.client = client
+        self.polls = 0
+        self._state: dict[bytes, str | None] = {}
+        self._etag: tuple[dict, str] | None = None
+        self._modified_since: str | None = None
+
+    def poll(self) -> list[TaskEvent]:
+        """Lists tasks and returns events for tasks which are new or whose
+        status has changed since the previous poll. The first poll returns
+        events for all tasks.
+        """
+
+        action = self.action
+        supported = get_query_parameters(
+            porch_url=action.porch_url,
+            method="GET",
+            path=PORCH_TASKS_PATH,
+            validate_ca_cert=action.validate_ca_cert,
+            client=self.client,
+        )
+        # All statuses are listed so that tasks leaving and re-entering the
+        # watched status are noticed.
+        listing = PorchAction(
+            porch_url=action.porch_url,
+            action="list_tasks",
+            validate_ca_cert=action.validate_ca_cert,
+            timeouts=action.timeouts,
+            token=action.token,
+        )
+        params, _, paginated = tasks_query(listing, self.pipeline, supported)
+        if MODIFIED_SINCE_PARAMETER in supported and self._modified_since is not None:
+            params = params | {MODIFIED_SINCE_PARAMETER: self._modified_since}
+
+        self.polls += 1
+        if paginated:
+            return self._compare(iter_all_tasks(listing, self.client, params, True))
+
+        headers = None
+        if self._etag is not None and self._etag[0] == params:
+            # The tag is valid for the URL with the same query only.
+            headers = {"If-None-Match": self._etag[1]}
+        response = _send(
+            validate_ca_cert=action.validate_ca_cert,
+            url=urljoin(action.porch_url, "tasks"),
+            method="GET",
+            data=None,
+            auth_type="token",
+            client=self.client,
+            params=params or None,
+            timeouts=_timeouts(listing, self.client),
+            token=action.token,
+            operation=listing.action,
+            stream=True,
+            headers=headers,
+        )
+        with closing(response):
+            if response.status_code == 304:
+                return []
+            events = self._compare(
+                iter_json_array(response.iter_content(chunk_size=STREAM_CHUNK_SIZE))
+            )
+            etag = response.headers.get("ETag")
+            self._etag = (params, etag) if etag else None
+        return events
+
+    def _compare(self, tasks) -> list[TaskEvent]:
+        pipeline = self.pipeline
+        wanted_status = self.action.task_status
+        state = self._state
+        modified = self._modified_since
+        events = []
+        for task in tasks:
+            task_pipeline = task["pipeline"]
+            if pipeline is not None and (
+                task_pipeline["name"] != pipeline.name
+                or task_pipeline["uri"] != pipeline.uri
+                or task_pipeline["version"] != pipeline.version
+            ):
+                continue
+            task_modified = task.get(MODIFIED_FIELD)
+            if task_modified is not None and (
+                modified is None or task_modified > modified
+            ):
+                modified = task_modified
+
+            key = _task_key(task)
+            status = task.get("status")
+            if status is not None:
+                status = sys.intern(status)
+            previous = state.get(key, _UNSEEN)
+            if previous == status:
+                continue
+            state[key] = status
+            if wanted_status is None or status == wanted_status:
+                event = TaskEvent(task=task, status=status)
+                if previous is not _UNSEEN:
+                    event.previous_status = previous
+                events.append(event)
+        self._modified_since = modified
+        return events
+
+
+def watch_tasks(
+    action: PorchAction,
+    pipeline: Pipeline | None = None,
+    client: HttpClient | None = None,
+    interval: float = DEFAULT_WATCH_INTERVAL,
+    initial: bool = False,
+    max_polls: int | None = None,
+    stop_event: threading.Event | None = None,
+) -> Iterator[TaskEvent]:
+    """Polls the server for changes of tasks and yields them as events, see
+    TaskWatcher.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object, defines the server to use. If
+        its `task_status` attribute is set, only changes to this status are
+        reported.
+      pipeline:
+        npg_porch_cli.api.Pipeline object, optional
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+      interval:
+        Time in seconds between polls.
+      initial:
+        If true, events for all existing tasks are yielded after the first
+        poll, otherwise the first poll only records the state of tasks.
+      max_polls:
+        The maximum number of polls, optional. By default, the server is
+        polled until the stop event is set or the generator is closed.
+      stop_event:
+        A threading.Event object, optional. When it is set, polling stops.
+
+    Yields:
+      TaskEvent objects.
+    """
+
+    if stop_event is None:
+        stop_event = threading.Event()
+    watcher = TaskWatcher(action=action, pipeline=pipeline, client=client)
+    while not stop_event.is_set():
+        events = watcher.poll()
+        if initial or watcher.polls > 1:
+            yield from events
+        if max_polls is not None and watcher.polls >= max_polls:
+            break
+        stop_event.wait(interval)
+
+
+_UNSEEN = object()
+
+
+def _task_key(task: dict) -> bytes:
+    """Returns a digest of the identity of the task, its pipeline and either
+    its task input ID or its task input.
+    """
+
+    pipeline = task["pipeline"]
+    identity = task.get("task_input_id") or canonical_json(task.get("task_input"))
+    return hashlib.blake2b(
+        "\0".join(
+            (pipeline["name"], pipeline["uri"], pipeline["version"], identity)
+        ).encode(),
+        digest_size=16,
+    ).digest()
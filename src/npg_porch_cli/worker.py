@@ -0,0 +1,235 @@
+# Copyright (c) 2026 Genome Research Ltd.
+#
+# This file is part of npg_porch_cli project.
+#
+# npg_porch_cli is free software: you can redistribute it and/or modify it under
+# the terms of the GNU General Public License as published by the Free Software
+# Foundation; either version 3 of the License, or (at your option) any later
+# version.
+#
+# This program is distributed in the hope that it will be useful, but WITHOUT
+# ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS
+# FOR A PARTICULAR PURPOSE. See the GNU General Public License for more
+# details.
+#
+# You should have received a copy of the GNU General Public License along with
+# this program. If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import random
+import shlex
+import subprocess
+import threading
+from collections.abc import Callable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import replace
+
+import requests
+
+from npg_porch_cli.api import Pipeline, PorchAction, claim_task, update_task
+from npg_porch_cli.defaults import DEFAULT_CONCURRENCY
+from npg_porch_cli.exceptions import CircuitOpenException, ServerErrorException
+from npg_porch_cli.http_client import HttpClient
+
+DEFAULT_MIN_IDLE_SLEEP = 1.0
+DEFAULT_MAX_IDLE_SLEEP = 60.0
+# Attempts to set the status of a claimed task to RUNNING. If they all fail,
+# the task stays CLAIMED on the server.
+RUNNING_STATUS_ATTEMPTS = 3
+TRANSIENT_STATUSES = frozenset([408, 429])
+
+
+def claim_and_run(
+    action: PorchAction,
+    pipeline: Pipeline,
+    function: Callable[[dict], object],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    max_tasks: int | None = None,
+    exit_when_idle: bool = False,
+    min_idle_sleep: float = DEFAULT_MIN_IDLE_SLEEP,
+    max_idle_sleep: float = DEFAULT_MAX_IDLE_SLEEP,
+    stop_event: threading.Event | None = None,
+    client: HttpClient | None = None,
+) -> dict:
+    """Claims tasks of the pipeline and runs them in a pool of threads.
+
+    Tasks are claimed as long as there are free threads in the pool, as many
+    at a time as there are free threads if the server supports claiming
+    multiple tasks. Before a task is run, its status is set to RUNNING. When
+    the function returns, the status is set to DONE, and if the function
+    raises an exception, to FAILED.
+
+    If there is nothing to claim, the next claim is made after a delay, which
+    starts at `min_idle_sleep` seconds and doubles, up to `max_idle_sleep`
+    seconds, while the server has nothing to claim. The delay is cut short
+    when a running task completes. If claiming fails with an error which
+    may be transient, a connection error, a timeout, a '5xx' reply of the
+    server or '408' or '429', the error is counted and the next claim is
+    made after the same delay. Other errors are raised.
+
+    Setting the status of a claimed task to RUNNING is attempted up to
+    RUNNING_STATUS_ATTEMPTS times. If all attempts fail, the task is not run
+    and stays CLAIMED on the server, where it has to be reset by other means.
+
+    If the client has a circuit breaker, see npg_porch_cli.breaker, and the
+    circuit for the server is open, the worker waits until it lets requests
+    through again rather than failing.
+
+    Args:
+      action:
+        npg_porch_cli.api.PorchAction object, defines the server to use.
+      pipeline:
+        npg_porch_cli.api.Pipeline object
+      function:
+        A callable which takes a dictionary representing a claimed task.
+      concurrency:
+        The maximum number of tasks run at the same time.
+      max_tasks:
+        The maximum number of tasks to claim, optional. By default, tasks
+        are claimed until the worker is stopped.
+      exit_when_idle:
+        If true, the worker exits when there is nothing to claim and no
+        task is running.
+      min_idle_sleep:
+        The initial delay in seconds when there is nothing to claim.
+      max_idle_sleep:
+        The maximum delay in seconds when there is nothing to claim.
+      stop_event:
+        A threading.Event object, optional. When it is set, the worker stops
+        claiming tasks and returns once the running tasks are complete.
+      client:
+        npg_porch_cli.http_client.HttpClient object, optional
+
+    Returns:
+      A dictionary with the number of tasks that have been claimed ('claimed'),
+      completed ('done') and failed ('failed'), and the number of errors
+      claiming tasks or setting task status ('errors'). A task is counted
+      as completed or failed only if its final status has been set on the
+      server.
+    """
+
+    if concurrency < 1:
+        raise ValueError("Concurrency should be a positive integer")
+    if stop_event is None:
+        stop_event = threading.Event()
+
+    summary = {"claimed": 0, "done": 0, "failed": 0, "errors": 0}
+    summary_lock = threading.Lock()
+
+    def set_status(task: dict, status: str, attempts: int = 1) -> bool:
+        for attempt in range(attempts):
+            if attempt:
+                stop_event.wait(min_idle_sleep * random.uniform(0.5, 1.0))
+            try:
+                update_task(
+                    action=replace(
+                        action,
+                        action="update_task",
+                        task_input=task["task_input"],
+                        task_status=status,
+                    ),
+                    pipeline=pipeline,
+                    client=client,
+                )
+            except Exception:
+                with summary_lock:
+                    summary["errors"] += 1
+            else:
+                return True
+        return False
+
+    def process(task: dict):
+        if not set_status(task, "RUNNING", attempts=RUNNING_STATUS_ATTEMPTS):
+            return
+        try:
+            function(task)
+        except Exception:
+            status = "FAILED"
+        else:
+            status = "DONE"
+        if set_status(task, status):
+            with summary_lock:
+                summary[status.lower()] += 1
+
+    idle_sleep = min_idle_sleep
+    running = set()
+
+    def pause(delay: float):
+        # Waits for the delay or until a running task completes.
+        nonlocal running
+        if running:
+            running = wait(running, timeout=delay, return_when=FIRST_COMPLETED).not_done
+        else:
+            stop_event.wait(delay)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        while not stop_event.is_set():
+            free = concurrency - len(running)
+            if max_tasks is not None:
+                free = min(free, max_tasks - summary["claimed"])
+                if free <= 0 and not running:
+                    break
+            if free <= 0:
+                running = wait(running, return_when=FIRST_COMPLETED).not_done
+                continue
+
+            try:
+                tasks = claim_task(
+                    action=replace(action, action="claim_task", num_tasks=free),
+                    pipeline=pipeline,
+                    client=client,
+                )
+            except CircuitOpenException as e:
+                # The server is unhealthy, wait until the circuit lets
+                # requests through again.
+                pause(e.retry_after)
+                continue
+            except (ServerErrorException, requests.exceptions.RequestException) as e:
+                if not _transient(e):
+                    raise
+                with summary_lock:
+                    summary["errors"] += 1
+                tasks = None
+            if tasks:
+                idle_sleep = min_idle_sleep
+                with summary_lock:
+                    summary["claimed"] += len(tasks)
+                running |= {executor.submit(process, task) for task in tasks}
+                continue
+
+            if tasks is not None and exit_when_idle and not running:
+                break
+            pause(idle_sleep * random.uniform(0.5, 1.0))
+            idle_sleep = min(idle_sleep * 2, max_idle_sleep)
+
+    return summary
+
+
+def _transient(e: Exception) -> bool:
+    if not isinstance(e, ServerErrorException):
+        return True
+    status_code = e.status_code
+    return (
+        status_code is None or status_code >= 500 or status_code in (TRANSIENT_STATUSES)
+    )
+
+
+def command_runner(command: str) -> Callable[[dict], None]:
+    """Returns a function which runs the command for a task.
+
+    The task is passed to the command as JSON on its STDIN. The function
+    raises an exception if the command exits with a non-zero exit code.
+
+    Args:
+      command:
+        The command to run, split into arguments as by a POSIX shell.
+    """
+
+    args = shlex.split(command)
+    if not args:
+        raise ValueError("Command should be given")
+
+    def run(task: dict):
+        subprocess.run(args, input=json.dumps(task), text=True, check=True)
+
+    return run
@@ -0,0 +1,351 @@
+import asyncio
+import json
+import threading
+from dataclasses import asdict
+
+import httpx
+import pytest
+
+from npg_porch_cli import aio, api
+from npg_porch_cli.aio import AsyncPorchClient
+from npg_porch_cli.api import Pipeline, list_client_actions
+from npg_porch_cli.exceptions import AuthException, ServerErrorException
+from npg_porch_cli.http_client import Timeouts
+from npg_porch_cli.schema import invalidate_schema_cache
+from npg_porch_cli.snapshot import TaskSnapshot
+
+url = "http://some.com"
+var_name = "NPG_PORCH_TOKEN"
+
+with open("tests/data/porch_openapi.json") as f:
+    schema = json.load(f)
+
+
+class MockPorch:
+    def __init__(self):
+        self.requests = []
+        self.tasks = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if path.endswith("openapi.json"):
+            return httpx.Response(200, json=schema)
+        self.requests.append((request.method, path))
+        assert request.headers["Authorization"] == "Bearer MY_TOKEN"
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.001)
+        self.in_flight -= 1
+
+        data = json.loads(request.content) if request.content else None
+        if path == "/pipelines":
+            return httpx.Response(200, json=[{"name": "p1"}])
+        if path == "/tasks" and request.method == "POST":
+            key = json.dumps(data["task_input"], sort_keys=True)
+            if key in self.tasks:
+                return httpx.Response(409, json={"detail": "Task exists"})
+            self.tasks[key] = data
+            return httpx.Response(201, json=data)
+        if path == "/tasks" and request.method == "GET":
+            return httpx.Response(200, json=list(self.tasks.values()))
+        if path == "/tasks/":
+            return httpx.Response(200, json=data)
+        if path == "/tasks/claim":
+            return httpx.Response(200, json=[])
+        return httpx.Response(404, json={"detail": "Not found"})
+
+
+def test_async_client(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    invalidate_schema_cache()
+    server = MockPorch()
+    p = Pipeline(name="p1", uri=url, version="1.0")
+
+    async def run():
+        async with AsyncPorchClient(
+            transport=httpx.MockTransport(server.handle)
+        ) as client:
+            assert sorted(client._actions) == list_client_actions()
+
+            action = await client.action(porch_url=url, action="list_pipelines")
+            assert await client.send(action=action) == [{"name": "p1"}]
+
+            action = await client.action(
+                porch_url=url, action="add_task", task_input={"id_run": 1}
+            )
+            task = await client.send(action=action, pipeline=p)
+            assert task["status"] == "PENDING"
+            with pytest.raises(ServerErrorException) as e:
+                await client.send(action=action, pipeline=p)
+            assert e.value.status_code == 409
+            assert e.value.args[0].endswith("Detail: Task exists")
+
+            action = await client.action(
+                porch_url=url,
+                action="add_tasks",
+                task_inputs=[{"id_run": i} for i in range(20)] + [{"id_run": 3.0}],
+                concurrency=4,
+            )
+            summary = await client.send(action=action, pipeline=p)
+            assert (summary["created"], summary["existed"]) == (19, 1)
+            assert summary["duplicate"] == 1
+            assert summary["tasks"][-1] == {
+                "task_input": {"id_run": 3.0},
+                "result": "duplicate",
+            }
+            assert server.max_in_flight == 4
+
+            action = await client.action(
+                porch_url=url,
+                action="update_task",
+                task_input={"id_run": 1},
+                task_status="running",
+            )
+            assert action.task_status == "RUNNING"
+            task = await client.send(action=action, pipeline=p)
+            assert task["status"] == "RUNNING"
+
+            action = await client.action(
+                porch_url=url,
+                action="update_tasks",
+                task_updates=[({"id_run": 1}, "DONE"), ({"id_run": 2}, "Swim")],
+            )
+            summary = await client.send(action=action, pipeline=p)
+            assert (summary["updated"], summary["failed"]) == (1, 1)
+
+            action = await client.action(porch_url=url, action="list_tasks")
+            assert len(await client.send(action=action, pipeline=p)) == 20
+            action = await client.action(
+                porch_url=url, action="list_tasks", typed_results=True
+            )
+            records = await client.send(action=action, pipeline=p)
+            assert len(records) == 20
+            assert all(r.pipeline is records[0].pipeline for r in records)
+
+            action = await client.action(porch_url=url, action="claim_task")
+            assert await client.send(action=action, pipeline=p) == []
+
+            action = await client.action(porch_url=url, action="create_token")
+            with pytest.raises(ServerErrorException) as e:
+                await client.send(action=action, pipeline=p, description="desc")
+            assert e.value.status_code == 404
+
+            monkeypatch.delenv(var_name)
+            with pytest.raises(AuthException):
+                await client.send(action=action, pipeline=p, description="desc")
+
+    asyncio.run(run())
+    invalidate_schema_cache()
+
+
+def test_async_client_timeouts(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    timeouts_used = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        timeouts_used.append(request.extensions["timeout"])
+        if request.url.path == "/pipelines":
+            await asyncio.sleep(1)
+        return httpx.Response(200, json=[])
+
+    async def run():
+        async with AsyncPorchClient(
+            transport=httpx.MockTransport(handle),
+            action_timeouts={"claim_task": Timeouts(connect=1, read=2)},
+        ) as client:
+            action = await client.action(porch_url=url, action="claim_task")
+            await client.send(action=action, pipeline=p)
+            assert timeouts_used[-1]["connect"] == 1
+            assert timeouts_used[-1]["read"] == 2
+
+            action = await client.action(
+                porch_url=url,
+                action="list_pipelines",
+                timeouts=Timeouts(connect=3, read=4, deadline=0.05),
+            )
+            with pytest.raises(TimeoutError):
+                await client.send(action=action)
+            assert timeouts_used[-1]["connect"] == 3
+            assert timeouts_used[-1]["read"] == 4
+
+    asyncio.run(run())
+
+
+def test_async_add_tasks_batch_errors(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    invalidate_schema_cache()
+    batch_schema = json.loads(json.dumps(schema))
+    batch_schema["paths"]["/tasks/batch"] = {"post": {"parameters": []}}
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    batches = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("openapi.json"):
+            return httpx.Response(200, json=batch_schema)
+        data = json.loads(request.content)
+        batches.append(data)
+        if data[0]["task_input"]["id_run"] == 0:
+            raise httpx.ConnectError("Connection refused", request=request)
+        return httpx.Response(201, json=data)
+
+    async def run():
+        async with AsyncPorchClient(transport=httpx.MockTransport(handle)) as client:
+            action = await client.action(
+                porch_url=url,
+                action="add_tasks",
+                task_inputs=[{"id_run": i} for i in range(6)],
+            )
+            return await client.send(action=action, pipeline=p)
+
+    monkeypatch.setattr(api, "TASKS_BATCH_SIZE", 3)
+    monkeypatch.setattr(aio, "TASKS_BATCH_SIZE", 3)
+    summary = asyncio.run(run())
+    assert len(batches) == 2
+    assert (summary["created"], summary["failed"]) == (3, 3)
+    assert summary["tasks"][0]["error"] == "Connection refused"
+    invalidate_schema_cache()
+
+
+def test_async_schema_retrieval(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    invalidate_schema_cache()
+    schema_requests = []
+    events = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        schema_requests.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json=schema)
+
+    async def run():
+        async with AsyncPorchClient(
+            transport=httpx.MockTransport(handle), observers=[events.append]
+        ) as client:
+            actions = await asyncio.gather(
+                *(
+                    client.action(
+                        porch_url=url,
+                        action="update_task",
+                        task_input={"id_run": i},
+                        task_status="DONE",
+                    )
+                    for i in range(10)
+                )
+            )
+            assert len(actions) == 10
+
+    asyncio.run(run())
+    # The schema is retrieved once for all coroutines.
+    assert len(schema_requests) == 1
+    assert [e.operation for e in events] == ["get_schema"]
+    invalidate_schema_cache()
+
+    async def run_with_deadline():
+        async with AsyncPorchClient(
+            transport=httpx.MockTransport(handle),
+            timeouts=Timeouts(deadline=0.01),
+        ) as client:
+            with pytest.raises(TimeoutError):
+                await client.action(
+                    porch_url=url,
+                    action="update_task",
+                    task_input={"id_run": 1},
+                    task_status="DONE",
+                )
+
+    asyncio.run(run_with_deadline())
+    invalidate_schema_cache()
+
+
+def test_async_schema_fallback(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    server = MockPorch()
+    p1 = Pipeline(name="p1", uri=url, version="1.0")
+    p2 = Pipeline(name="p2", uri=url, version="1.0")
+    no_enum = json.loads(json.dumps(schema))
+    del no_enum["components"]["schemas"]["TaskStateEnum"]
+    schema_responses = [
+        httpx.Response(200, json=no_enum),
+        httpx.Response(200, text="<html>Service Unavailable</html>"),
+    ]
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        if request.url.path.endswith("openapi.json"):
+            return schema_responses[0]
+        return await server.handle(request)
+
+    async def run():
+        async with AsyncPorchClient(transport=httpx.MockTransport(handle)) as client:
+            for p in [p1, p2]:
+                action = await client.action(
+                    porch_url=url,
+                    action="add_tasks",
+                    task_inputs=[{"id_run": p.name}],
+                )
+                summary = await client.send(action=action, pipeline=p)
+                assert summary["created"] == 1
+
+            action = await client.action(porch_url=url, action="list_tasks")
+            tasks = await client.send(action=action, pipeline=p1)
+            assert [t["task_input"] for t in tasks] == [{"id_run": "p1"}]
+
+    # The schema has no enumeration of statuses or is not JSON, the tasks
+    # are added one by one and filtered client-side.
+    for _ in range(2):
+        invalidate_schema_cache()
+        server.requests.clear()
+        server.tasks.clear()
+        asyncio.run(run())
+        assert server.requests == [
+            ("POST", "/tasks"),
+            ("POST", "/tasks"),
+            ("GET", "/tasks"),
+        ]
+        schema_responses.pop(0)
+    invalidate_schema_cache()
+
+
+def test_async_add_tasks_snapshot(monkeypatch, tmp_path):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    invalidate_schema_cache()
+    server = MockPorch()
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    path = str(tmp_path / "tasks.sqlite")
+    with TaskSnapshot(path) as snapshot:
+        snapshot.record(
+            url,
+            [{"pipeline": asdict(p), "task_input": {"id_run": 1}, "status": "DONE"}],
+        )
+
+    threads = []
+    has_task = TaskSnapshot.has_task
+
+    def recording_has_task(self, pipeline, task_input):
+        threads.append(threading.current_thread())
+        return has_task(self, pipeline, task_input)
+
+    monkeypatch.setattr(TaskSnapshot, "has_task", recording_has_task)
+
+    async def run():
+        async with AsyncPorchClient(
+            transport=httpx.MockTransport(server.handle)
+        ) as client:
+            action = await client.action(
+                porch_url=url,
+                action="add_tasks",
+                task_inputs=[{"id_run": i} for i in range(3)],
+                snapshot_path=path,
+            )
+            return await client.send(action=action, pipeline=p)
+
+    summary = asyncio.run(run())
+    assert [t["result"] for t in summary["tasks"]] == ["created", "existed", "created"]
+    # The snapshot is not used in the thread of the event loop.
+    assert threads
+    assert threading.main_thread() not in threads
+    with TaskSnapshot(path) as snapshot:
+        assert snapshot.count() == 3
+    invalidate_schema_cache()
@@ -1,9 +1,12 @@
 import json
+from dataclasses import asdict
 
 import pytest
 import requests
 
+from npg_porch_cli import api
 from npg_porch_cli.api import (
+    PORCH_TASKS_PATH,
     AuthException,
     Pipeline,
     PorchAction,
@@ -11,7 +14,9 @@ from npg_porch_cli.api import (
     get_token,
     list_client_actions,
     send,
+    stream,
 )
+from npg_porch_cli.schema import has_operation, invalidate_schema_cache
 
 url = "http://some.com"
 var_name = "NPG_PORCH_TOKEN"
@@ -24,10 +29,15 @@ class MockPorchResponse:
         self.reason = "Some reason"
         self.url = url
         self.ok = True if self.status_code == 200 else False
+        self.headers = {}
 
     def json(self):
         return self.json_data
 
+    @property
+    def content(self):
+        return json.dumps(self.json_data).encode()
+
 
 def test_retrieving_token(monkeypatch):
     monkeypatch.delenv(var_name, raising=False)
@@ -46,15 +56,26 @@ def test_retrieving_token(monkeypatch):
     monkeypatch.undo()
 
 
+def test_public_names():
+    # Names moved to other modules are still importable from the api module.
+    assert api.PORCH_OPENAPI_SCHEMA_URL == "api/v1/openapi.json"
+    assert api.PORCH_TASK_STATUS_ENUM_NAME == "TaskStateEnum"
+    assert api.AuthException is AuthException
+
+
 def test_listing_actions():
     assert list_client_actions() == [
         "add_pipeline",
         "add_task",
+        "add_tasks",
         "claim_task",
         "create_token",
         "list_pipelines",
         "list_tasks",
+        "query",
+        "snapshot",
         "update_task",
+        "update_tasks",
     ]
 
 
@@ -77,8 +98,8 @@ def test_porch_action_class(monkeypatch):
         PorchAction(porch_url=url, action="list_tools")
     assert (
         e.value.args[0] == "Action 'list_tools' is not valid. "
-        "Valid actions: add_pipeline, add_task, claim_task, create_token, "
-        "list_pipelines, list_tasks, update_task"
+        "Valid actions: add_pipeline, add_task, add_tasks, claim_task, create_token, "
+        "list_pipelines, list_tasks, query, snapshot, update_task, update_tasks"
     )
 
     pa = PorchAction(porch_url=url, action="list_tasks")
@@ -106,6 +127,7 @@ def test_porch_action_class(monkeypatch):
     assert pa.task_input == {"id_run": 5}
 
     with monkeypatch.context() as m:
+        invalidate_schema_cache()
 
         def mock_get_200(*args, **kwargs):
             f = open("tests/data/porch_openapi.json")
@@ -113,7 +135,7 @@ def test_porch_action_class(monkeypatch):
             f.close()
             return r
 
-        m.setattr(requests, "request", mock_get_200)
+        m.setattr(requests.Session, "request", mock_get_200)
         pa = PorchAction(
             task_status="FAILED",
             action="update_task",
@@ -141,11 +163,12 @@ def test_porch_action_class(monkeypatch):
         )
 
     with monkeypatch.context() as mk:
+        invalidate_schema_cache()
 
         def mock_get_404(*args, **kwargs):
             return MockPorchResponse({"Error": "Not found"}, 404)
 
-        mk.setattr(requests, "request", mock_get_404)
+        mk.setattr(requests.Session, "request", mock_get_404)
         with pytest.raises(ServerErrorException) as e:
             PorchAction(
                 task_status="FAILED",
@@ -159,6 +182,7 @@ def test_porch_action_class(monkeypatch):
         )
 
     with monkeypatch.context() as mkp:
+        invalidate_schema_cache()
 
         def mock_get_200(*args, **kwargs):
             return MockPorchResponse(
@@ -166,7 +190,7 @@ def test_porch_action_class(monkeypatch):
                 200,
             )
 
-        mkp.setattr(requests, "request", mock_get_200)
+        mkp.setattr(requests.Session, "request", mock_get_200)
         with pytest.raises(Exception) as e:
             PorchAction(
                 task_status="FAILED",
@@ -209,7 +233,7 @@ def test_sending_request(monkeypatch):
     p = Pipeline(uri=url, version="0.1", name="p1")
     task = {"id_run": 5}
     response_data = {
-        "pipeline": p,
+        "pipeline": asdict(p),
         "task_input_id": "8d505b17b4f",
         "task_input": task,
         "status": "PENDING",
@@ -220,7 +244,7 @@ def test_sending_request(monkeypatch):
         def mock_get_200(*args, **kwargs):
             return MockPorchResponse(response_data, 200)
 
-        m.setattr(requests, "request", mock_get_200)
+        m.setattr(requests.Session, "request", mock_get_200)
 
         pa = PorchAction(porch_url=url, action="add_task", task_input=task)
         assert send(action=pa, pipeline=p) == response_data
@@ -231,7 +255,7 @@ def test_sending_request(monkeypatch):
         def mock_get_200(*args, **kwargs):
             return MockPorchResponse(response_data, 200)
 
-        mk.setattr(requests, "request", mock_get_200)
+        mk.setattr(requests.Session, "request", mock_get_200)
 
         pa = PorchAction(porch_url=url, action="claim_task")
         assert send(action=pa, pipeline=p) == response_data
@@ -242,7 +266,7 @@ def test_sending_request(monkeypatch):
         def mock_get_200(*args, **kwargs):
             return MockPorchResponse(response_data, 200)
 
-        mkp.setattr(requests, "request", mock_get_200)
+        mkp.setattr(requests.Session, "request", mock_get_200)
 
         pa = PorchAction(
             porch_url=url, action="update_task", task_input=task, task_status="DONE"
@@ -259,7 +283,7 @@ def test_sending_request(monkeypatch):
         def mock_get_200(*args, **kwargs):
             return MockPorchResponse(response_data, 200)
 
-        mkp.setattr(requests, "request", mock_get_200)
+        mkp.setattr(requests.Session, "request", mock_get_200)
 
         pa = PorchAction(porch_url=url, action="create_token")
 
@@ -274,3 +298,283 @@ def test_sending_request(monkeypatch):
         assert (
             send(action=pa, pipeline=p, description="for my pipeline") == response_data
         )
+
+
+def test_listing_tasks(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+
+    with open("tests/data/porch_openapi.json") as f:
+        schema = json.load(f)
+    p1 = {"name": "p1", "uri": url, "version": "0.1"}
+    p2 = {"name": "p2", "uri": url, "version": "0.1"}
+    tasks = [
+        {"pipeline": p, "task_input": {"id_run": i}, "status": s}
+        for i, (p, s) in enumerate(
+            [(p1, "PENDING"), (p2, "PENDING"), (p1, "DONE"), (p1, "FAILED")] * 3
+        )
+    ]
+    requested = []
+
+    def mock_server(self, method, url, **kwargs):
+        if url.endswith("openapi.json"):
+            return MockPorchResponse(schema, 200)
+        params = kwargs.get("params") or {}
+        requested.append(params)
+        response = [
+            t
+            for t in tasks
+            if t["pipeline"]["name"]
+            == params.get("pipeline_name", t["pipeline"]["name"])
+            and t["status"] == params.get("status", t["status"])
+        ]
+        if "limit" in params:
+            start, end = params["offset"], params["offset"] + params["limit"]
+            response = response[start:end]
+        return MockPorchResponse(response, 200)
+
+    monkeypatch.setattr(requests.Session, "request", mock_server)
+    pipeline = Pipeline(**p1)
+
+    invalidate_schema_cache()
+    pa = PorchAction(porch_url=url, action="list_tasks", task_status="done")
+    response = send(action=pa, pipeline=pipeline)
+    assert [t["task_input"]["id_run"] for t in response] == [2, 6, 10]
+    assert requested == [{"pipeline_name": "p1", "status": "DONE"}]
+
+    requested.clear()
+    pa = PorchAction(porch_url=url, action="list_tasks")
+    assert len(send(action=pa)) == 12
+    assert requested == [{}]
+
+    # The server does not advertise filtering.
+    requested.clear()
+    schema["paths"]["/tasks/"]["get"]["parameters"] = []
+    invalidate_schema_cache()
+    pa = PorchAction(porch_url=url, action="list_tasks", task_status="FAILED")
+    response = send(action=pa, pipeline=pipeline)
+    assert [t["task_input"]["id_run"] for t in response] == [3, 7, 11]
+    assert requested == [{}]
+
+    # The server advertises pagination.
+    requested.clear()
+    schema["paths"]["/tasks/"]["get"]["parameters"] = [
+        {"name": name, "in": "query"}
+        for name in ["pipeline_name", "status", "limit", "offset"]
+    ]
+    invalidate_schema_cache()
+    monkeypatch.setattr(api, "TASKS_PAGE_SIZE", 4)
+    pa = PorchAction(porch_url=url, action="list_tasks")
+    response = send(action=pa, pipeline=pipeline)
+    assert len(response) == 9
+    assert requested == [
+        {"pipeline_name": "p1", "limit": 4, "offset": 0},
+        {"pipeline_name": "p1", "limit": 4, "offset": 4},
+        {"pipeline_name": "p1", "limit": 4, "offset": 8},
+    ]
+
+    # The server's schema cannot be used, tasks are filtered client-side.
+    requested.clear()
+    enums = schema["components"]["schemas"].pop("TaskStateEnum")
+    invalidate_schema_cache()
+    pa = PorchAction(porch_url=url, action="list_tasks")
+    response = send(action=pa, pipeline=pipeline)
+    assert len(response) == 9
+    assert requested == [{}]
+    assert not has_operation(porch_url=url, method="GET", path=PORCH_TASKS_PATH)
+    schema["components"]["schemas"]["TaskStateEnum"] = enums
+
+    def not_json(self):
+        if self.json_data is None:
+            return json.loads("<html>Service Unavailable</html>")
+        return self.json_data
+
+    requested.clear()
+    schema_document = schema
+    schema = None
+    invalidate_schema_cache()
+    with monkeypatch.context() as m:
+        m.setattr(MockPorchResponse, "json", not_json)
+        response = send(action=pa, pipeline=pipeline)
+    assert len(response) == 9
+    assert requested == [{}]
+    schema = schema_document
+    invalidate_schema_cache()
+
+
+def test_streaming_tasks(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+
+    p1 = {"name": "p1", "uri": url, "version": "0.1"}
+    p2 = {"name": "p2", "uri": url, "version": "0.1"}
+    tasks = [
+        {"pipeline": p, "task_input": {"id_run": i}, "status": "PENDING"}
+        for i, p in enumerate([p1, p2] * 3)
+    ]
+
+    class MockStreamingResponse(MockPorchResponse):
+        def iter_content(self, chunk_size):
+            content = json.dumps(self.json_data).encode()
+            for i in range(0, len(content), 10):
+                j = i + 10
+                yield content[i:j]
+
+        def close(self):
+            self.closed = True
+
+    def mock_server(self, method, url, **kwargs):
+        if url.endswith("openapi.json"):
+            return MockPorchResponse({"Error": "Not found"}, 404)
+        assert kwargs["stream"] is True
+        if url.endswith("pipelines"):
+            return MockStreamingResponse([p1, p2], 200)
+        return MockStreamingResponse(tasks, 200)
+
+    monkeypatch.setattr(requests.Session, "request", mock_server)
+    invalidate_schema_cache()
+
+    pa = PorchAction(porch_url=url, action="list_pipelines")
+    assert list(stream(action=pa)) == [p1, p2]
+
+    pa = PorchAction(porch_url=url, action="list_tasks")
+    iterator = stream(action=pa, pipeline=Pipeline(**p2))
+    assert next(iterator) == tasks[1]
+    assert [t["task_input"]["id_run"] for t in iterator] == [3, 5]
+    assert len(list(stream(action=pa))) == 6
+
+    pa = PorchAction(porch_url=url, action="claim_task")
+    with pytest.raises(ValueError) as e:
+        stream(action=pa)
+    assert (
+        e.value.args[0] == "Action 'claim_task' cannot be streamed. "
+        "Valid actions: list_pipelines, list_tasks"
+    )
+
+
+def test_adding_tasks(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+
+    with open("tests/data/porch_openapi.json") as f:
+        schema = json.load(f)
+    p = Pipeline(uri=url, version="0.1", name="p1")
+    existing = {2, 5}
+    unreachable = set()
+    batches = []
+
+    def mock_server(self, method, url, **kwargs):
+        if url.endswith("openapi.json"):
+            return MockPorchResponse(schema, 200)
+        data = json.loads(kwargs["data"])
+        if url.endswith("tasks/batch"):
+            batches.append(data)
+            if any(t["task_input"]["id_run"] in unreachable for t in data):
+                raise requests.exceptions.ConnectionError("Connection reset")
+            if any(t["task_input"]["id_run"] in existing for t in data):
+                return MockPorchResponse({"detail": "Conflict"}, 409)
+            return MockPorchResponse(data, 200)
+        assert data["pipeline"] == asdict(p)
+        assert data["status"] == "PENDING"
+        id_run = data["task_input"]["id_run"]
+        if id_run in existing:
+            return MockPorchResponse({"detail": "Conflict"}, 409)
+        if id_run == 7:
+            return MockPorchResponse({"detail": "Unexpected error"}, 500)
+        return MockPorchResponse(data, 200)
+
+    monkeypatch.setattr(requests.Session, "request", mock_server)
+    invalidate_schema_cache()
+
+    pa = PorchAction(porch_url=url, action="add_tasks")
+    with pytest.raises(TypeError) as e:
+        send(action=pa, pipeline=p)
+    assert e.value.args[0] == "task_inputs cannot be None for action 'add_tasks'"
+
+    pa = PorchAction(
+        porch_url=url,
+        action="add_tasks",
+        task_inputs=({"id_run": i} for i in range(10)),
+        concurrency=3,
+    )
+    summary = send(action=pa, pipeline=p)
+    assert summary["created"] == 7
+    assert summary["existed"] == 2
+    assert summary["failed"] == 1
+    assert [t["task_input"]["id_run"] for t in summary["tasks"]] == list(range(10))
+    assert summary["tasks"][5] == {"task_input": {"id_run": 5}, "result": "existed"}
+    assert summary["tasks"][7]["result"] == "failed"
+    assert summary["tasks"][7]["error"].startswith("Status code 500")
+    assert batches == []
+
+    # The server advertises a batch endpoint.
+    schema["paths"]["/tasks/batch"] = {"post": {"parameters": []}}
+    invalidate_schema_cache()
+    monkeypatch.setattr(api, "TASKS_BATCH_SIZE", 4)
+    pa = PorchAction(
+        porch_url=url,
+        action="add_tasks",
+        task_inputs=[{"id_run": i} for i in range(10)],
+    )
+    summary = send(action=pa, pipeline=p)
+    assert len(batches) == 3
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert (summary["created"], summary["existed"], summary["failed"]) == (7, 2, 1)
+    assert [t["task_input"]["id_run"] for t in summary["tasks"]] == list(range(10))
+
+    # A batch which cannot be sent does not stop the others.
+    unreachable.add(1)
+    batches.clear()
+    summary = send(action=pa, pipeline=p)
+    assert [len(b) for b in batches] == [4, 4, 2]
+    assert (summary["created"], summary["existed"], summary["failed"]) == (4, 1, 5)
+    assert [t["result"] for t in summary["tasks"][:4]] == ["failed"] * 4
+    assert summary["tasks"][0]["error"] == "Connection reset"
+    invalidate_schema_cache()
+
+
+def test_updating_tasks(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+
+    with open("tests/data/porch_openapi.json") as f:
+        schema = json.load(f)
+    p = Pipeline(uri=url, version="0.1", name="p1")
+    schema_requests = []
+    updates = []
+
+    def mock_server(self, method, url, **kwargs):
+        if url.endswith("openapi.json"):
+            schema_requests.append(url)
+            return MockPorchResponse(schema, 200)
+        assert method == "PUT"
+        data = json.loads(kwargs["data"])
+        updates.append((data["task_input"]["id_run"], data["status"]))
+        if data["task_input"]["id_run"] == 3:
+            return MockPorchResponse({"detail": "Task not found"}, 404)
+        return MockPorchResponse(data, 200)
+
+    monkeypatch.setattr(requests.Session, "request", mock_server)
+    invalidate_schema_cache()
+
+    pa = PorchAction(porch_url=url, action="update_tasks")
+    with pytest.raises(TypeError) as e:
+        send(action=pa, pipeline=p)
+    assert e.value.args[0] == "task_updates cannot be None for action 'update_tasks'"
+
+    task_updates = [({"id_run": i}, "done") for i in range(5)]
+    task_updates[1] = ({"id_run": 1}, "Swimming")
+    pa = PorchAction(
+        porch_url=url, action="update_tasks", task_updates=iter(task_updates)
+    )
+    summary = send(action=pa, pipeline=p)
+    assert summary["updated"] == 3
+    assert summary["failed"] == 2
+    assert summary["tasks"][0] == {
+        "task_input": {"id_run": 0},
+        "status": "done",
+        "result": "updated",
+    }
+    assert summary["tasks"][1]["result"] == "failed"
+    assert summary["tasks"][1]["error"].startswith("Task status 'Swimming'")
+    assert summary["tasks"][3]["result"] == "failed"
+    assert summary["tasks"][3]["error"].startswith("Status code 404")
+    assert sorted(updates) == [(0, "DONE"), (2, "DONE"), (3, "DONE"), (4, "DONE")]
+    assert len(schema_requests) == 1
+    invalidate_schema_cache()
@@ -0,0 +1,82 @@
+import io
+import json
+import sys
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user
+from npg_porch_cli.commands import execute_many
+from npg_porch_cli.schema import invalidate_schema_cache
+
+pipeline = {"name": "p1", "uri": "https://p1.com", "version": "1.0"}
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer() as server:
+        yield server
+    invalidate_schema_cache()
+
+
+def test_execute_many(porch):
+    commands = [
+        {"action": "add_task", "task_input": {"id_run": 1}, "id": "a"},
+        '{"action": "update_task", "task_input": {"id_run": 1}, "status": "done"}',
+        '{"action": "update_task", ',
+        {"action": "update_task", "task_input": {"id_run": 2}, "status": "DONE"},
+        {"action": "list_tasks", "pipeline": None},
+    ]
+    records = list(
+        execute_many(commands, defaults={"porch_url": porch.url, "pipeline": pipeline})
+    )
+    assert [record["index"] for record in records] == [0, 1, 2, 3, 4]
+    assert records[0]["id"] == "a"
+    assert records[0]["result"]["status"] == "PENDING"
+    assert records[1]["result"]["status"] == "DONE"
+    assert records[2]["error"]["type"] == "JSONDecodeError"
+    assert records[3]["error"]["status_code"] == 404
+    assert [task["status"] for task in records[4]["result"]] == ["DONE"]
+
+    commands = (
+        {"action": "add_task", "task_input": {"id_run": i}, "id": i}
+        for i in range(10, 30)
+    )
+    records = list(
+        execute_many(
+            commands,
+            defaults={"porch_url": porch.url, "pipeline": pipeline},
+            concurrency=4,
+            ordered=False,
+        )
+    )
+    assert sorted(record["id"] for record in records) == list(range(10, 30))
+    assert all(record["id"] == record["index"] + 10 for record in records)
+
+
+def test_batch_command(porch, monkeypatch, capsys, tmp_path):
+    argv = ["npg_porch_client", "batch", "--base_url", porch.url]
+    argv += ["--pipeline", "p1", "--pipeline_url", "https://p1.com"]
+    argv += ["--pipeline_version", "1.0"]
+    lines = [
+        json.dumps({"action": "add_task", "task_input": {"id_run": 1}}),
+        "",
+        json.dumps({"action": "claim_task"}),
+    ]
+    monkeypatch.setattr(sys, "argv", argv)
+    monkeypatch.setattr(sys, "stdin", io.StringIO("\n".join(lines) + "\n"))
+    api_cli_user.run()
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [record["index"] for record in records] == [0, 1]
+    assert records[1]["result"][0]["status"] == "CLAIMED"
+
+    commands_file = tmp_path / "commands.jsonl"
+    commands_file.write_text(lines[0] + "\n")
+    monkeypatch.setattr(sys, "argv", argv + ["--commands_file", str(commands_file)])
+    with pytest.raises(SystemExit) as e:
+        api_cli_user.run()
+    assert e.value.code == 1
+    record = json.loads(capsys.readouterr().out)
+    assert record["error"]["status_code"] == 409
@@ -0,0 +1,59 @@
+import json
+
+import requests
+
+from benchmarks.mock_porch import MockPorchServer
+from benchmarks.run import compare, run
+
+
+def test_mock_server():
+    with MockPorchServer(num_synthetic_tasks=3, payload_size=10) as server:
+        reply = requests.get(f"{server.url}/tasks")
+        tasks = reply.json()
+        assert len(tasks) == 3
+        assert tasks[2]["task_input"] == {"id_run": 2, "padding": "x" * 10}
+        assert requests.get(f"{server.url}/api/v1/openapi.json").ok
+
+        task = {
+            "pipeline": tasks[0]["pipeline"],
+            "task_input": {"id_run": 9},
+            "status": "PENDING",
+        }
+        assert requests.post(f"{server.url}/tasks", json=task).status_code == 201
+        assert requests.post(f"{server.url}/tasks", json=task).status_code == 409
+        claimed = requests.post(f"{server.url}/tasks/claim", json=task["pipeline"])
+        assert claimed.json()[0]["status"] == "CLAIMED"
+        reply = requests.put(f"{server.url}/tasks/", json=task | {"status": "DONE"})
+        assert reply.json()["status"] == "DONE"
+        assert len(requests.get(f"{server.url}/tasks").json()) == 4
+
+
+def test_benchmarks_run(tmp_path):
+    output = tmp_path / "results.json"
+    arguments = [
+        "--repeat=3",
+        "--bulk_size=20",
+        "--list_sizes=50",
+        "--serialization_size=100",
+        "--cli_repeat=1",
+        f"--output={output}",
+    ]
+    assert run(arguments) == 0
+    results = json.loads(output.read_text())
+    assert results["metadata"]["npg_porch_cli_version"]
+    scenarios = {result["scenario"] for result in results["results"]}
+    assert scenarios == {
+        "latency",
+        "bulk",
+        "list_memory",
+        "serialization",
+        "cli_startup",
+    }
+
+    assert compare(results, results, 0.2) == []
+    slower = json.loads(output.read_text())
+    for result in slower["results"]:
+        result["metrics"] = {k: v * 2 for k, v in result["metrics"].items()}
+    regressions = compare(slower, results, 0.2)
+    assert regressions
+    assert all("_per_s" not in regression for regression in regressions)
@@ -0,0 +1,212 @@
+import asyncio
+import socket
+import time
+
+import httpx
+import pytest
+import requests
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli.aio import AsyncPorchClient
+from npg_porch_cli.api import Pipeline, PorchAction, send, send_request
+from npg_porch_cli.breaker import CircuitBreaker
+from npg_porch_cli.exceptions import CircuitOpenException, ServerErrorException
+from npg_porch_cli.http_client import (
+    DeadlineExceeded,
+    HttpClient,
+    RetryPolicy,
+    Timeouts,
+)
+from npg_porch_cli.metrics import MetricsRegistry
+from npg_porch_cli.schema import invalidate_schema_cache
+from npg_porch_cli.throttle import Throttle
+from npg_porch_cli.worker import claim_and_run
+
+url = "http://some.com/tasks"
+
+
+def _fail(breaker, url, times):
+    for _ in range(times):
+        breaker.acquire(url)(True)
+
+
+def test_breaker_states():
+    breaker = CircuitBreaker(min_requests=3, open_duration=0.05)
+    assert breaker.state(url) == "closed"
+    breaker.acquire(url)(False)
+    _fail(breaker, url, 1)
+    assert breaker.state(url) == "closed"
+    stale = breaker.acquire(url)
+    _fail(breaker, url, 1)
+    assert breaker.state(url) == "open"
+    # Outcomes of requests sent before the circuit opened are ignored.
+    stale(False)
+    assert breaker.state(url) == "open"
+    with pytest.raises(CircuitOpenException, match=r"is open") as e:
+        breaker.acquire(url)
+    assert 0 < e.value.retry_after <= 0.05
+    assert breaker.state("http://other.com/tasks") == "closed"
+
+    time.sleep(0.06)
+    assert breaker.state(url) == "half_open"
+    release = breaker.acquire(url)
+    with pytest.raises(CircuitOpenException, match=r"is half-open"):
+        breaker.acquire(url)
+    release(None)
+    release = breaker.acquire(url)
+    release(True)
+    assert breaker.state(url) == "open"
+
+    time.sleep(0.06)
+    breaker.acquire(url)(False)
+    assert breaker.state(url) == "closed"
+    _fail(breaker, url, 2)
+    assert breaker.state(url) == "closed"
+
+
+def test_breaker_failures():
+    for kwargs in ({"failure_rate": 0}, {"min_requests": 0}, {"window": 0}):
+        with pytest.raises(ValueError):
+            CircuitBreaker(**kwargs)
+
+    breaker = CircuitBreaker(slow_request_duration=1)
+    assert breaker.failed(503, 0.1)
+    assert not breaker.failed(409, 0.1)
+    assert breaker.failed(200, 1.5)
+    assert not CircuitBreaker(slow_request_duration=None).failed(200, 100)
+
+    breaker = CircuitBreaker(min_requests=4, failure_rate=0.5, window=0.05)
+    _fail(breaker, url, 2)
+    time.sleep(0.06)
+    # Earlier failures are out of the window.
+    _fail(breaker, url, 1)
+    breaker.acquire(url)(False)
+    breaker.acquire(url)(False)
+    assert breaker.state(url) == "closed"
+    _fail(breaker, url, 1)
+    assert breaker.state(url) == "open"
+
+
+def test_client_breaker(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server_url = f"http://127.0.0.1:{port}"
+
+    registry = MetricsRegistry()
+    client = HttpClient(
+        retry_policy=RetryPolicy(max_attempts=2, backoff_factor=0.001),
+        circuit_breaker=CircuitBreaker(min_requests=2),
+        observers=[registry],
+    )
+    with pytest.raises(requests.exceptions.ConnectionError):
+        send_request(
+            validate_ca_cert=False,
+            url=f"{server_url}/pipelines",
+            method="GET",
+            client=client,
+            operation="list_pipelines",
+        )
+    # The circuit opened after the second attempt.
+    with pytest.raises(CircuitOpenException):
+        send_request(
+            validate_ca_cert=False,
+            url=f"{server_url}/tasks",
+            method="GET",
+            client=client,
+            operation="list_tasks",
+        )
+
+    snapshot = registry.snapshot()
+    assert snapshot["circuits"] == [{"server": server_url, "state": "open"}]
+    assert {"operation": "list_tasks", "exception": "CircuitOpenException"} in [
+        {k: e[k] for k in ("operation", "exception")} for e in snapshot["exceptions"]
+    ]
+    text = registry.to_prometheus()
+    assert (
+        f'npg_porch_client_circuit_state{{server="{server_url}",state="open"}} 1'
+        in text
+    )
+    assert (
+        f'npg_porch_client_circuit_state{{server="{server_url}",state="closed"}} 0'
+        in text
+    )
+
+
+def test_deadline_errors_not_counted(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    breaker = CircuitBreaker(min_requests=1)
+    throttle = Throttle(max_in_flight=1)
+    client = HttpClient(
+        retry_policy=RetryPolicy(max_attempts=1),
+        circuit_breaker=breaker,
+        throttle=throttle,
+    )
+    with MockPorchServer(latency=0.2) as porch:
+        action = PorchAction(
+            porch_url=porch.url,
+            action="list_pipelines",
+            timeouts=Timeouts(deadline=0.05),
+        )
+        send(action=PorchAction(porch_url=porch.url, action="list_pipelines"))
+        # The read timeout is shortened by the deadline.
+        with pytest.raises(requests.exceptions.Timeout):
+            send(action=action, client=client)
+        assert breaker.state(porch.url) == "closed"
+
+        # The deadline expires waiting for the throttle.
+        release = throttle.acquire(porch.url)
+        with pytest.raises(DeadlineExceeded):
+            send(action=action, client=client)
+        release()
+        assert breaker.state(porch.url) == "closed"
+        assert breaker._circuit(porch.url)._failures == 0
+    invalidate_schema_cache()
+
+
+def test_worker_waits_for_circuit(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    breaker = CircuitBreaker(min_requests=1, open_duration=0.1)
+    client = HttpClient(circuit_breaker=breaker)
+    with MockPorchServer() as porch:
+        _fail(breaker, porch.url, 1)
+        start = time.monotonic()
+        summary = claim_and_run(
+            action=PorchAction(porch_url=porch.url, action="claim_task"),
+            pipeline=Pipeline(name="p1", uri="https://p1.com", version="1.0"),
+            function=lambda task: None,
+            exit_when_idle=True,
+            client=client,
+        )
+        assert time.monotonic() - start >= 0.09
+        assert summary["claimed"] == 0
+        assert breaker.state(porch.url) == "closed"
+    invalidate_schema_cache()
+
+
+def test_async_client_breaker(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    requests_sent = []
+
+    async def handle(request: httpx.Request) -> httpx.Response:
+        requests_sent.append(request)
+        return httpx.Response(503, json={"detail": "Unavailable"})
+
+    async def run():
+        async with AsyncPorchClient(
+            transport=httpx.MockTransport(handle),
+            circuit_breaker=CircuitBreaker(min_requests=2),
+        ) as client:
+            action = await client.action(porch_url=url, action="list_pipelines")
+            for _ in range(2):
+                with pytest.raises(ServerErrorException):
+                    await client.send(action=action)
+            with pytest.raises(CircuitOpenException):
+                await client.send(action=action)
+            assert client.circuit_breaker.state(url) == "open"
+
+    asyncio.run(run())
+    assert len(requests_sent) == 2
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from npg_porch_cli.bulk import run_concurrently
+
+
+def test_running_concurrently():
+    def square(x):
+        if x == 3:
+            raise ValueError("three")
+        time.sleep(0.01 * (10 - x))
+        return x * x
+
+    outcomes = list(run_concurrently(square, range(10), max_workers=4))
+    assert [o[0] for o in outcomes] == list(range(10))
+    assert [o[1] for o in outcomes] == [0, 1, 4, None, 16, 25, 36, 49, 64, 81]
+    assert isinstance(outcomes[3][2], ValueError)
+    assert all(o[2] is None for i, o in enumerate(outcomes) if i != 3)
+
+    outcomes = list(run_concurrently(square, range(10), max_workers=4, ordered=False))
+    assert sorted(o[0] for o in outcomes) == list(range(10))
+
+    with pytest.raises(ValueError) as e:
+        list(run_concurrently(square, range(10), max_workers=0))
+    assert e.value.args[0] == "The number of workers should be a positive integer"
+
+
+def test_bounded_concurrency():
+    lock = threading.Lock()
+    running = []
+    max_running = []
+    consumed = []
+
+    def items():
+        for i in range(50):
+            consumed.append(i)
+            yield i
+
+    def work(x):
+        with lock:
+            running.append(x)
+            max_running.append(len(running))
+        time.sleep(0.001)
+        with lock:
+            running.remove(x)
+        return x
+
+    results = run_concurrently(work, items(), max_workers=3)
+    next(results)
+    assert len(consumed) <= 6
+    assert [r[1] for r in results] == list(range(1, 50))
+    assert max(max_running) <= 3
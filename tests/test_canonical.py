@@ -0,0 +1,32 @@
+import pytest
+
+from npg_porch_cli.canonical import canonical_json, canonicalize, task_input_hash
+from npg_porch_cli.records import TaskStatus
+
+
+def test_canonical_json():
+    assert canonical_json({"b": [1, {"d": 2, "c": "é"}], "a": 1}) == (
+        '{"a":1,"b":[1,{"c":"é","d":2}]}'
+    )
+    assert canonical_json({"id_run": 409.0, "ratio": 0.5, "lanes": (1, 2)}) == (
+        '{"id_run":409,"lanes":[1,2],"ratio":0.5}'
+    )
+    assert canonical_json([True, False, None, 1]) == "[true,false,null,1]"
+    value = canonicalize({"status": TaskStatus.DONE})["status"]
+    assert type(value) is str
+    assert value == "DONE"
+
+    with pytest.raises(TypeError):
+        canonical_json({"id_run": {1, 2}})
+    with pytest.raises(ValueError):
+        canonical_json({"ratio": float("nan")})
+
+
+def test_task_input_hash():
+    assert task_input_hash({"id_run": 1, "lane": 2}) == task_input_hash(
+        {"lane": 2.0, "id_run": 1}
+    )
+    assert task_input_hash({"id_run": 1}) != task_input_hash({"id_run": 2})
+    assert task_input_hash({"id_run": 1}) != task_input_hash({"id_run": True})
+    assert task_input_hash({"id_run": 1}) != task_input_hash({"id_run": "1"})
+    assert len(task_input_hash({})) == 64
@@ -0,0 +1,77 @@
+import pytest
+
+from benchmarks.mock_porch import STATUSES, MockPorchServer
+from npg_porch_cli.api import AuthException, Pipeline
+from npg_porch_cli.client import PorchClient
+from npg_porch_cli.http_client import HttpClient, Timeouts
+from npg_porch_cli.schema import invalidate_schema_cache
+
+pipeline = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer() as server:
+        yield server
+    invalidate_schema_cache()
+
+
+def test_client(porch, monkeypatch, tmp_path):
+    with PorchClient(porch_url=porch.url, pipeline=pipeline) as client:
+        assert client.token == "MY_TOKEN"
+        # The token is resolved once, when the client is created.
+        monkeypatch.delenv("NPG_PORCH_TOKEN")
+
+        assert client.add_pipeline()["name"] == "p1"
+        assert client.list_pipelines() == [
+            {"name": "p1", "uri": "https://p1.com", "version": "1.0"}
+        ]
+        task = client.add_task(task_input={"id_run": 1})
+        assert task["status"] == "PENDING"
+        summary = client.add_tasks([{"id_run": i} for i in range(1, 5)])
+        assert (summary["created"], summary["existed"]) == (3, 1)
+
+        num_requests = porch.num_requests
+        for id_run in range(1, 5):
+            client.update_task(task_input={"id_run": id_run}, status="running")
+        # One request per call, the statuses are cached by the client.
+        assert porch.num_requests - num_requests == 4
+        assert client.task_statuses == STATUSES
+
+        assert len(client.list_tasks(status="RUNNING")) == 4
+        assert len(list(client.iter_tasks(status="PENDING"))) == 0
+        records = client.list_tasks(typed_results=True)
+        assert {r.status for r in records} == {"RUNNING"}
+
+        path = str(tmp_path / "tasks.sqlite")
+        assert client.snapshot(path)["total"] == 4
+        assert len(client.query(path, task_input={"id_run": 2})) == 1
+
+        with pytest.raises(ValueError, match=r"Task status 'BUSY' is not valid"):
+            client.update_task(task_input={"id_run": 1}, status="BUSY")
+
+    with pytest.raises(AuthException):
+        PorchClient(porch_url=porch.url)
+
+    http_client = HttpClient()
+    client = PorchClient(
+        porch_url=porch.url,
+        token="MY_TOKEN",
+        timeouts=Timeouts(connect=1, read=2),
+        http_client=http_client,
+    )
+    assert client._action("list_tasks").timeouts == Timeouts(connect=1, read=2)
+    # Actions are copies of a template, which is not changed.
+    action = client._action("update_task", task_status="done", task_input={"a": 1})
+    assert (action.task_status, action.task_input) == ("DONE", {"a": 1})
+    assert client._action("update_task").task_status is None
+    with pytest.raises(TypeError, match=r"Unknown action fields: colour"):
+        client._action("list_tasks", colour="red")
+    with pytest.raises(TypeError, match=r"Pipeline should be given"):
+        client.claim_task()
+    assert client.claim_task(num_tasks=2, pipeline=pipeline) == []
+    client.close()
+    # The HTTP client given to the client is not closed.
+    assert client.list_pipelines()
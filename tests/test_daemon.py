@@ -0,0 +1,209 @@
+import json
+import os
+import socket
+import sys
+import threading
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api, api_cli_user
+from npg_porch_cli import daemon as daemon_module
+from npg_porch_cli import http_client
+from npg_porch_cli.commands import execute, parse_command
+from npg_porch_cli.daemon import (
+    DaemonUnavailable,
+    default_socket_path,
+    forward,
+    serve,
+)
+from npg_porch_cli.exceptions import ServerErrorException
+from npg_porch_cli.schema import invalidate_schema_cache
+
+pipeline = {"name": "p1", "uri": "https://p1.com", "version": "1.0"}
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer() as server:
+        yield server
+    invalidate_schema_cache()
+
+
+@pytest.fixture
+def daemon(tmp_path):
+    socket_path = str(tmp_path / "porch.sock")
+    ready = threading.Event()
+    stop = threading.Event()
+    thread = threading.Thread(
+        target=serve,
+        kwargs={"socket_path": socket_path, "ready": ready, "stop_event": stop},
+    )
+    thread.start()
+    ready.wait()
+    yield socket_path
+    stop.set()
+    thread.join()
+    assert not os.path.exists(socket_path)
+
+
+def test_commands(porch):
+    with pytest.raises(ValueError, match="Unknown command keys: colour"):
+        parse_command({"action": "list_tasks", "porch_url": porch.url, "colour": 1})
+    action, p, description = parse_command(
+        {
+            "action": "update_tasks",
+            "porch_url": porch.url,
+            "pipeline": pipeline,
+            "task_updates": [{"task_input": {"id_run": 1}, "status": "DONE"}],
+            "timeouts": {"connect": 1, "read": 2},
+            "token": "OTHER_TOKEN",
+        }
+    )
+    assert action.task_updates == [({"id_run": 1}, "DONE")]
+    assert action.timeouts.read == 2
+    assert action.token == "OTHER_TOKEN"
+    assert p.name == "p1"
+    assert description is None
+
+    command = {"action": "add_pipeline", "porch_url": porch.url, "pipeline": pipeline}
+    assert execute(command) == pipeline
+
+
+def test_forwarding(porch, daemon):
+    with pytest.raises(DaemonUnavailable):
+        forward({"action": "list_pipelines"}, daemon + ".absent")
+
+    command = {"action": "add_pipeline", "porch_url": porch.url, "pipeline": pipeline}
+    assert forward(command, daemon) == pipeline
+    with pytest.raises(ServerErrorException) as e:
+        forward(command, daemon)
+    assert e.value.status_code == 409
+
+    command = {
+        "action": "add_task",
+        "porch_url": porch.url,
+        "pipeline": pipeline,
+        "task_input": {"id_run": 1},
+    }
+    assert forward(command, daemon)["status"] == "PENDING"
+    command.update(action="update_task", status="swimming")
+    with pytest.raises(ValueError, match="Task status 'swimming' is not valid"):
+        forward(command, daemon)
+    command["status"] = "running"
+    assert forward(command, daemon)["status"] == "RUNNING"
+
+
+def test_cli_forwarding(porch, daemon, monkeypatch, capsys):
+    def no_direct_calls(**kwargs):
+        raise AssertionError("The action should have been forwarded")
+
+    monkeypatch.setattr(api, "send", no_direct_calls)
+    monkeypatch.setenv("NPG_PORCH_DAEMON_SOCKET", daemon)
+    argv = ["npg_porch_client", "add_pipeline", "--base_url", porch.url]
+    argv += ["--pipeline", "p1", "--pipeline_url", "https://p1.com"]
+    argv += ["--pipeline_version", "1.0"]
+    monkeypatch.setattr(sys, "argv", argv)
+    api_cli_user.run()
+    assert json.loads(capsys.readouterr().out) == pipeline
+
+    monkeypatch.undo()
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    monkeypatch.setenv("NPG_PORCH_DAEMON_SOCKET", daemon + ".absent")
+    argv = ["npg_porch_client", "list_pipelines", "--base_url", porch.url]
+    monkeypatch.setattr(sys, "argv", argv)
+    api_cli_user.run()
+    assert json.loads(capsys.readouterr().out) == [pipeline]
+
+
+@pytest.mark.parametrize(
+    "option", ["--circuit_breaker", "--response_cache", "--compress_requests"]
+)
+def test_cli_client_options(porch, daemon, monkeypatch, capsys, option):
+    def no_forwarding(*args, **kwargs):
+        raise AssertionError("The action should have been sent directly")
+
+    monkeypatch.setattr(daemon_module, "forward", no_forwarding)
+    monkeypatch.setattr(http_client, "_default_client", http_client.HttpClient())
+    monkeypatch.setenv("NPG_PORCH_DAEMON_SOCKET", daemon)
+    argv = ["npg_porch_client", "list_pipelines", "--base_url", porch.url, option]
+    monkeypatch.setattr(sys, "argv", argv)
+    api_cli_user.run()
+    assert json.loads(capsys.readouterr().out) == []
+
+
+def test_idle_timeout(tmp_path):
+    socket_path = str(tmp_path / "porch.sock")
+    # A stale socket file is removed.
+    open(socket_path, "w").close()
+    serve(socket_path=socket_path, idle_timeout=0.1)
+    assert not os.path.exists(socket_path)
+
+
+def test_default_socket_path(monkeypatch, tmp_path):
+    monkeypatch.delenv("NPG_PORCH_DAEMON_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", "/run/user/1")
+    assert default_socket_path() == f"/run/user/1/npg_porch_client-{os.getuid()}.sock"
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    path = default_socket_path()
+    assert path == str(tmp_path / f"npg_porch_client-{os.getuid()}" / "daemon.sock")
+
+    # The private directory is created by the daemon.
+    serve(idle_timeout=0.1)
+    assert os.stat(os.path.dirname(path)).st_mode & 0o777 == 0o700
+    assert not os.path.exists(path)
+
+
+def test_socket_checks(porch, daemon, tmp_path, monkeypatch):
+    command = {"action": "list_pipelines", "porch_url": porch.url}
+    assert forward(command, daemon) == []
+
+    os.chmod(daemon, 0o666)
+    with pytest.raises(DaemonUnavailable, match="accessible to other users"):
+        forward(command, daemon)
+    os.chmod(daemon, 0o600)
+    os.chmod(tmp_path, 0o755)
+    with pytest.raises(DaemonUnavailable, match="accessible to other users"):
+        forward(command, daemon)
+    os.chmod(tmp_path, 0o700)
+
+    other = str(tmp_path / "file.sock")
+    open(other, "w").close()
+    os.chmod(other, 0o600)
+    with pytest.raises(DaemonUnavailable, match="expected file type"):
+        forward(command, other)
+    os.unlink(other)
+    os.symlink(daemon, other)
+    with pytest.raises(DaemonUnavailable, match="expected file type"):
+        forward(command, other)
+    os.unlink(other)
+
+    with monkeypatch.context() as m:
+        m.setattr(os, "getuid", lambda: os.geteuid() + 1)
+        with pytest.raises(DaemonUnavailable, match="not owned by the current user"):
+            forward(command, daemon)
+
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    os.chmod(shared, 0o777)
+    with pytest.raises(PermissionError, match="accessible to other users"):
+        serve(socket_path=str(shared / "porch.sock"), idle_timeout=0.1)
+
+
+def test_reply_timeout(tmp_path):
+    socket_path = str(tmp_path / "silent.sock")
+    old_umask = os.umask(0o177)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        listener.bind(socket_path)
+    finally:
+        os.umask(old_umask)
+    listener.listen()
+    try:
+        with pytest.raises(TimeoutError):
+            forward({"action": "list_pipelines"}, socket_path, timeout=0.1)
+    finally:
+        listener.close()
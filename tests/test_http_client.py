@@ -0,0 +1,289 @@
+import json
+import time
+
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from npg_porch_cli import send_request
+from npg_porch_cli.api import Pipeline, PorchAction, claim_task
+from npg_porch_cli.http_client import (
+    DeadlineExceeded,
+    HttpClient,
+    RetryPolicy,
+    Timeouts,
+    get_default_client,
+    parse_action_timeouts,
+)
+
+url = "http://some.com"
+
+
+class MockResponseOK:
+    def __init__(self):
+        self.status_code = 200
+        self.reason = "OK"
+        self.url = url
+        self.ok = True
+
+    def json(self):
+        return {"some_data": "delivered"}
+
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
+
+
+def test_client_parameters():
+    with pytest.raises(ValueError) as e:
+        HttpClient(pool_maxsize=0)
+    assert e.value.args[0] == "Connection pool size should be a positive integer"
+    with pytest.raises(ValueError) as e:
+        HttpClient(max_retries=-1)
+    assert e.value.args[0] == "The number of retries cannot be negative"
+
+    client = HttpClient(pool_connections=2, pool_maxsize=20, max_retries=3)
+    adapter = client.session.get_adapter(url)
+    assert adapter._pool_maxsize == 20
+    assert adapter.max_retries.total == 3
+    assert client.session.headers["Connection"] == "keep-alive"
+
+    client = HttpClient(keep_alive=False)
+    assert client.session.headers["Connection"] == "close"
+
+
+def test_session_reuse():
+    client = HttpClient()
+    session = client.session
+    assert client.session is session
+    client.close()
+    assert client.session is not session
+
+    assert get_default_client() is get_default_client()
+
+
+def test_sending_via_client(monkeypatch):
+    sessions = []
+
+    def mock_request(self, *args, **kwargs):
+        sessions.append(self)
+        return MockResponseOK()
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+
+    with HttpClient() as client:
+        for _ in range(3):
+            send_request(
+                validate_ca_cert=True,
+                url=url,
+                method="GET",
+                auth_type=None,
+                client=client,
+            )
+        assert sessions == [client.session] * 3
+
+    send_request(validate_ca_cert=True, url=url, method="GET", auth_type=None)
+    assert sessions[-1] is get_default_client().session
+
+
+class MockResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_retry_policy():
+    with pytest.raises(ValueError) as e:
+        RetryPolicy(max_attempts=0)
+    assert e.value.args[0] == "The number of attempts should be a positive integer"
+
+    policy = RetryPolicy(backoff_factor=1, max_backoff=5)
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= min(5, 2 ** (attempt - 1))
+    assert policy.delay(1, MockResponse(503, {"Retry-After": "7"})) == 7
+    assert policy.delay(1, MockResponse(503, {"Retry-After": "7000"})) == 120
+    assert 0 <= policy.delay(1, MockResponse(503, {"Retry-After": "soon"})) <= 1
+
+    connect_error = requests.exceptions.ConnectionError(
+        MaxRetryError(None, url, NewConnectionError(None, "refused"))
+    )
+    reset_error = requests.exceptions.ConnectionError("Connection reset by peer")
+    read_timeout = requests.exceptions.ReadTimeout()
+    connect_timeout = requests.exceptions.ConnectTimeout()
+    for error in [connect_error, reset_error, read_timeout, connect_timeout]:
+        assert policy.retry_error("GET", error, 1) is True
+        assert policy.retry_error("put", error, 2) is True
+        assert policy.retry_error("GET", error, 3) is False
+    assert policy.retry_error("GET", ValueError(), 1) is False
+    assert policy.retry_error("POST", connect_error, 1) is True
+    assert policy.retry_error("POST", connect_timeout, 1) is True
+    assert policy.retry_error("POST", reset_error, 1) is False
+    assert policy.retry_error("POST", read_timeout, 1) is False
+
+    assert policy.retry_response("GET", MockResponse(503), 1) is True
+    assert policy.retry_response("GET", MockResponse(429), 2) is True
+    assert policy.retry_response("GET", MockResponse(503), 3) is False
+    assert policy.retry_response("GET", MockResponse(500), 1) is False
+    assert policy.retry_response("POST", MockResponse(503), 1) is False
+
+
+def test_retrying_requests(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+
+    def mock_session(outcomes):
+        calls = []
+
+        def mock_request(self, method, url, **kwargs):
+            calls.append(method)
+            outcome = outcomes.pop(0)
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+
+        monkeypatch.setattr(requests.Session, "request", mock_request)
+        return calls
+
+    client = HttpClient(retry_policy=RetryPolicy(max_attempts=4))
+    failed = MockResponse(503, {"Retry-After": "2"})
+    calls = mock_session([requests.exceptions.ReadTimeout(), failed, MockResponse(200)])
+    assert client.request("GET", url).status_code == 200
+    assert calls == ["GET"] * 3
+    assert failed.closed is True
+    assert delays[1] == 2
+
+    calls = mock_session([MockResponse(503)] * 4)
+    assert client.request("PUT", url).status_code == 503
+    assert len(calls) == 4
+
+    calls = mock_session([MockResponse(503)])
+    assert client.request("POST", url).status_code == 503
+    assert len(calls) == 1
+
+    calls = mock_session([requests.exceptions.ReadTimeout()])
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.request("POST", url)
+    assert len(calls) == 1
+
+    calls = mock_session([requests.exceptions.ConnectTimeout(), MockResponse(201)])
+    assert client.request("POST", url).status_code == 201
+    assert len(calls) == 2
+
+    client = HttpClient(retry_policy=RetryPolicy(max_attempts=1))
+    calls = mock_session([requests.exceptions.ConnectTimeout()])
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        client.request("GET", url)
+    assert len(calls) == 1
+
+
+def test_timeouts():
+    with pytest.raises(ValueError) as e:
+        Timeouts(connect=0)
+    assert e.value.args[0] == "Timeouts should be positive numbers"
+    with pytest.raises(ValueError) as e:
+        Timeouts(deadline=-1)
+    assert e.value.args[0] == "Deadline should be a positive number"
+
+    assert Timeouts.parse("1, 2.5") == Timeouts(connect=1, read=2.5)
+    assert Timeouts.parse("10,600,1800") == Timeouts(
+        connect=10, read=600, deadline=1800
+    )
+    for value in ["1", "1,2,3,4", "1,,2"]:
+        with pytest.raises(ValueError, match="expected 'connect,read"):
+            Timeouts.parse(value)
+
+    assert parse_action_timeouts("claim_task=1,2,5; list_tasks=10,600;") == {
+        "claim_task": Timeouts(connect=1, read=2, deadline=5),
+        "list_tasks": Timeouts(connect=10, read=600),
+    }
+    with pytest.raises(ValueError, match="expected 'action=connect,read"):
+        parse_action_timeouts("claim_task:1,2")
+
+    client = HttpClient(action_timeouts={"claim_task": Timeouts(connect=1, read=2)})
+    assert client.timeouts_for("claim_task") == Timeouts(connect=1, read=2)
+    assert client.timeouts_for("list_tasks") == Timeouts()
+    assert client.timeouts_for(None) == Timeouts()
+
+
+def test_deadline(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(time, "monotonic", lambda: clock[0])
+
+    def sleep(delay):
+        clock[0] += delay
+
+    monkeypatch.setattr(time, "sleep", sleep)
+
+    timeouts_used = []
+
+    def mock_request(self, method, url, **kwargs):
+        timeouts_used.append(kwargs["timeout"])
+        clock[0] += 4
+        return MockResponse(503, {"Retry-After": "3"})
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+
+    client = HttpClient(retry_policy=RetryPolicy(max_attempts=10))
+    response = client.request(
+        "GET", url, timeouts=Timeouts(connect=2, read=5, deadline=12)
+    )
+    # Attempts start at 0 and 7 seconds, a third attempt would start
+    # at 14 seconds, past the deadline.
+    assert response.status_code == 503
+    assert timeouts_used == [(2, 5), (2, 5)]
+
+    timeouts_used.clear()
+    clock[0] = 0.0
+    client.request("GET", url, timeouts=Timeouts(connect=2, read=5, deadline=9))
+    assert timeouts_used == [(2, 5), (2, 2)]
+
+    def mock_error(self, method, url, **kwargs):
+        clock[0] += 1
+        raise requests.exceptions.ConnectTimeout()
+
+    monkeypatch.setattr(requests.Session, "request", mock_error)
+    monkeypatch.setattr(RetryPolicy, "delay", lambda self, attempt, r=None: 0.0)
+    clock[0] = 0.0
+    with pytest.raises(requests.exceptions.ConnectTimeout):
+        client.request("POST", url, timeouts=Timeouts(deadline=2.5))
+    assert clock[0] == 3
+
+    # The process is suspended for longer than the delay.
+    monkeypatch.setattr(time, "sleep", lambda delay: sleep(delay + 10))
+    clock[0] = 0.0
+    with pytest.raises(DeadlineExceeded):
+        client.request("GET", url, timeouts=Timeouts(deadline=5))
+    assert clock[0] == 11
+
+
+def test_action_timeouts(monkeypatch):
+    timeouts_used = []
+
+    def mock_request(self, method, url, **kwargs):
+        timeouts_used.append(kwargs["timeout"])
+        return MockResponseOK()
+
+    monkeypatch.setattr(requests.Session, "request", mock_request)
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "my_token")
+
+    pipeline = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+    action = PorchAction(porch_url=url, action="claim_task")
+    client = HttpClient(action_timeouts={"claim_task": Timeouts(connect=1, read=2)})
+    claim_task(action=action, pipeline=pipeline, client=client)
+    assert timeouts_used[-1] == (1, 2)
+
+    action = PorchAction(
+        porch_url=url, action="claim_task", timeouts=Timeouts(connect=3, read=4)
+    )
+    claim_task(action=action, pipeline=pipeline, client=client)
+    assert timeouts_used[-1] == (3, 4)
+
+    claim_task(action=action, pipeline=pipeline, client=HttpClient())
+    assert timeouts_used[-1] == (3, 4)
+    action = PorchAction(porch_url=url, action="claim_task")
+    claim_task(action=action, pipeline=pipeline, client=HttpClient())
+    assert timeouts_used[-1] == (10, 60)
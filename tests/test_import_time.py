@@ -0,0 +1,72 @@
+import subprocess
+import sys
+
+from npg_porch_cli import api_cli_user
+from npg_porch_cli.api import list_client_actions, list_streaming_actions
+
+# The time budget for importing the CLI client module, in microseconds, as
+# reported by 'python -X importtime'. Importing the module should cost little
+# more than importing argparse.
+CLI_IMPORT_BUDGET_US = 50000
+
+HEAVY_MODULES = ["requests", "urllib3", "httpx", "npg.conf", "concurrent.futures"]
+
+
+def import_times(code: str) -> dict[str, int]:
+    """Runs the code in a new interpreter and returns cumulative import times
+    of all imported modules in microseconds.
+    """
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_time():
+    times = import_times("import npg_porch_cli.api_cli_user")
+    for module in HEAVY_MODULES + ["npg_porch_cli.api", "npg_porch_cli.worker"]:
+        assert module not in times, f"{module} is imported by the CLI module"
+    assert times["npg_porch_cli.api_cli_user"] < CLI_IMPORT_BUDGET_US
+
+    times = import_times("import npg_porch_cli")
+    assert "requests" not in times
+
+
+def test_cli_help_does_not_load_http_stack():
+    code = (
+        "import sys\n"
+        "from npg_porch_cli.api_cli_user import run\n"
+        "sys.argv = ['npg_porch_client', '--help']\n"
+        "try:\n"
+        "    run()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('requests' in sys.modules, file=sys.stderr)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert "usage: npg_porch_client" in result.stdout
+    assert result.stderr.strip() == "False"
+
+
+def test_single_task_actions_do_not_load_bulk_machinery():
+    times = import_times("import npg_porch_cli.api")
+    assert "requests" in times
+    for module in ["concurrent.futures", "npg_porch_cli.worker", "httpx"]:
+        assert module not in times
+
+
+def test_cli_action_names():
+    assert list(api_cli_user._CLIENT_ACTIONS) == list_client_actions()
+    assert list(api_cli_user._STREAMING_ACTIONS) == list_streaming_actions()
@@ -0,0 +1,139 @@
+import json
+import socket
+import sys
+
+import pytest
+import requests
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user, http_client
+from npg_porch_cli.api import Pipeline, PorchAction, send
+from npg_porch_cli.exceptions import ServerErrorException
+from npg_porch_cli.http_client import HttpClient, RetryPolicy
+from npg_porch_cli.metrics import MetricsRegistry, RequestEvent, get_registry
+from npg_porch_cli.schema import invalidate_schema_cache
+
+pipeline = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer() as server:
+        yield server
+    invalidate_schema_cache()
+
+
+def test_registry():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    for duration in (0.05, 0.5, 5.0):
+        registry(
+            RequestEvent(
+                operation="claim_task",
+                method="POST",
+                url="https://some.com/tasks/claim",
+                status_code=200,
+                duration=duration,
+                bytes_sent=10,
+                bytes_received=100,
+            )
+        )
+    registry(
+        RequestEvent(
+            operation="claim_task",
+            method="POST",
+            url="https://some.com/tasks/claim",
+            duration=0.2,
+            retries=2,
+            exception=requests.exceptions.ConnectionError("Refused"),
+        )
+    )
+
+    snapshot = registry.snapshot()
+    ok, failed = snapshot["requests"]
+    assert ok["status"] == "200"
+    assert ok["count"] == 3
+    assert ok["duration_buckets"] == {"0.1": 1, "1.0": 2}
+    assert ok["bytes_sent"] == 30
+    assert ok["bytes_received"] == 300
+    assert failed["status"] == "error"
+    assert failed["retries"] == 2
+    assert snapshot["exceptions"] == [
+        {"operation": "claim_task", "exception": "ConnectionError", "count": 1}
+    ]
+    assert json.loads(registry.to_json()) == snapshot
+
+    text = registry.to_prometheus()
+    labels = 'operation="claim_task",status="200"'
+    assert f"npg_porch_client_requests_total{{{labels}}} 3" in text
+    assert (
+        f'npg_porch_client_request_duration_seconds_bucket{{{labels},le="+Inf"}} 3'
+        in text
+    )
+    assert "# TYPE npg_porch_client_request_duration_seconds histogram" in text
+    assert (
+        'npg_porch_client_exceptions_total{operation="claim_task",'
+        'exception="ConnectionError"} 1' in text
+    )
+
+    with pytest.raises(ValueError, match=r"Metrics format 'xml' is not supported"):
+        registry.dump("xml")
+    registry.reset()
+    assert registry.snapshot() == {"requests": [], "exceptions": [], "circuits": []}
+
+
+def test_client_observers(porch):
+    events = []
+    client = HttpClient(observers=[events.append])
+    action = PorchAction(porch_url=porch.url, action="add_pipeline")
+    send(action=action, pipeline=pipeline, client=client)
+    with pytest.raises(ServerErrorException):
+        send(action=action, pipeline=pipeline, client=client)
+    action = PorchAction(porch_url=porch.url, action="list_tasks")
+    assert send(action=action, client=client) == []
+
+    assert [(e.operation, e.method, e.status_code) for e in events] == [
+        ("add_pipeline", "POST", 201),
+        ("add_pipeline", "POST", 409),
+        ("get_schema", "GET", 200),
+        ("list_tasks", "GET", 200),
+    ]
+    assert events[0].bytes_sent > 0
+    assert events[0].bytes_received > 0
+    assert all(e.retries == 0 and e.exception is None for e in events)
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        url = "http://127.0.0.1:%d/pipelines" % sock.getsockname()[1]
+    client = HttpClient(
+        observers=[events.append],
+        retry_policy=RetryPolicy(max_attempts=2, backoff_factor=0.001),
+    )
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.request("GET", url, operation="list_pipelines")
+    assert events[-1].status == "error"
+    assert events[-1].retries == 1
+    assert isinstance(events[-1].exception, requests.exceptions.ConnectionError)
+
+
+def test_stats_option(porch, monkeypatch, capsys):
+    monkeypatch.setattr(http_client, "_default_client", HttpClient())
+    get_registry().reset()
+    argv = ["npg_porch_client", "list_pipelines", "--base_url", porch.url]
+    monkeypatch.setattr(sys, "argv", argv + ["--stats"])
+    api_cli_user.run()
+    captured = capsys.readouterr()
+    assert json.loads(captured.out) == []
+    stats = json.loads(captured.err)
+    assert [(s["operation"], s["status"], s["count"]) for s in stats["requests"]] == [
+        ("list_pipelines", "200", 1)
+    ]
+
+    monkeypatch.setattr(sys, "argv", argv + ["--stats", "prometheus"])
+    api_cli_user.run()
+    assert (
+        'npg_porch_client_requests_total{operation="list_pipelines",status="200"} 2'
+        in capsys.readouterr().err
+    )
+    get_registry().reset()
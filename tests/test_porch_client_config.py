@@ -1,6 +1,10 @@
 from pytest import raises
 
-from npg_porch_cli.config import PorchClientConfig, get_config_data
+from npg_porch_cli.api import Pipeline
+from npg_porch_cli.client import PorchClient
+from npg_porch_cli.config import PorchClientConfig, get_config_data, get_http_client
+from npg_porch_cli.http_client import Timeouts
+from npg_porch_cli.throttle import Throttle
 
 
 def test_conf_obj():
@@ -15,3 +19,36 @@ def test_conf_obj():
 
     with raises(TypeError, match="missing 2 required keyword-only arguments"):
         get_config_data("tests/data/conf.ini", conf_file_section="PARTIALPORCH")
+
+
+def test_timeouts_from_conf():
+    config_obj = get_config_data("tests/data/conf.ini")
+    assert config_obj.action_timeouts is None
+    client = get_http_client(config_obj)
+    assert client.timeouts == Timeouts()
+    assert client.action_timeouts == {}
+
+    config_obj = get_config_data("tests/data/conf.ini", "TIMEOUTSPORCH")
+    client = get_http_client(config_obj, pool_maxsize=4)
+    assert client.pool_maxsize == 4
+    assert client.timeouts == Timeouts(connect=10, read=30, deadline=120)
+    assert client.timeouts_for("claim_task") == Timeouts(connect=1, read=2, deadline=5)
+    assert client.timeouts_for("list_tasks") == Timeouts(connect=10, read=600)
+    assert client.timeouts_for("add_task") == client.timeouts
+
+
+def test_client_from_conf():
+    client = PorchClient.from_config_file("tests/data/conf.ini", "TIMEOUTSPORCH")
+    assert client.porch_url == "https://porch.dnapipelines.sanger.ac.uk"
+    assert client.token == "0123456789abcdef0123456789abcdef"
+    assert client.pipeline == Pipeline(
+        name="test_pipeline", uri="https://test.pipeline.com", version="9.9.9"
+    )
+    assert client.http_client.timeouts == Timeouts(connect=10, read=30, deadline=120)
+    client.close()
+
+
+def test_throttle_from_conf():
+    assert get_http_client(get_config_data("tests/data/conf.ini")).throttle is None
+    client = get_http_client(get_config_data("tests/data/conf.ini", "LIMITSPORCH"))
+    assert client.throttle == Throttle(rate=20, max_in_flight=4)
@@ -0,0 +1,96 @@
+import io
+import pstats
+import sys
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user, http_client, profiling
+from npg_porch_cli.api import Pipeline, PorchAction, send
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.schema import invalidate_schema_cache
+
+pipeline = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer() as server:
+        yield server
+    invalidate_schema_cache()
+    profiling.disable()
+
+
+def test_disabled():
+    assert profiling.get_profiler() is None
+    with profiling.call("add_task"), profiling.phase("encode"):
+        pass
+    assert profiling.disable() is None
+
+
+def test_profiler(porch, tmp_path):
+    output = io.StringIO()
+    dump_path = tmp_path / "client.prof"
+    profiler = profiling.enable(per_call=True, dump_path=str(dump_path), output=output)
+    assert profiling.get_profiler() is profiler
+
+    client = HttpClient()
+    send(
+        action=PorchAction(porch_url=porch.url, action="add_pipeline"),
+        pipeline=pipeline,
+        client=client,
+    )
+    action = PorchAction(
+        porch_url=porch.url,
+        action="add_task",
+        task_input={"id_run": 1},
+        task_status="PENDING",
+    )
+    send(action=action, pipeline=pipeline, client=client)
+    assert profiling.disable() is profiler
+
+    snapshot = profiler.snapshot()
+    assert snapshot["calls"]["add_pipeline"]["count"] == 1
+    assert snapshot["calls"]["add_task"]["count"] == 1
+    assert snapshot["calls"]["get_schema"]["count"] == 1
+    for phase in ("action", "encode", "dns", "connect", "request", "server"):
+        assert snapshot["phases"][phase]["total"] >= 0
+    # The schema is retrieved via the default client, the other requests
+    # reuse the connection of the client.
+    assert snapshot["phases"]["connect"]["count"] == 2
+    assert snapshot["phases"]["server"]["count"] == 3
+    assert snapshot["phases"]["decode"]["count"] == 2
+
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 3
+    assert lines[0].startswith("npg_porch_cli profile: add_pipeline total=")
+    assert "server=" in lines[0]
+    assert "call" in profiler.report()
+    assert pstats.Stats(str(dump_path)).total_calls > 0
+
+
+def test_environment(monkeypatch):
+    monkeypatch.setenv(profiling.NPG_PORCH_PROFILE_ENV_VAR, "calls")
+    profiling._enable_from_environment()
+    profiler = profiling.get_profiler()
+    assert profiler is not None
+    assert profiler.per_call
+    profiling.disable()
+
+    monkeypatch.setenv(profiling.NPG_PORCH_PROFILE_ENV_VAR, "0")
+    profiling._enable_from_environment()
+    assert profiling.get_profiler() is None
+
+
+def test_profile_option(porch, monkeypatch, capsys):
+    monkeypatch.setattr(http_client, "_default_client", HttpClient())
+    argv = ["npg_porch_client", "list_pipelines", "--base_url", porch.url]
+    monkeypatch.setattr(sys, "argv", argv + ["--profile"])
+    api_cli_user.run()
+    captured = capsys.readouterr()
+    assert captured.out.strip() == "[]"
+    assert "list_pipelines" in captured.err
+    assert "decode" in captured.err
+    assert profiling.get_profiler() is None
@@ -0,0 +1,118 @@
+import json
+
+import pytest
+
+from benchmarks.mock_porch import SYNTHETIC_PIPELINE, MockPorchServer
+from npg_porch_cli import serialization
+from npg_porch_cli.api import (
+    PORCH_STATUSES,
+    Pipeline,
+    PorchAction,
+    iter_tasks,
+    list_tasks,
+    send,
+)
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.records import (
+    Task,
+    TaskRecordFactory,
+    TaskStatus,
+    select_tasks,
+    task_status,
+)
+from npg_porch_cli.schema import invalidate_schema_cache
+
+p1 = {"name": "p1", "uri": "https://p1.com", "version": "1.0"}
+p2 = {"name": "p2", "uri": "https://p2.com", "version": "1.0"}
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer() as server:
+        yield server
+    invalidate_schema_cache()
+
+
+def test_task_status():
+    assert [s.value for s in TaskStatus] == PORCH_STATUSES
+    assert TaskStatus.DONE == "DONE"
+    assert task_status("DONE") is TaskStatus.DONE
+    assert task_status("ARCHIVED") == "ARCHIVED"
+    assert task_status(None) is None
+    assert serialization.dumps([TaskStatus.DONE]) == b'["DONE"]'
+
+
+def test_records():
+    tasks = [
+        {
+            "pipeline": dict(p),
+            "task_input_id": str(i),
+            "task_input": {"id_run": i},
+            "status": status,
+        }
+        for i, (p, status) in enumerate(
+            [(p1, "PENDING"), (p2, "PENDING"), (p1, "DONE"), (p1, "PENDING")]
+        )
+    ]
+    factory = TaskRecordFactory()
+    records = list(select_tasks(tasks, factory=factory))
+    assert len(records) == 4
+    assert not hasattr(records[0], "__dict__")
+    assert records[0].pipeline is records[2].pipeline is records[3].pipeline
+    assert records[0].pipeline is not records[1].pipeline
+    assert records[0].pipeline == Pipeline(**p1)
+    assert records[2].status is TaskStatus.DONE
+    assert records[1].task_input == {"id_run": 1}
+    assert json.loads(records[1].task_input_json) == {"id_run": 1}
+    assert [r.to_dict() for r in records] == tasks
+
+    selected = select_tasks(tasks, pipeline=Pipeline(**p1), status="PENDING")
+    assert [r.task_input_id for r in selected] == ["0", "3"]
+
+    task = Task(pipeline=Pipeline(**p1), task_input_id="1", status="ARCHIVED")
+    assert task.task_input is None
+    assert task.to_dict()["status"] == "ARCHIVED"
+
+
+def test_typed_listing(porch):
+    porch.num_synthetic_tasks = 5
+    client = HttpClient()
+    pipeline = Pipeline(**p1)
+    send(
+        action=PorchAction(porch_url=porch.url, action="add_pipeline"),
+        pipeline=pipeline,
+        client=client,
+    )
+    send(
+        action=PorchAction(
+            porch_url=porch.url, action="add_task", task_input={"id_run": 1}
+        ),
+        pipeline=pipeline,
+        client=client,
+    )
+
+    action = PorchAction(porch_url=porch.url, action="list_tasks", typed_results=True)
+    records = list_tasks(action=action, client=client)
+    assert all(isinstance(r, Task) for r in records)
+    assert len(records) == 6
+    assert len({id(r.pipeline) for r in records}) == 2
+    synthetic = [r for r in records if r.pipeline == Pipeline(**SYNTHETIC_PIPELINE)]
+    assert len(synthetic) == 5
+
+    dicts = list_tasks(
+        action=PorchAction(porch_url=porch.url, action="list_tasks"), client=client
+    )
+    assert [r.to_dict() for r in records] == dicts
+
+    action = PorchAction(
+        porch_url=porch.url,
+        action="list_tasks",
+        task_status="PENDING",
+        typed_results=True,
+    )
+    records = list(iter_tasks(action=action, pipeline=pipeline, client=client))
+    assert len(records) == 1
+    assert records[0].task_input == {"id_run": 1}
+    assert records[0].status is TaskStatus.PENDING
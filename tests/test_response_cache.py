@@ -0,0 +1,159 @@
+import json
+import sys
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user, http_client
+from npg_porch_cli.api import Pipeline, PorchAction, send
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.response_cache import CachedResponse, ResponseCache
+from npg_porch_cli.schema import invalidate_schema_cache
+
+p1 = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    yield
+    invalidate_schema_cache()
+
+
+def _list_tasks(porch, client):
+    return send(
+        action=PorchAction(porch_url=porch.url, action="list_tasks"),
+        client=client,
+    )
+
+
+def test_cache_key():
+    key = ResponseCache.key("http://some.com/tasks", {"b": "1", "a": ["2", "3"]}, {})
+    assert key == ("http://some.com/tasks?a=2&a=3&b=1", None)
+    assert ResponseCache.key(
+        "http://some.com/tasks?x=1", {"a": "2"}, {"Authorization": "Bearer T"}
+    ) == ("http://some.com/tasks?x=1&a=2", "Bearer T")
+    with pytest.raises(ValueError):
+        ResponseCache(max_size=0)
+
+
+def test_cache_eviction():
+    cache = ResponseCache(max_size=10)
+    for name, size in (("a", 4), ("b", 4)):
+        cache._store((name, None), CachedResponse(body=b"x" * size, etag=name))
+    assert cache.get(("a", None)) is not None
+    cache._store(("c", None), CachedResponse(body=b"x" * 4, etag="c"))
+    # The least recently used reply is dropped.
+    assert cache.get(("b", None)) is None
+    assert [k[0] for k in cache._entries] == ["a", "c"]
+    cache._store(("d", None), CachedResponse(body=b"x" * 11, etag="d"))
+    assert cache.get(("d", None)) is None
+    assert cache._size == 8
+    cache.clear()
+    assert cache.get(("a", None)) is None
+    assert cache._size == 0
+
+
+@pytest.mark.parametrize("compression", [False, True])
+def test_conditional_list(token, compression):
+    events = []
+    cache = ResponseCache()
+    client = HttpClient(response_cache=cache, observers=[events.append])
+    with MockPorchServer(
+        num_synthetic_tasks=200, etags=True, compression=compression
+    ) as porch:
+        send(
+            action=PorchAction(
+                porch_url=porch.url, action="add_task", task_input={"id_run": 1}
+            ),
+            pipeline=p1,
+            client=client,
+        )
+        tasks = _list_tasks(porch, client)
+        assert len(tasks) == 201
+        assert events[-1].status_code == 200
+
+        assert _list_tasks(porch, client) == tasks
+        assert events[-1].status_code == 304
+        assert cache.hits == 1
+
+        send(
+            action=PorchAction(
+                porch_url=porch.url, action="add_task", task_input={"id_run": 2}
+            ),
+            pipeline=p1,
+            client=client,
+        )
+        assert len(_list_tasks(porch, client)) == 202
+        assert events[-1].status_code == 200
+        assert len(_list_tasks(porch, client)) == 202
+        assert events[-1].status_code == 304
+        assert cache.hits == 2
+
+        # A reply which is not streamed, the key has no credentials.
+        client.request(method="GET", url=f"{porch.url}/tasks")
+        assert events[-1].status_code == 200
+        response = client.request(method="GET", url=f"{porch.url}/tasks")
+        assert response.status_code == 200
+        assert events[-1].status_code == 304
+        assert len(response.json()) == 202
+        assert response.headers["Content-Type"] == "application/json"
+        assert cache.hits == 3
+
+        # Requests with their own conditional headers are not cached.
+        etag = response.headers["ETag"]
+        response = client.request(
+            method="GET", url=f"{porch.url}/tasks", headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+        assert cache.hits == 3
+
+
+def test_compression(token):
+    events = []
+    client = HttpClient(compress_requests=True, observers=[events.append])
+    with MockPorchServer(batch=True, compression=True) as porch:
+        task_inputs = [{"id_run": i, "sample": f"sample_{i}"} for i in range(100)]
+        summary = send(
+            action=PorchAction(
+                porch_url=porch.url, action="add_tasks", task_inputs=task_inputs
+            ),
+            pipeline=p1,
+            client=client,
+        )
+        assert summary["created"] == 100
+        raw_size = len(json.dumps(task_inputs))
+        assert [e.bytes_sent for e in events if e.method == "POST"][0] < raw_size / 2
+        assert len(_list_tasks(porch, client)) == 100
+
+        response = client.request(method="GET", url=f"{porch.url}/pipelines")
+        assert response.headers["Content-Encoding"] == "gzip"
+        assert response.json() == []
+
+        # Small bodies are not compressed.
+        response = client.request(
+            method="POST", url=f"{porch.url}/pipelines", data=json.dumps({"name": "x"})
+        )
+        assert "Content-Encoding" not in response.request.headers
+
+
+def test_cache_cli(token, monkeypatch, capsys):
+    monkeypatch.setattr(http_client, "_default_client", HttpClient())
+    with MockPorchServer(etags=True) as porch:
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "npg_porch_client",
+                "list_pipelines",
+                "--base_url",
+                porch.url,
+                "--response_cache",
+                "--compress_requests",
+            ],
+        )
+        api_cli_user.run()
+        assert json.loads(capsys.readouterr().out) == []
+    assert http_client._default_client.response_cache == ResponseCache()
+    assert http_client._default_client.compress_requests
@@ -0,0 +1,151 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from npg_porch_cli.exceptions import ServerErrorException
+from npg_porch_cli.schema import SchemaCache
+
+url = "http://some.com"
+
+
+class MockSchemaResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.reason = "Some reason"
+        self.url = url
+        self.ok = status_code == 200
+        self.headers = headers or {}
+
+    def json(self):
+        with open("tests/data/porch_openapi.json") as f:
+            return json.load(f)
+
+
+class MockServer:
+    def __init__(self, etag="v1"):
+        self.etag = etag
+        self.requests = []
+
+    def request(self, session, method, url, **kwargs):
+        headers = kwargs.get("headers", {})
+        self.requests.append(headers)
+        if headers.get("If-None-Match") == self.etag:
+            return MockSchemaResponse(304)
+        return MockSchemaResponse(200, {"ETag": self.etag})
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = MockServer()
+    monkeypatch.setattr(
+        requests.Session,
+        "request",
+        lambda session, *args, **kwargs: server.request(session, *args, **kwargs),
+    )
+    return server
+
+
+def test_memory_cache(server):
+    cache = SchemaCache()
+    schema = cache.get(url)
+    assert schema.task_statuses == [
+        "PENDING",
+        "CLAIMED",
+        "RUNNING",
+        "DONE",
+        "FAILED",
+        "CANCELLED",
+    ]
+    assert schema.etag == "v1"
+    assert cache.get(url) is schema
+    assert cache.get(url) is schema
+    assert len(server.requests) == 1
+
+    cache.get("http://other.com")
+    assert len(server.requests) == 2
+
+    cache.invalidate(url)
+    cache.get(url)
+    assert len(server.requests) == 3
+    assert server.requests[-1] == {}
+
+
+def test_revalidation(server):
+    cache = SchemaCache(ttl=0)
+    schema = cache.get(url)
+    fetched_at = schema.fetched_at
+    assert cache.get(url) is schema
+    assert server.requests[-1] == {"If-None-Match": "v1"}
+    assert schema.fetched_at > fetched_at
+
+    server.etag = "v2"
+    new_schema = cache.get(url)
+    assert new_schema is not schema
+    assert new_schema.etag == "v2"
+    assert len(server.requests) == 3
+
+    cache = SchemaCache(ttl=None)
+    schema = cache.get(url)
+    schema.fetched_at = 0
+    assert cache.get(url) is schema
+    assert len(server.requests) == 4
+
+
+def test_disk_cache(server, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    SchemaCache(cache_dir=cache_dir).get(url)
+    assert len(server.requests) == 1
+    assert len(os.listdir(cache_dir)) == 1
+
+    schema = SchemaCache(cache_dir=cache_dir).get(url)
+    assert len(server.requests) == 1
+    assert schema.etag == "v1"
+    assert "CANCELLED" in schema.task_statuses
+
+    cache = SchemaCache(cache_dir=cache_dir)
+    cache.invalidate()
+    assert os.listdir(cache_dir) == []
+    cache.get(url)
+    assert len(server.requests) == 2
+
+
+def test_fetch_error(monkeypatch):
+    monkeypatch.setattr(
+        requests.Session, "request", lambda *args, **kwargs: MockSchemaResponse(500)
+    )
+    cache = SchemaCache()
+    with pytest.raises(ServerErrorException) as e:
+        cache.get(url)
+    assert e.value.args[0].startswith("Failed to get OpenAPI Schema. Status code 500")
+
+
+def test_concurrent_fetches(server):
+    slow_url = "http://slow.com"
+    release = threading.Event()
+    request = server.request
+
+    def slow_request(session, method, url, **kwargs):
+        if url.startswith(slow_url):
+            release.wait(5)
+        return request(session, method, url, **kwargs)
+
+    server.request = slow_request
+    cache = SchemaCache()
+    cache.get(url)
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(cache.get, slow_url) for _ in range(4)]
+        # A slow server does not block access to the schemas of others.
+        assert cache.peek(url) is not None
+        assert cache.get("http://other.com").etag == "v1"
+        cache.invalidate(url)
+        assert cache.peek(url) is None
+        assert not any(f.done() for f in futures)
+        release.set()
+        schemas = [f.result() for f in futures]
+    # The slow server is asked for its schema once.
+    assert all(schema is schemas[0] for schema in schemas)
+    assert len(server.requests) == 3
@@ -1,3 +1,5 @@
+import json
+
 import pytest
 import requests
 
@@ -19,6 +21,10 @@ class MockResponseOK:
     def json(self):
         return json_data
 
+    @property
+    def content(self):
+        return json.dumps(json_data).encode()
+
 
 class MockResponseNotFound:
     def __init__(self):
@@ -66,7 +72,7 @@ def test_sending_request(monkeypatch):
     assert e.value.args[0] == "Authorization token is needed"
 
     with monkeypatch.context() as m:
-        m.setattr(requests, "request", mock_get_200)
+        m.setattr(requests.Session, "request", mock_get_200)
         assert (
             send_request(validate_ca_cert=True, url=url, method="GET", auth_type=None)
             == json_data
@@ -75,11 +81,11 @@ def test_sending_request(monkeypatch):
     monkeypatch.setenv(var_name, "token_xyz")
 
     with monkeypatch.context() as m:
-        m.setattr(requests, "request", mock_get_200)
+        m.setattr(requests.Session, "request", mock_get_200)
         assert send_request(validate_ca_cert=False, url=url, method="GET") == json_data
 
     with monkeypatch.context() as m:
-        m.setattr(requests, "request", mock_get_404)
+        m.setattr(requests.Session, "request", mock_get_404)
         with pytest.raises(ServerErrorException) as e:
             send_request(validate_ca_cert=False, url=url, method="POST", data=json_data)
         assert e.value.args[0] == (
@@ -88,7 +94,7 @@ def test_sending_request(monkeypatch):
         )
 
     with monkeypatch.context() as m:
-        m.setattr(requests, "request", mock_get_404_short)
+        m.setattr(requests.Session, "request", mock_get_404_short)
         with pytest.raises(ServerErrorException) as e:
             send_request(validate_ca_cert=False, url=url, method="POST", data=json_data)
         assert e.value.args[0] == f'Status code 404 "NOT FOUND" received from {url}'
@@ -0,0 +1,53 @@
+import pytest
+
+from npg_porch_cli import serialization
+from npg_porch_cli.api import Pipeline
+
+
+@pytest.fixture(params=serialization.available_backends())
+def backend(request):
+    default = serialization.get_backend()
+    yield serialization.set_backend(request.param)
+    serialization.set_backend(default.name)
+
+
+def test_round_trip(backend):
+    pipeline = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+    data = {"pipeline": pipeline, "task_input": {"id_run": 409, "name": "Ü"}}
+    expected = {
+        "pipeline": {"name": "p1", "uri": "https://p1.com", "version": "1.0"},
+        "task_input": {"id_run": 409, "name": "Ü"},
+    }
+
+    encoded = serialization.dumps(data)
+    assert isinstance(encoded, bytes)
+    assert b"\n" not in encoded
+    assert serialization.loads(encoded) == expected
+    assert serialization.loads(encoded.decode()) == expected
+
+    indented = serialization.dumps([data], indent=True)
+    assert indented.startswith(b'[\n  {\n    "pipeline": {')
+    assert serialization.loads(indented) == [expected]
+
+    with pytest.raises(ValueError):
+        serialization.loads(b'{"status": ')
+
+
+def test_selecting_backend(monkeypatch):
+    default = serialization.get_backend()
+    assert serialization.available_backends()[-1] == "json"
+    assert default.name == serialization.available_backends()[0]
+
+    with pytest.raises(ValueError) as e:
+        serialization.set_backend("yaml")
+    assert e.value.args[0] == (
+        "JSON backend 'yaml' is not valid. Valid backends: orjson, msgspec, json"
+    )
+    monkeypatch.setattr(serialization, "msgspec", None)
+    with pytest.raises(ValueError) as e:
+        serialization.set_backend("msgspec")
+    assert e.value.args[0] == "JSON backend 'msgspec' is not installed"
+
+    monkeypatch.setenv(serialization.NPG_PORCH_JSON_ENV_VAR, "json")
+    assert serialization.set_backend().name == "json"
+    serialization.set_backend(default.name)
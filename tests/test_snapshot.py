@@ -0,0 +1,216 @@
+import json
+import sys
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user, http_client
+from npg_porch_cli.api import Pipeline, PorchAction, send
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.schema import invalidate_schema_cache
+from npg_porch_cli.snapshot import TaskSnapshot
+
+p1 = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+p2 = Pipeline(name="p2", uri="https://p2.com", version="1.0")
+
+
+@pytest.fixture
+def porch(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    with MockPorchServer(timestamps=True) as server:
+        yield server
+    invalidate_schema_cache()
+
+
+def _add_tasks(porch, client, pipeline, id_runs):
+    send(
+        action=PorchAction(
+            porch_url=porch.url,
+            action="add_tasks",
+            task_inputs=[{"id_run": id_run, "lane": 1} for id_run in id_runs],
+        ),
+        pipeline=pipeline,
+        client=client,
+    )
+
+
+def test_snapshot(porch, tmp_path):
+    client = HttpClient()
+    path = str(tmp_path / "tasks.sqlite")
+    _add_tasks(porch, client, p1, range(3))
+    _add_tasks(porch, client, p2, range(2))
+
+    action = PorchAction(porch_url=porch.url, action="snapshot", snapshot_path=path)
+    assert send(action=action, client=client) == {
+        "mode": "full",
+        "retrieved": 5,
+        "total": 5,
+    }
+
+    send(
+        action=PorchAction(
+            porch_url=porch.url,
+            action="update_task",
+            task_input={"lane": 1, "id_run": 1},
+            task_status="FAILED",
+        ),
+        pipeline=p1,
+        client=client,
+    )
+    _add_tasks(porch, client, p2, [7])
+    summary = send(action=action, client=client)
+    assert summary["mode"] == "incremental"
+    assert summary["total"] == 6
+    # Tasks modified at the time of the previous refresh can be listed again.
+    assert 2 <= summary["retrieved"] < 6
+
+    with TaskSnapshot(path) as snapshot:
+        assert snapshot.porch_url == porch.url
+        failed = snapshot.query(pipeline=p1, status="FAILED")
+        assert [t["task_input"] for t in failed] == [{"id_run": 1, "lane": 1}]
+        assert len(snapshot.query(status="PENDING")) == 5
+        assert len(snapshot.query(pipeline=p2)) == 3
+        assert snapshot.query(task_input={"lane": 1, "id_run": 7})[0]["pipeline"] == (
+            {"name": "p2", "uri": "https://p2.com", "version": "1.0"}
+        )
+        assert snapshot.query(pipeline=p1, task_input={"id_run": 7, "lane": 1}) == []
+
+    query = PorchAction(
+        porch_url=porch.url,
+        action="query",
+        snapshot_path=path,
+        task_status="PENDING",
+    )
+    num_requests = porch.num_requests
+    assert len(send(action=query, pipeline=p1, client=client)) == 2
+    assert porch.num_requests == num_requests
+
+    porch.timestamps = False
+    invalidate_schema_cache()
+    summary = send(action=action, pipeline=p1, client=client)
+    assert summary == {"mode": "full", "retrieved": 3, "total": 6}
+
+
+def test_snapshot_errors(porch, tmp_path):
+    path = str(tmp_path / "tasks.sqlite")
+    with pytest.raises(TypeError, match=r"snapshot_path cannot be None"):
+        send(action=PorchAction(porch_url=porch.url, action="snapshot"))
+    with pytest.raises(ValueError, match=r"does not exist"):
+        send(
+            action=PorchAction(porch_url=porch.url, action="query", snapshot_path=path)
+        )
+
+    send(action=PorchAction(porch_url=porch.url, action="snapshot", snapshot_path=path))
+    other = PorchAction(
+        porch_url="http://other.com", action="query", snapshot_path=path
+    )
+    with pytest.raises(ValueError, match=r"has been taken from"):
+        send(action=other)
+
+
+def test_snapshot_cli(porch, tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(http_client, "_default_client", HttpClient())
+    _add_tasks(porch, None, p1, range(2))
+    path = str(tmp_path / "tasks.sqlite")
+    argv = ["npg_porch_client", "--base_url", porch.url, "--snapshot_file", path]
+
+    monkeypatch.setattr(sys, "argv", argv[:1] + ["snapshot"] + argv[1:])
+    api_cli_user.run()
+    assert json.loads(capsys.readouterr().out)["total"] == 2
+
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        argv[:1]
+        + ["query", "--task_json", '{"lane": 1, "id_run": 1}', "--compact"]
+        + argv[1:],
+    )
+    api_cli_user.run()
+    tasks = json.loads(capsys.readouterr().out)
+    assert [t["task_input"]["id_run"] for t in tasks] == [1]
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_add_tasks_deduplication(porch, tmp_path, batch):
+    porch.batch = batch
+    client = HttpClient()
+    task_inputs = [
+        {"id_run": 1, "lane": 1},
+        {"lane": 1, "id_run": 1.0},
+        {"id_run": 2, "lane": 1},
+        {"id_run": 1, "lane": 1},
+    ]
+    num_requests = porch.num_requests
+    summary = send(
+        action=PorchAction(
+            porch_url=porch.url, action="add_tasks", task_inputs=task_inputs
+        ),
+        pipeline=p1,
+        client=client,
+    )
+    assert (summary["created"], summary["duplicate"]) == (2, 2)
+    assert [t["result"] for t in summary["tasks"]] == [
+        "created",
+        "duplicate",
+        "created",
+        "duplicate",
+    ]
+    # The schema and either one batch or one request per distinct task.
+    assert porch.num_requests - num_requests == (2 if batch else 3)
+
+    path = str(tmp_path / "tasks.sqlite")
+    send(
+        action=PorchAction(porch_url=porch.url, action="snapshot", snapshot_path=path),
+        client=client,
+    )
+    action = PorchAction(
+        porch_url=porch.url,
+        action="add_tasks",
+        task_inputs=task_inputs + [{"id_run": 3, "lane": 1}],
+        snapshot_path=path,
+    )
+    num_requests = porch.num_requests
+    summary = send(action=action, pipeline=p1, client=client)
+    assert [t["result"] for t in summary["tasks"]] == [
+        "existed",
+        "duplicate",
+        "existed",
+        "duplicate",
+        "created",
+    ]
+    assert porch.num_requests - num_requests == 1
+    with TaskSnapshot(path) as snapshot:
+        assert snapshot.has_task(p1, {"id_run": 3, "lane": 1})
+        assert not snapshot.has_task(p2, {"id_run": 3, "lane": 1})
+
+    # Nothing is sent once all tasks are in the snapshot.
+    num_requests = porch.num_requests
+    summary = send(action=action, pipeline=p1, client=client)
+    assert summary["existed"] == 3
+    assert porch.num_requests == num_requests
+
+
+@pytest.mark.parametrize("batch", [False, True])
+def test_add_tasks_invalid_inputs(porch, batch):
+    porch.batch = batch
+    summary = send(
+        action=PorchAction(
+            porch_url=porch.url,
+            action="add_tasks",
+            task_inputs=[
+                {"id_run": 1, "lane": float("nan")},
+                {"id_run": 2, "lane": {1, 2}},
+                {"id_run": 3, "lane": 1},
+            ],
+        ),
+        pipeline=p1,
+        client=HttpClient(),
+    )
+    assert (summary["created"], summary["failed"]) == (1, 2)
+    assert [t["result"] for t in summary["tasks"]] == ["failed", "failed", "created"]
+    assert (
+        summary["tasks"][0]["error"]
+        == "Out of range float values are not JSON compliant"
+    )
+    assert "not JSON serializable" in summary["tasks"][1]["error"]
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from npg_porch_cli import streaming
+from npg_porch_cli.streaming import iter_json_array
+
+data = [
+    {"pipeline": {"name": "p1"}, "task_input": {"id_run": 5, "sample": "Välxx"}},
+    [1, 2.5, -3e2],
+    "some, [string]",
+    12345,
+    None,
+    True,
+]
+
+
+def test_iterating_json_array():
+    document = json.dumps(data, ensure_ascii=False).encode()
+    assert list(iter_json_array([document])) == data
+    # Split into chunks at every possible position, including the middle of
+    # multibyte characters and numbers.
+    for size in [1, 2, 3, 7, 64]:
+        chunks = []
+        for start in range(0, len(document), size):
+            end = start + size
+            chunks.append(document[start:end])
+        assert list(iter_json_array(chunks)) == data
+
+    assert list(iter_json_array([b" [ ", b"] \n"])) == []
+    assert list(iter_json_array([b"[1,", b"23]"])) == [1, 23]
+    # Numbers split after the decimal point, the exponent and its sign.
+    for document in (b"[1.5, 2e3, -3.25E+2, 4e-1]", b"[1.5]"):
+        expected = json.loads(document)
+        for split in range(1, len(document)):
+            chunks = [document[:split], document[split:]]
+            assert list(iter_json_array(chunks)) == expected
+    assert list(iter_json_array([b"[1.", b"5]"])) == [1.5]
+    assert list(iter_json_array([b"[1e", b"3]"])) == [1000.0]
+    assert list(iter_json_array([b"[1E", b"+", b"3]"])) == [1000.0]
+
+
+def test_invalid_json_array():
+    with pytest.raises(ValueError, match="Expected a JSON array"):
+        list(iter_json_array([b'{"a": 1}']))
+    with pytest.raises(ValueError, match="Incomplete JSON array"):
+        list(iter_json_array([b'[{"a": 1}']))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b'[{"a": 1', b"]"]))
+    with pytest.raises(ValueError, match="Expected ',' or ']'"):
+        list(iter_json_array([b"[1 2]"]))
+    with pytest.raises(ValueError):
+        list(iter_json_array([b"[1.", b"]"]))
+    with pytest.raises(ValueError, match="Unexpected data after the end"):
+        list(iter_json_array([b"[1] 2"]))
+
+
+def test_elements_spanning_chunks(monkeypatch):
+    calls = []
+
+    class CountingDecoder(json.JSONDecoder):
+        def raw_decode(self, s, idx=0):
+            calls.append(idx)
+            return super().raw_decode(s, idx)
+
+    monkeypatch.setattr(streaming.json, "JSONDecoder", CountingDecoder)
+    element = {
+        "task_input": {"samples": [f"s{i}" for i in range(2000)]},
+        "text": 'a "quoted" ] } [ { \\ string',
+    }
+    document = json.dumps([element, 1234567, element]).encode()
+    chunks = []
+    for start in range(0, len(document), 16):
+        end = start + 16
+        chunks.append(document[start:end])
+    assert len(chunks) > 2000
+    assert list(iter_json_array(chunks)) == [element, 1234567, element]
+    # Each element is decoded at most twice, rather than once per chunk.
+    assert len(calls) <= 6
+
+    # Escaped characters at the end of a chunk.
+    for split in range(1, 12):
+        document = b'["a\\\\", "\\"b\\""]'
+        chunks = [document[:split], document[split:]]
+        assert list(iter_json_array(chunks)) == ["a\\", '"b"']
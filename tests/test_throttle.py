@@ -0,0 +1,144 @@
+import json
+import sys
+import threading
+import time
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user, http_client
+from npg_porch_cli.api import PorchAction, send
+from npg_porch_cli.http_client import DeadlineExceeded, HttpClient, Timeouts
+from npg_porch_cli.schema import invalidate_schema_cache
+from npg_porch_cli.throttle import Throttle, ThrottleTimeout
+
+url = "http://some.com/tasks"
+
+
+def test_throttle_validation():
+    for kwargs in ({"rate": 0}, {"burst": 0}, {"max_in_flight": 0}):
+        with pytest.raises(ValueError):
+            Throttle(**kwargs)
+    assert Throttle(rate=2.5).burst == 3
+    assert Throttle(rate=0.1).burst == 1
+    assert Throttle(max_in_flight=2).burst is None
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_rate(tmp_path, shared):
+    lock_dir = str(tmp_path) if shared else None
+    throttle = Throttle(rate=50, burst=5, lock_dir=lock_dir)
+    start = time.monotonic()
+    for _ in range(5):
+        throttle.acquire(url)()
+    assert time.monotonic() - start < 0.05
+    for _ in range(10):
+        throttle.acquire(url)()
+    assert time.monotonic() - start >= 0.18
+    # Servers have separate limits.
+    throttle.acquire("http://other.com/tasks")()
+    with pytest.raises(ThrottleTimeout):
+        throttle.acquire(url, timeout=0.001)
+
+
+@pytest.mark.parametrize("shared", [False, True])
+def test_max_in_flight(tmp_path, shared):
+    lock_dir = str(tmp_path) if shared else None
+    throttle = Throttle(max_in_flight=2, lock_dir=lock_dir)
+    releases = [throttle.acquire(url), throttle.acquire(url)]
+    with pytest.raises(ThrottleTimeout):
+        throttle.acquire(url, timeout=0.02)
+    throttle.acquire("http://other.com/tasks")()
+
+    threading.Timer(0.05, releases.pop()).start()
+    start = time.monotonic()
+    release = throttle.acquire(url, timeout=5)
+    assert time.monotonic() - start >= 0.04
+    release()
+    releases.pop()()
+
+
+def test_shared_between_throttles(tmp_path):
+    # Throttle objects with the same directory behave as if they were in
+    # different processes.
+    throttles = [
+        Throttle(rate=20, burst=1, max_in_flight=1, lock_dir=str(tmp_path))
+        for _ in range(2)
+    ]
+    release = throttles[0].acquire(url)
+    with pytest.raises(ThrottleTimeout):
+        throttles[1].acquire(url, timeout=0.02)
+    release()
+    start = time.monotonic()
+    throttles[1].acquire(url)()
+    throttles[0].acquire(url)()
+    assert time.monotonic() - start >= 0.04
+
+
+def test_client_throttle(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    throttle = Throttle(max_in_flight=2)
+    client = HttpClient(throttle=throttle, pool_maxsize=8)
+    with MockPorchServer(latency=0.05) as porch:
+        action = PorchAction(porch_url=porch.url, action="list_pipelines")
+        send(action=action, client=client)
+
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=send, kwargs={"action": action, "client": client})
+            for _ in range(6)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert time.monotonic() - start >= 0.15
+
+        release = throttle.acquire(porch.url)
+        throttle.acquire(porch.url)
+        with pytest.raises(DeadlineExceeded):
+            send(
+                action=PorchAction(
+                    porch_url=porch.url,
+                    action="list_pipelines",
+                    timeouts=Timeouts(deadline=0.05),
+                ),
+                client=client,
+            )
+        release()
+        assert send(action=action, client=client) == []
+    invalidate_schema_cache()
+
+
+def test_throttle_cli(monkeypatch, capsys, tmp_path):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    monkeypatch.setattr(http_client, "_default_client", HttpClient())
+    invalidate_schema_cache()
+    with MockPorchServer() as porch:
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "npg_porch_client",
+                "list_pipelines",
+                "--base_url",
+                porch.url,
+                "--rate_limit",
+                "5",
+                "--max_in_flight",
+                "1",
+                "--throttle_dir",
+                str(tmp_path),
+            ],
+        )
+        api_cli_user.run()
+        assert json.loads(capsys.readouterr().out) == []
+        port = porch.url.rsplit(":", 1)[1]
+    assert http_client._default_client.throttle == Throttle(
+        rate=5, max_in_flight=1, lock_dir=str(tmp_path)
+    )
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        f"http_127.0.0.1_{port}{suffix}" for suffix in (".rate", ".slot0")
+    ]
+    invalidate_schema_cache()
@@ -0,0 +1,178 @@
+import json
+import sys
+import threading
+
+import pytest
+
+from benchmarks.mock_porch import MockPorchServer
+from npg_porch_cli import api_cli_user, http_client
+from npg_porch_cli.api import Pipeline, PorchAction, send
+from npg_porch_cli.client import PorchClient
+from npg_porch_cli.http_client import HttpClient
+from npg_porch_cli.schema import invalidate_schema_cache
+from npg_porch_cli.watch import TaskEvent, TaskWatcher, watch_tasks
+
+p1 = Pipeline(name="p1", uri="https://p1.com", version="1.0")
+p2 = Pipeline(name="p2", uri="https://p2.com", version="1.0")
+
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setenv("NPG_PORCH_TOKEN", "MY_TOKEN")
+    invalidate_schema_cache()
+    yield
+    invalidate_schema_cache()
+
+
+def _send(porch, client, pipeline, action, **kwargs):
+    return send(
+        action=PorchAction(porch_url=porch.url, action=action, **kwargs),
+        pipeline=pipeline,
+        client=client,
+    )
+
+
+def _id_runs(events):
+    return sorted(
+        (e.task["task_input"]["id_run"], e.previous_status, e.status) for e in events
+    )
+
+
+@pytest.mark.parametrize(
+    "timestamps,etags", [(False, False), (True, False), (False, True), (True, True)]
+)
+def test_watcher(token, timestamps, etags):
+    replies = []
+    client = HttpClient(observers=[replies.append])
+    with MockPorchServer(
+        num_synthetic_tasks=50, timestamps=timestamps, etags=etags
+    ) as porch:
+        _send(porch, client, p1, "add_tasks", task_inputs=[{"id_run": 1}])
+        _send(porch, client, p2, "add_tasks", task_inputs=[{"id_run": 2}])
+
+        watcher = TaskWatcher(
+            action=PorchAction(porch_url=porch.url, action="list_tasks"),
+            pipeline=p1,
+            client=client,
+        )
+        assert _id_runs(watcher.poll()) == [(1, None, "PENDING")]
+        assert watcher.poll() == []
+        replies.clear()
+        assert watcher.poll() == []
+        assert replies[-1].status_code == (304 if etags else 200)
+
+        _send(porch, client, p1, "add_tasks", task_inputs=[{"id_run": 3}])
+        _send(porch, client, p2, "add_tasks", task_inputs=[{"id_run": 4}])
+        _send(
+            porch,
+            client,
+            p1,
+            "update_task",
+            task_input={"id_run": 1},
+            task_status="RUNNING",
+        )
+        assert _id_runs(watcher.poll()) == [
+            (1, "PENDING", "RUNNING"),
+            (3, None, "PENDING"),
+        ]
+        assert watcher.poll() == []
+        assert watcher.polls == 5
+
+
+def test_watcher_status(token):
+    client = HttpClient()
+    with MockPorchServer(timestamps=True) as porch:
+        _send(porch, client, p1, "add_tasks", task_inputs=[{"id_run": 1}])
+        watcher = TaskWatcher(
+            action=PorchAction(
+                porch_url=porch.url, action="list_tasks", task_status="DONE"
+            ),
+            client=client,
+        )
+        assert watcher.poll() == []
+        for status in ("DONE", "FAILED", "DONE"):
+            _send(
+                porch,
+                client,
+                p1,
+                "update_task",
+                task_input={"id_run": 1},
+                task_status=status,
+            )
+            events = watcher.poll()
+            if status == "DONE":
+                assert len(events) == 1
+                assert isinstance(events[0], TaskEvent)
+                assert events[0].status == "DONE"
+            else:
+                assert events == []
+        assert _id_runs(events) == [(1, "FAILED", "DONE")]
+
+
+def test_watch_tasks(token):
+    client = HttpClient()
+    with MockPorchServer(etags=True) as porch:
+        _send(porch, client, p1, "add_tasks", task_inputs=[{"id_run": 1}])
+        action = PorchAction(porch_url=porch.url, action="list_tasks")
+
+        events = watch_tasks(action=action, client=client, interval=0, max_polls=3)
+        assert list(events) == []
+        events = watch_tasks(
+            action=action, client=client, interval=0, initial=True, max_polls=3
+        )
+        assert _id_runs(events) == [(1, None, "PENDING")]
+
+        stop = threading.Event()
+        events = watch_tasks(
+            action=action, client=client, interval=0.05, max_polls=100, stop_event=stop
+        )
+        # The task is added after the first poll, which takes the baseline.
+        timer = threading.Timer(
+            0.2, _send, [porch, client, p1, "add_task"], {"task_input": {"id_run": 2}}
+        )
+        timer.start()
+        assert _id_runs([next(events)]) == [(2, None, "PENDING")]
+        stop.set()
+        assert list(events) == []
+        timer.join()
+
+
+def test_watch_cli(token, monkeypatch, capsys):
+    monkeypatch.setattr(http_client, "_default_client", HttpClient())
+    with MockPorchServer() as porch:
+        _send(porch, None, p1, "add_tasks", task_inputs=[{"id_run": 1}])
+        monkeypatch.setattr(
+            sys,
+            "argv",
+            [
+                "npg_porch_client",
+                "watch",
+                "--base_url",
+                porch.url,
+                "--interval",
+                "1",
+                "--max_polls",
+                "2",
+            ],
+        )
+        timer = threading.Timer(
+            0.5, _send, [porch, None, p1, "add_task"], {"task_input": {"id_run": 2}}
+        )
+        timer.start()
+        api_cli_user.run()
+        timer.join()
+        events = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert len(events) == 1
+        assert events[0]["task"]["task_input"] == {"id_run": 2}
+        assert (events[0]["previous_status"], events[0]["status"]) == (
+            None,
+            "PENDING",
+        )
+
+
+def test_client_watch(token):
+    with MockPorchServer() as porch:
+        with PorchClient(porch_url=porch.url, pipeline=p1) as client:
+            client.add_task(task_input={"id_run": 1})
+            events = client.watch(status="PENDING", initial=True, max_polls=1)
+            assert _id_runs(events) == [(1, None, "PENDING")]
@@ -0,0 +1,230 @@
+import json
+import threading
+
+import pytest
+import requests
+
+from npg_porch_cli.api import Pipeline, PorchAction
+from npg_porch_cli.exceptions import ServerErrorException
+from npg_porch_cli.schema import invalidate_schema_cache
+from npg_porch_cli.worker import (
+    RUNNING_STATUS_ATTEMPTS,
+    claim_and_run,
+    command_runner,
+)
+
+url = "http://some.com"
+var_name = "NPG_PORCH_TOKEN"
+
+with open("tests/data/porch_openapi.json") as f:
+    schema = json.load(f)
+
+
+class MockPorchResponse:
+    def __init__(self, json_data, status_code=200):
+        self.json_data = json_data
+        self.status_code = status_code
+        self.reason = "Some reason"
+        self.url = url
+        self.ok = status_code == 200
+        self.headers = {}
+
+    def json(self):
+        return self.json_data
+
+    @property
+    def content(self):
+        return json.dumps(self.json_data).encode()
+
+
+class MockPorch:
+    def __init__(self, num_tasks):
+        self.lock = threading.Lock()
+        self.pending = [{"id_run": i} for i in range(num_tasks)]
+        self.claims = []
+        self.statuses = {}
+        # Errors to reply with, keyed by the end of the URL.
+        self.failures = {}
+
+    def request(self, session, method, url, **kwargs):
+        if url.endswith("openapi.json"):
+            return MockPorchResponse(schema)
+        data = json.loads(kwargs["data"])
+        with self.lock:
+            for suffix, failures in self.failures.items():
+                if url.endswith(suffix) and failures:
+                    failure = failures.pop(0)
+                    if isinstance(failure, Exception):
+                        raise failure
+                    return MockPorchResponse({"detail": "Error"}, failure)
+            if url.endswith("tasks/claim"):
+                num_tasks = (kwargs.get("params") or {}).get("num_tasks", 1)
+                self.claims.append(num_tasks)
+                claimed = self.pending[:num_tasks]
+                del self.pending[:num_tasks]
+                return MockPorchResponse(
+                    [{"pipeline": data, "task_input": t} for t in claimed]
+                )
+            id_run = data["task_input"]["id_run"]
+            self.statuses.setdefault(id_run, []).append(data["status"])
+            return MockPorchResponse(data)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setenv(var_name, "MY_TOKEN")
+    invalidate_schema_cache()
+    server = MockPorch(num_tasks=10)
+    monkeypatch.setattr(
+        requests.Session,
+        "request",
+        lambda session, *args, **kwargs: server.request(session, *args, **kwargs),
+    )
+    yield server
+    invalidate_schema_cache()
+
+
+def test_claim_and_run(server):
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    action = PorchAction(porch_url=url, action="claim_task")
+    seen = []
+
+    def run(task):
+        seen.append(task["task_input"]["id_run"])
+        if task["task_input"]["id_run"] == 4:
+            raise RuntimeError("Failed")
+
+    summary = claim_and_run(
+        action=action,
+        pipeline=p,
+        function=run,
+        concurrency=4,
+        exit_when_idle=True,
+        min_idle_sleep=0.01,
+    )
+    assert summary == {"claimed": 10, "done": 9, "failed": 1, "errors": 0}
+    assert sorted(seen) == list(range(10))
+    assert server.claims[0] == 4
+    assert server.claims[-1] >= 1
+    assert server.statuses[4] == ["RUNNING", "FAILED"]
+    assert all(server.statuses[i] == ["RUNNING", "DONE"] for i in range(10) if i != 4)
+
+
+def test_max_tasks_and_stop(server):
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    action = PorchAction(porch_url=url, action="claim_task")
+
+    summary = claim_and_run(
+        action=action, pipeline=p, function=lambda t: None, max_tasks=3
+    )
+    assert summary["claimed"] == 3
+    assert summary["done"] == 3
+
+    # Nothing left to claim after the rest is done, the worker idles until
+    # it is stopped.
+    stop_event = threading.Event()
+    timer = threading.Timer(0.2, stop_event.set)
+    timer.start()
+    summary = claim_and_run(
+        action=action,
+        pipeline=p,
+        function=lambda t: None,
+        min_idle_sleep=0.01,
+        max_idle_sleep=0.02,
+        stop_event=stop_event,
+    )
+    timer.join()
+    assert summary["claimed"] == 7
+    assert server.pending == []
+    assert len(server.claims) > 5
+
+
+def test_claim_errors(server):
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    action = PorchAction(porch_url=url, action="claim_task")
+    server.failures["tasks/claim"] = [
+        requests.exceptions.ConnectionError("Refused"),
+        503,
+        requests.exceptions.ReadTimeout("Timed out"),
+    ]
+    summary = claim_and_run(
+        action=action,
+        pipeline=p,
+        function=lambda t: None,
+        exit_when_idle=True,
+        min_idle_sleep=0.01,
+    )
+    assert summary == {"claimed": 10, "done": 10, "failed": 0, "errors": 3}
+
+    server.pending = [{"id_run": 10}]
+    server.failures["tasks/claim"] = [403]
+    with pytest.raises(ServerErrorException) as e:
+        claim_and_run(action=action, pipeline=p, function=lambda t: None)
+    assert e.value.status_code == 403
+
+
+def test_running_status_errors(server):
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    action = PorchAction(porch_url=url, action="claim_task")
+    server.pending = [{"id_run": 1}]
+    server.failures["tasks/"] = [500]
+    summary = claim_and_run(
+        action=action,
+        pipeline=p,
+        function=lambda t: None,
+        exit_when_idle=True,
+        min_idle_sleep=0.01,
+    )
+    assert summary == {"claimed": 1, "done": 1, "failed": 0, "errors": 1}
+    assert server.statuses[1] == ["RUNNING", "DONE"]
+
+    seen = []
+    server.pending = [{"id_run": 2}]
+    server.failures["tasks/"] = [500] * RUNNING_STATUS_ATTEMPTS
+    summary = claim_and_run(
+        action=action,
+        pipeline=p,
+        function=seen.append,
+        exit_when_idle=True,
+        min_idle_sleep=0.01,
+    )
+    assert summary == {
+        "claimed": 1,
+        "done": 0,
+        "failed": 0,
+        "errors": RUNNING_STATUS_ATTEMPTS,
+    }
+    assert seen == []
+    assert 2 not in server.statuses
+
+
+def test_command_runner(tmp_path):
+    output = tmp_path / "task.json"
+    run = command_runner(f"sh -c 'cat > {output}'")
+    run({"task_input": {"id_run": 5}})
+    assert json.loads(output.read_text()) == {"task_input": {"id_run": 5}}
+
+    with pytest.raises(Exception):
+        command_runner("false")({})
+    with pytest.raises(ValueError):
+        command_runner(" ")
+
+
+def test_final_status_errors(server):
+    p = Pipeline(name="p1", uri=url, version="1.0")
+    action = PorchAction(porch_url=url, action="claim_task")
+    server.pending = [{"id_run": 1}]
+
+    def fail_status_update(task):
+        server.failures["tasks/"] = [500]
+
+    summary = claim_and_run(
+        action=action,
+        pipeline=p,
+        function=fail_status_update,
+        exit_when_idle=True,
+        min_idle_sleep=0.01,
+    )
+    # The task has run, but its outcome is not known to the server.
+    assert summary == {"claimed": 1, "done": 0, "failed": 0, "errors": 1}
+    assert server.statuses[1] == ["RUNNING"]